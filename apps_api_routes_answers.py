@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, conint
+from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from apps.storage.db import get_db
+from apps.storage.repositories import AnswerRepository
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+class AnswerCondition(BaseModel):
+    key: str  # question_key, e.g. "pets"
+    # eq | ne (yes/no/conditional value) | lt | lte | gt | gte (number/amount) | date_lte | date_gte (ISO date)
+    # | months_lte | months_gte (lease months) | period (month/once) | contains (raw text)
+    op: str = "eq"
+    value: Union[float, str]
+
+class AnswerQuery(BaseModel):
+    conditions: List[AnswerCondition] = []
+    search_id: Optional[str] = None
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    min_beds: Optional[float] = None
+    max_beds: Optional[float] = None
+    limit: conint(ge=1, le=500) = 100
+    offset: conint(ge=0) = 0
+
+@router.get("/keys")
+def answer_keys(search_id: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Question keys with answer counts, most answered first.
+    """
+    return {"items": AnswerRepository(db).question_keys(search_id)}
+
+@router.get("/facets/{question_key}")
+def answer_facet(question_key: str, search_id: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    """
+    Counts per extracted value (yes/no/conditional/unknown) and numeric, month and date stats for one question.
+    """
+    return AnswerRepository(db).facet(question_key, search_id)
+
+@router.post("/query")
+def query_listings(req: AnswerQuery, db: Session = Depends(get_db)):
+    """
+    Listings matching listing filters and answer conditions, e.g. 2-bed listings that allow pets under $2,500:
+    {"min_beds": 2, "max_beds": 2, "max_price": 2500, "conditions": [{"key": "pets", "op": "eq", "value": "yes"}]}
+    or listings free of fees, ready by December, on leases of at most a year:
+    [{"key": "fees", "op": "lte", "value": 0}, {"key": "move_in", "op": "date_lte", "value": "2026-12-01"},
+     {"key": "lease_term", "op": "months_lte", "value": 12}]
+    """
+    try:
+        items = AnswerRepository(db).find_listings(
+            [c.dict() for c in req.conditions], search_id=req.search_id,
+            min_price=req.min_price, max_price=req.max_price, min_beds=req.min_beds, max_beds=req.max_beds,
+            limit=req.limit, offset=req.offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items}
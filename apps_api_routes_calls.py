@@ -1,12 +1,15 @@
-y
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
 from typing import List
+from urllib.parse import quote
 from apps.api.schemas import StartCallsRequest, StartCallsResponse
+from apps.storage.db import get_db, session_scope
 from apps.storage.repositories import ListingRepository, ConversationRepository
 from apps.workflow.jobs import CallJob
 from apps.workflow.scheduler import Scheduler
 from apps.workflow.rate_limit import TokenBucket
 from apps.conversation.prompts import build_question_set
+from apps.conversation.sessions import CallSession, get_session_store
 from apps.telephony.voice_gateway import VoiceGateway
 from config.settings import settings
 import logging
@@ -17,13 +20,15 @@ router = APIRouter()
 
 class CallExecutor:
     """
-    Executes call jobs: create conversation record, place call via Twilio,
-    attach questions and initialize state so webhooks can pick up.
+    Executes call jobs: create conversation record, place call via Twilio, then move the
+    placeholder to the real CallSid with the listing and questions so webhooks can pick up;
+    the call's session is primed in the session store so the first webhook turn does not read
+    the database. A turn that does read it still finds the listing (context, summary).
+    Runs on scheduler threads, so each DB step is its own unit of work with its own
+    session; no connection is held while the call is being placed.
     """
     def __init__(self, voice: VoiceGateway):
         self.voice = voice
-        self.convo_repo = ConversationRepository()
-        self.listing_repo = ListingRepository()
 
     def execute(self, job: CallJob) -> None:
         if not job.to_number:
@@ -31,43 +36,64 @@ class CallExecutor:
             return
 
         # Create placeholder conversation before dialing
-        convo = self.convo_repo.get_or_create(call_sid=None, listing_id=job.listing_id)
+        with session_scope(write=True) as db:
+            ConversationRepository(db).get_or_create(call_sid=None, listing_id=job.listing_id)
 
-        # Place call and obtain real CallSid
+        # Place call and obtain real CallSid; the listing rides along in case the first turn beats the link below
         try:
-            call_sid = self.voice.place_call(job.to_number, webhook_path="/twilio/voice")
+            call_sid = self.voice.place_call(job.to_number, webhook_path=f"/twilio/voice?listing_id={quote(job.listing_id)}")
             logger.info("Placed call for listing %s -> %s (CallSid=%s)", job.listing_id, job.to_number, call_sid)
         except Exception as e:
             logger.exception("Failed to place call for listing %s to %s: %s", job.listing_id, job.to_number, e)
             return
 
-        # Update conversation to use real call SID and attach questions
-        self.convo_repo.update(call_sid=call_sid, state="INTRO", answers={})
-        self.convo_repo.attach_questions(call_sid=call_sid, questions=job.questions)
+        # Move the placeholder to the real call SID (listing, questions) before priming the store
+        with session_scope(write=True) as db:
+            ConversationRepository(db).link_call(call_sid=call_sid, listing_id=job.listing_id, questions=job.questions)
         logger.info("Attached %d questions to conversation %s", len(job.questions), call_sid)
+        if settings.SESSION_STORE_ENABLED and job.listing_context:
+            store = get_session_store()
+            if store.get(call_sid) is None:  # the first turn may already be in
+                store.put(CallSession(call_sid=call_sid, listing_id=job.listing_id,
+                                      listing_context=job.listing_context, questions=list(job.questions)))
 
 
 @router.post("/start", response_model=StartCallsResponse)
-def start_calls(req: StartCallsRequest):
+def start_calls(req: StartCallsRequest, db: Session = Depends(get_db)):
     """
     Create call jobs from stored listings and start scheduler in background threads.
+    Listings come best score first, so the MAX_LISTINGS_PER_SEARCH cap keeps the best candidates
+    and the scheduler dials them in score order.
+    Listings that share a phone number and unit (dedup_key) get a single call.
+    With changed_since, only listings new or changed since then are called (re-call after a refresh).
     Returns number scheduled immediately; jobs process asynchronously.
     """
-    repo = ListingRepository()
-    listings = repo.list_by_search_id(req.search_id)
+    repo = ListingRepository(db)
+    listings = repo.list_by_search_id(req.search_id, changed_since=req.changed_since)
 
     if not listings:
         raise HTTPException(status_code=404, detail="No listings found for search_id")
 
     questions = build_question_set(req.user_questions or [])
     jobs: List[CallJob] = []
-    for l in listings[: settings.MAX_LISTINGS_PER_SEARCH]:
+    seen = set()
+    skipped = 0
+    for l in listings:
+        call_key = (l.get("contact_phone") or "", l.get("dedup_key") or l["listing_id"])
+        if call_key in seen:
+            skipped += 1
+            continue
+        seen.add(call_key)
         jobs.append(CallJob(
             listing_id=l["listing_id"],
             to_number=l.get("contact_phone"),
             questions=questions,
-            search_id=req.search_id
+            search_id=req.search_id,
+            score=l.get("score"),
+            listing_context={"address": l.get("address"), "title": l.get("title")},
         ))
+        if len(jobs) >= settings.MAX_LISTINGS_PER_SEARCH:
+            break
 
     voice = VoiceGateway()
     executor = CallExecutor(voice=voice)
@@ -76,5 +102,13 @@ def start_calls(req: StartCallsRequest):
     scheduler.submit(jobs)
     scheduler.start()
 
-    logger.info("Scheduled %d calls for search_id=%s", len(jobs), req.search_id)
+    logger.info("Scheduled %d calls for search_id=%s (%d duplicate listings skipped)", len(jobs), req.search_id, skipped)
     return StartCallsResponse(scheduled=len(jobs))
+
+
+@router.get("/{call_sid}/turns")
+def call_turns(call_sid: str, db: Session = Depends(get_db)):
+    """
+    A call's turn log (prompt, speech, confidence, state transition, timings per turn), archived turns included.
+    """
+    return ConversationRepository(db).list_turns(call_sid)
@@ -1,13 +1,46 @@
-from fastapi import APIRouter
-from apps.storage.repositories import ConversationRepository
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+from apps.storage.db import get_db, pool_stats
+from apps.storage.archive import SearchArchive
+from apps.storage.repositories import ConversationRepository, SearchRepository
 
 router = APIRouter()
 
 @router.get("/summaries")
-def list_summaries(search_id: str):
+def list_summaries(
+    search_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    sort: str = Query("price", regex="^(price|beds)$"),
+    order: str = Query("asc", regex="^(asc|desc)$"),
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    min_beds: Optional[float] = None,
+    status: str = Query("all", regex="^(all|done|pending|failed)$"),
+    db: Session = Depends(get_db),
+):
     """
-    Return summaries + listing details for dashboard.
+    Return one page of summaries + listing details for the dashboard.
+    Pass next_cursor back as `cursor` (with the same sort/order) for the next page; it is null on the last page.
+    Searches moved to cold storage are served from their archive file (items carry "archived": true).
+    summary_status is done, pending (the call is not over or its summary is queued), running or failed.
     """
-    repo = ConversationRepository()
-    items = repo.list_summaries(search_id)
-    return {"items": items}
+    search = SearchRepository(db).get(search_id)
+    kwargs = dict(limit=limit, cursor=cursor, sort=sort, order=order,
+                  min_price=min_price, max_price=max_price, min_beds=min_beds, status=status)
+    try:
+        if search is not None and search.archived_at is not None:
+            items, next_cursor = SearchArchive(db).summaries_page(search, **kwargs)
+        else:
+            items, next_cursor = ConversationRepository(db).list_summaries_page(search_id, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/db-pool")
+def db_pool():
+    """
+    Connection pool gauges (size, in use, overflow) and checkout wait metrics, for pool sizing.
+    """
+    return pool_stats()
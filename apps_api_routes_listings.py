@@ -1,9 +1,21 @@
  
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pydantic import BaseModel, conint
+from typing import Dict, List, Optional
+from apps.ingestion.base_provider import abatched
+from apps.ingestion.cache import get_search_cache
+from apps.ingestion.composite_provider import CompositeProvider
+from apps.ingestion.dedup import DedupIndex
 from apps.ingestion.factory import create_provider
-from apps.storage.repositories import ListingRepository
+from apps.ingestion.filters import RentalFilters
+from apps.ingestion.http_client import get_http_client
+from apps.storage.db import get_db, get_write_db
+from apps.storage.repositories import ListingRepository, SearchRepository
+from apps.workflow.scoring import score_search
 from config.settings import settings
 import logging
 
@@ -19,35 +31,166 @@ class SearchRequest(BaseModel):
     beds: Optional[int] = None
     baths: Optional[int] = None
     user_questions: Optional[list] = None
+    max_listings: Optional[conint(ge=1)] = None  # defaults to MAX_LISTINGS_PER_SEARCH
 
 class SearchResponse(BaseModel):
     search_id: str
     results_count: int
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0  # listings collapsed onto an already-known unit
+    providers: List[Dict] = []  # per-provider count, latency_ms, status
+    started_at: Optional[datetime] = None  # pass as changed_since to /calls/start to call only new/changed listings
+    diff: Dict[str, List[str]] = {}  # listing ids: new, changed, removed
+    scored: int = 0
+    source: str = "provider"  # provider | local (answered from stored listings)
+    covered_by: Optional[str] = None  # search whose inventory answered a local run
 
 @router.post("/search", response_model=SearchResponse)
-def search_listings(req: SearchRequest):
+async def search_listings(req: SearchRequest, db: Session = Depends(get_write_db)):
     """
     Ingest listings using the configured provider adapter returned by create_provider().
+    A single adapter is wrapped in CompositeProvider too, so every search gets the same
+    timeout handling and per-provider stats. Provider pages are streamed and persisted in INGEST_BATCH_SIZE batches, so each batch
+    is committed (and callable) before the next page is fetched.
+    The route is async: provider streams run on the event loop (an Apify run holds no thread
+    while it is scraping) and only the DB work goes to the threadpool, one step at a time.
+    Only new listings and listings whose content hash changed are written; when the ingestion
+    ran to completion, listings of the search that were not returned again are marked removed.
+    The search's listings are then scored against the request filters to set call order.
+    When a complete provider run with filters no narrower than these finished within
+    LOCAL_INVENTORY_MAX_AGE_SECONDS, the search is answered from its stored listings instead,
+    without calling the provider.
     """
-    provider = create_provider()
-    logger.info("Using listing provider: %s", settings.LISTING_PROVIDER)
-    listings = provider.search_listings(
+    limit = min(req.max_listings or settings.MAX_LISTINGS_PER_SEARCH, settings.MAX_LISTINGS_HARD_LIMIT)
+    filters = RentalFilters(
         city=(req.city or ""),
         state=(req.state or ""),
-        min_price=(req.min_price or 0),
-        max_price=(req.max_price or 0),
-        beds=(req.beds or 0),
-        baths=(req.baths or 0),
-        limit=settings.MAX_LISTINGS_PER_SEARCH
+        min_price=(req.min_price or None),
+        max_price=(req.max_price or None),
+        beds=(req.beds or None),
+        baths=(req.baths or None),
     )
+    repo = ListingRepository(db)
+    searches = SearchRepository(db)
+    started_at = datetime.utcnow()
+    covering_id = await run_in_threadpool(_start_search, req, filters, searches, started_at)
+    if covering_id is not None:
+        return await run_in_threadpool(_search_local, req, filters, limit, covering_id, repo, searches, started_at)
+
+    provider = create_provider()
+    if not isinstance(provider, CompositeProvider):
+        provider = CompositeProvider([provider])
+    logger.info("Using listing provider: %s (limit=%d)", settings.LISTING_PROVIDER, limit)
+
+    dedup = DedupIndex(repo.canonical_ids_for_keys)
+    resp = SearchResponse(search_id=req.search_id, results_count=0, started_at=started_at)
+    diff: Dict[str, List[str]] = {"new": [], "changed": [], "removed": []}
+    seen = set()
+    async for batch in abatched(provider.aiter_listings(filters, limit), settings.INGEST_BATCH_SIZE):
+        duplicates, result = await run_in_threadpool(_persist_batch, batch, dedup, repo, req.search_id, started_at)
+        resp.duplicates += duplicates
+        seen.update(l["listing_id"] for l in batch)
+        diff["new"].extend(result.linked_ids)
+        diff["changed"].extend(result.updated_ids)
+        resp.results_count += len(batch)
+        resp.inserted += result.inserted
+        resp.updated += result.updated
+        resp.unchanged += result.unchanged
+        logger.debug("Persisted batch of %d listings for search_id=%s", len(batch), req.search_id)
+    resp.providers = [asdict(s) for s in provider.stats]
 
-    if not listings:
+    # A truncated or partially failed run says nothing about the listings it did not reach.
+    complete = resp.results_count < limit and all(s.status == "ok" for s in provider.stats)
+    await run_in_threadpool(_finish_search, req, filters, repo, searches, resp, diff, seen, complete, started_at)
+
+    if not resp.results_count:
         raise HTTPException(status_code=404, detail="No listings found")
 
-    # attach search_id and persist
-    repo = ListingRepository()
-    for l in listings:
-        l["search_id"] = req.search_id
-    repo.upsert_many(listings)
+    logger.info("Persisted search_id=%s: %d inserted, %d updated, %d unchanged, %d removed, %d duplicates",
+                req.search_id, resp.inserted, resp.updated, resp.unchanged, len(diff["removed"]), resp.duplicates)
+    return resp
+
+
+def _start_search(req: SearchRequest, filters: RentalFilters, searches: SearchRepository,
+                  started_at: datetime) -> Optional[str]:
+    """
+    Record the search run; returns the id of a fresh complete run covering `filters`, if any.
+    """
+    covering = None
+    if settings.LOCAL_INVENTORY_MAX_AGE_SECONDS > 0:
+        covering = searches.find_covering(
+            filters, settings.LISTING_PROVIDER,
+            fresh_since=started_at - timedelta(seconds=settings.LOCAL_INVENTORY_MAX_AGE_SECONDS),
+            exclude=req.search_id,
+        )
+    searches.start(req.search_id, filters, settings.LISTING_PROVIDER, now=started_at)
+    return covering.search_id if covering is not None else None
+
+
+def _persist_batch(batch: List[Dict], dedup: DedupIndex, repo: ListingRepository, search_id: str,
+                   started_at: datetime):
+    duplicates = dedup.assign(batch)
+    return duplicates, repo.upsert_many(batch, now=started_at, search_id=search_id)
+
 
-    return SearchResponse(search_id=req.search_id, results_count=len(listings))
+def _finish_search(req: SearchRequest, filters: RentalFilters, repo: ListingRepository, searches: SearchRepository,
+                   resp: SearchResponse, diff: Dict[str, List[str]], seen: set, complete: bool,
+                   started_at: datetime) -> None:
+    if complete and resp.results_count:
+        diff["removed"] = repo.mark_removed(req.search_id, seen, now=started_at)
+    resp.diff = diff
+    if resp.results_count:
+        resp.scored = score_search(repo, req.search_id, filters)
+    searches.finish(req.search_id, resp.results_count, complete)
+
+
+def _search_local(req: SearchRequest, filters: RentalFilters, limit: int, source_id: str,
+                  repo: ListingRepository, searches: SearchRepository, started_at: datetime) -> SearchResponse:
+    """
+    Answer a search from the stored listings of the complete run `source_id`, whose results
+    hold every listing matching `filters`; the local run is complete unless `limit` cut it short.
+    """
+    matched, linked = repo.link_from_search(source_id, req.search_id, filters, limit, now=started_at)
+    resp = SearchResponse(search_id=req.search_id, results_count=len(matched), started_at=started_at,
+                          unchanged=len(matched), source="local", covered_by=source_id)
+    diff: Dict[str, List[str]] = {"new": linked, "changed": [], "removed": []}
+    complete = len(matched) < limit
+    if complete and matched:
+        diff["removed"] = repo.mark_removed(req.search_id, set(matched), now=started_at)
+    resp.diff = diff
+    if matched:
+        resp.scored = score_search(repo, req.search_id, filters)
+    searches.finish(req.search_id, len(matched), complete, source="local", covered_by=source_id)
+
+    if not matched:
+        raise HTTPException(status_code=404, detail="No listings found")
+
+    logger.info("Answered search_id=%s from local inventory of %s: %d listings, %d new to the search",
+                req.search_id, source_id, len(matched), len(linked))
+    return resp
+
+
+@router.get("/cache")
+def search_cache_stats():
+    """
+    Hit/miss/eviction counters for the provider search cache.
+    """
+    return get_search_cache().stats()
+
+
+@router.get("/http")
+def provider_http_stats():
+    """
+    Shared provider HTTP client: per-provider requests/retries/failures/circuit state and per-host connection reuse.
+    """
+    return get_http_client().stats()
+
+
+@router.get("/{search_id}/scores")
+def listing_scores(search_id: str, limit: int = Query(100, ge=1, le=10000), db: Session = Depends(get_db)):
+    """
+    Listings of a search in call order (best score first) with the fields the score is built from.
+    """
+    return ListingRepository(db).list_scores(search_id, limit)
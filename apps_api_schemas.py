@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 from typing import List, Optional
 
 class SearchRequest(BaseModel):
@@ -17,6 +18,7 @@ class SearchResponse(BaseModel):
 class StartCallsRequest(BaseModel):
     search_id: str
     user_questions: Optional[List[str]] = None
+    changed_since: Optional[datetime] = None  # only call listings new or changed since then (a search's started_at)
 
 class StartCallsResponse(BaseModel):
     scheduled: int
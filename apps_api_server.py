@@ -1,10 +1,17 @@
 
+import asyncio
 from fastapi import FastAPI
 from apps.api.routes_listings import router as listings_router
 from apps.api.routes_calls import router as calls_router
 from apps.api.routes_dashboard import router as dashboard_router
+from apps.api.routes_answers import router as answers_router
 from apps.telephony.webhooks import router as twilio_router
+from apps.conversation.adequacy import get_model as get_adequacy_model
+from apps.conversation.clarifications import get_clarifier
+from apps.conversation.summary_worker import get_summary_worker
+from apps.storage.db import session_scope
 from apps.storage.repositories import ListingRepository
+from config.settings import settings
 
 # Logging configuration import
 from apps.logging_config import configure_logging
@@ -21,9 +28,23 @@ app = FastAPI(title="Rental Outreach API")
 # Ensure tables exist at startup (for demo; use Alembic in production)
 @app.on_event("startup")
 def startup():
-    ListingRepository().create_tables()
+    with session_scope(write=True) as db:
+        ListingRepository(db).create_tables()
+    get_adequacy_model()  # train once here rather than on the first call's turn
+
+# Pre-warm clarification prompts without holding up startup
+@app.on_event("startup")
+async def warm_clarifications():
+    if settings.CLARIFY_CACHE_WARM_ON_STARTUP:
+        asyncio.get_running_loop().create_task(get_clarifier().warm())
+
+# Resume summaries left pending (or running) by a previous process
+@app.on_event("startup")
+async def recover_summaries():
+    await get_summary_worker().recover()
 
 app.include_router(listings_router, prefix="/listings", tags=["listings"])
 app.include_router(calls_router, prefix="/calls", tags=["calls"])
 app.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
+app.include_router(answers_router, prefix="/answers", tags=["answers"])
 app.include_router(twilio_router, tags=["telephony"])
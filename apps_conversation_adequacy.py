@@ -0,0 +1,176 @@
+"""
+Local answer-adequacy classifier: does a landlord's answer need a clarification?
+
+Runs on the CPU in microseconds, so the dialogue manager asks the LLM for a clarification
+only when one is actually needed. Two stages, per question type (the question_key of a
+default question, "open" for user questions):
+
+- rules: an empty answer or a filler word needs clarifying; an answer that hedges
+  ("I'd have to check", "not sure", "ask the owner") without anything that answers the
+  question needs clarifying; one that answers it (a date for move-in, an amount or
+  "no fee" for fees, ...) without hedging does not.
+- model: everything else (hedged but with an answer, or neither) goes to a logistic
+  regression over hashed word uni/bigrams, crossed with the question type, plus the rule
+  flags. It is trained at first use from the labeled examples in
+  apps/conversation/adequacy_examples.jsonl (a few milliseconds).
+
+Accuracy and latency against a held-out fixture: python -m benchmarks.adequacy
+"""
+
+import json
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .answers import DEFAULT_QUESTION_KEYS, HEDGE_RE
+from config.settings import settings
+
+EXAMPLES_PATH = os.path.join(os.path.dirname(__file__), "adequacy_examples.jsonl")
+N_FEATURES = 1 << 12
+
+_WORD_RE = re.compile(r"[a-z0-9$']+")
+
+_FILLER_RE = re.compile(
+    r"^(um+|uh+|hmm+|er+|ah+|well|so|ok(ay)?|what|sorry|pardon|huh|hello|hi|yes\?|one sec(ond)?|hold on)\W*$", re.I)
+
+_YES_NO = r"yes|yeah|yep|yup|sure|correct|absolutely|definitely|no|nope|nah"
+_MONEY = r"\$\s*\d|\b\d[\d,]*\s*(dollars|bucks)\b"
+_SIGNAL_RES: Dict[str, "re.Pattern"] = {key: re.compile(pattern, re.I) for key, pattern in {
+    "available": rf"\b({_YES_NO}|still available|available|rented|taken|leased|gone|off the market|pending|open)\b",
+    "move_in": r"\b(today|tomorrow|now|immediately|asap|right away|any ?time|next (week|month)|this (week|month)"
+               r"|(first|end|middle|beginning) of|\d{1,2}(st|nd|rd|th)|\d{1,2}/\d{1,2}|in \w+ (days|weeks)"
+               r"|january|february|march|april|may|june|july|august|september|october|november|december"
+               r"|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
+    "utilities": rf"\b({_YES_NO}|included|includes?|tenant pays|you pay|separately|water|electric(ity)?|gas|trash"
+                 r"|internet|sewer|heat|all utilities|none|nothing)\b",
+    "fees": rf"{_MONEY}|\b(no (application |broker |admin )?fees?|free|none|waived|one month'?s? rent|half a month)\b",
+    "lease_term": r"\b(\d+|one|two|three|six|nine|twelve|eighteen)[- ](month|year)s?\b"
+                  r"|\b(month[- ]to[- ]month|yearly|annual|year lease|renews?|renewal|auto[- ]renew)\b",
+    "pets": rf"{_MONEY}|\b({_YES_NO}|allowed|no pets|pet friendly|dogs?|cats?|pet (deposit|fee|rent)|weight limit"
+            r"|breed|lbs|pounds)\b",
+    "parking": rf"{_MONEY}|\b({_YES_NO}|garage|driveway|street parking|lot|covered|spot|space|assigned|permit|free"
+               r"|included)\b",
+    "renovations": rf"\b({_YES_NO}|renovated|remodeled|updated|new|replaced|redone|painted|upgraded|original"
+                   r"|nothing)\b",
+    "open": rf"{_MONEY}|\b({_YES_NO})\b|\d",
+}.items()}
+
+_model: Optional["AdequacyModel"] = None
+_model_lock = threading.Lock()
+
+
+@dataclass
+class Assessment:
+    needs_clarification: bool
+    reason: str  # empty | filler | hedge | answered | model
+    score: Optional[float] = None  # model probability that a clarification is needed
+
+
+def question_type(question: str) -> str:
+    """
+    question_key of a default question (or a key itself), "open" for anything else.
+    """
+    if question in _SIGNAL_RES:
+        return question
+    return DEFAULT_QUESTION_KEYS.get(question, "open")
+
+
+def _bucket(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) & (N_FEATURES - 1)
+
+
+def features(qtype: str, text: str, hedge: bool, signal: bool) -> List[int]:
+    words = _WORD_RE.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    tokens = grams + [f"{qtype}|{g}" for g in grams]
+    tokens += [f"len:{min(len(words), 8)}", f"hedge:{hedge}", f"signal:{signal}", f"{qtype}|signal:{signal}"]
+    return sorted({_bucket(t) for t in tokens})
+
+
+class AdequacyModel:
+    """
+    Logistic regression over hashed binary features; predict() is P(needs clarification).
+    """
+
+    def __init__(self, weights: Optional[List[float]] = None, bias: float = 0.0):
+        self.weights = weights or [0.0] * N_FEATURES
+        self.bias = bias
+
+    def predict(self, feats: Iterable[int]) -> float:
+        z = self.bias + sum(self.weights[i] for i in feats)
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+    @classmethod
+    def train(cls, examples: List[Tuple[List[int], bool]], epochs: int = 30, lr: float = 0.3,
+              l2: float = 1e-4, seed: int = 13) -> "AdequacyModel":
+        model = cls()
+        order = list(range(len(examples)))
+        rnd = random.Random(seed)
+        for _ in range(epochs):
+            rnd.shuffle(order)
+            for k in order:
+                feats, label = examples[k]
+                grad = model.predict(feats) - (1.0 if label else 0.0)
+                model.bias -= lr * grad
+                for i in feats:
+                    model.weights[i] -= lr * (grad + l2 * model.weights[i])
+        return model
+
+
+def _flags(qtype: str, text: str) -> Tuple[bool, bool]:
+    # signals are looked for outside the hedges, so "not sure" or "no idea" is not a yes/no
+    rest, hedges = HEDGE_RE.subn(" ", text)
+    return hedges > 0, bool(_SIGNAL_RES[qtype].search(rest))
+
+
+def load_examples(path: str = EXAMPLES_PATH) -> List[Dict]:
+    """
+    Labeled answers, one JSON object per line: {"question": <key or text>, "answer": ..., "clarify": bool}.
+    """
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def train_model(examples: List[Dict]) -> AdequacyModel:
+    rows = []
+    for ex in examples:
+        qtype = question_type(ex["question"])
+        text = ex["answer"] or ""
+        rows.append((features(qtype, text, *_flags(qtype, text)), bool(ex["clarify"])))
+    return AdequacyModel.train(rows)
+
+
+def get_model() -> AdequacyModel:
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = train_model(load_examples())
+        return _model
+
+
+def assess(question: str, text: Optional[str], model: Optional[AdequacyModel] = None) -> Assessment:
+    """
+    Decide whether `text`, given as the answer to `question`, needs a clarification.
+    """
+    text = (text or "").strip()
+    if not text:
+        return Assessment(True, "empty")
+    if _FILLER_RE.match(text):
+        return Assessment(True, "filler")
+    qtype = question_type(question)
+    hedge, signal = _flags(qtype, text)
+    if hedge and not signal:
+        return Assessment(True, "hedge")
+    if signal and not hedge:
+        return Assessment(False, "answered")
+    score = (model or get_model()).predict(features(qtype, text, hedge, signal))
+    return Assessment(score >= settings.ADEQUACY_CLARIFY_THRESHOLD, "model", score)
+
+
+def needs_clarification(question: str, text: Optional[str]) -> bool:
+    return assess(question, text).needs_clarification
@@ -0,0 +1,441 @@
+"""
+Normalization of call answers for the answers table.
+
+Each answered question gets a stable `question_key` (short names for the default
+questions, a slug of the text for user questions) and typed values parsed by the
+rule-based extractor of its question (EXTRACTORS; user questions get the generic one):
+
+    value_text    yes | no | conditional, or a category (move-in "now", lease "month_to_month" | "fixed")
+    value_num     a dollar amount (fees, pet and parking costs), a year (renovations), else the first number
+    value_date    move-in date, relative phrases ("next week", "the 15th") resolved against the answer's day
+    value_months  lease duration in months
+    value_period  "month" for recurring amounts ("$35 a month"), "once" for one-time ones (deposits, fees)
+
+The patterns are compiled once and run on every webhook turn, so answers are comparable
+(and filterable in SQL, all value columns are indexed with question_key) as soon as they
+are given, without an LLM pass. answer_facts() gives the same values per conversation.
+
+Backfill the table from existing conversations with:
+    python -m apps.conversation.answers
+Relative dates are resolved against the day of the backfill there.
+"""
+
+import calendar
+import re
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .prompts import DEFAULT_QUESTIONS
+
+DEFAULT_QUESTION_KEYS = dict(zip(DEFAULT_QUESTIONS, (
+    "available", "move_in", "utilities", "fees", "lease_term", "pets", "parking", "renovations",
+)))
+VALUE_FIELDS = ("value_text", "value_num", "value_date", "value_months", "value_period")
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_WORD_RE = re.compile(r"[a-z']+")
+_MONEY_RE = re.compile(r"\$\s*(\d[\d,]*(?:\.\d+)?)\s*(k\b)?|(\d[\d,]*(?:\.\d+)?)\s*(?:dollars?|bucks)\b", re.I)
+_NUMBER_RE = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(k\b)?", re.I)
+_YES = {"yes", "yeah", "yep", "yup", "sure", "correct", "absolutely", "definitely", "allowed", "included", "available"}
+_NO = {"no", "nope", "none", "unavailable"}
+# negate the side of the word or phrase that follows them ("not included", "not rented"); a "no" on their own
+_NEGATIONS = {"not", "never", "isn't", "aren't", "wasn't", "don't", "doesn't", "didn't", "can't", "cannot", "won't"}
+# a leading "no"/"none" negates the yes-words of its clause ("no pets allowed", "no parking spots available")
+_NO_QUANTIFIERS = {"no", "none"}
+_CLAUSE_END_RE = re.compile(r"[,.;:!?]|\bbut\b")
+# answers that do not take a side yet ("not sure", "I'd have to check"); also the adequacy model's hedge signal
+HEDGE_RE = re.compile(
+    r"\b(not (really |quite |totally |entirely )?sure|unsure|no idea|don'?t know|do not know|dunno|idk|not certain|hard to say|can'?t say"
+    r"|(have|need|got|i'?d have) to (check|ask|look|find out|confirm|verify|see)"
+    r"|(let me|i'?ll|i will|i can|i could|i'?d) (check|ask|look( it up| into it)?|find out|get back|confirm|call you back)"
+    r"|(ask|check with|talk to|speak (to|with)) (the|my|our) (owner|landlord|manager|office|management|boss|husband|wife|partner)"
+    r"|(call|get back to) you( back| later)?"
+    r"|maybe|possibly|perhaps|(it )?depends|we'?ll see|i guess"
+    r"|(can you |could you )?(repeat|say) (that|it) again|what was the question|didn'?t (catch|hear))\b", re.I)
+
+_NUMBER_WORDS = {
+    "a": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "eighteen": 18, "twenty": 20, "thirty": 30, "forty": 40,
+    "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+_NUMBER_WORD = "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True))
+_WORD_AMOUNT_RE = re.compile(
+    rf"\b((?:(?:{_NUMBER_WORD}|hundred|thousand)(?:\s+and\s+|[\s-]+)?)+)\s*(dollars?|bucks|hundred|thousand)\b", re.I)
+_MONTHLY_RE = re.compile(r"(\ba|\bper|\beach|\bevery|/)\s*(month|mo)\b|\bmonthly\b", re.I)
+_ONCE_RE = re.compile(r"\b(one[- ]time|once|non[- ]?refundable|deposit|upfront|up front|application|broker|admin)\b", re.I)
+_CONDITIONAL_RE = re.compile(
+    r"\b(but|if|as long as|only|just|except|depends|depending|case by case|restrictions?|under \d+|up to|small"
+    r"|some|partially|with (a |an )?(deposit|fee|approval))\b", re.I)
+_DEPENDS_ON_RE = re.compile(r"\bdepends on\b", re.I)
+_FEE_RE = re.compile(r"\b(fees?|charge|rent)\b", re.I)
+# a bare amount after a fee word: "application fee is 50", "the pet deposit would be 300"
+_FEE_AMOUNT_RE = re.compile(
+    r"\b(?:fees?|charges?|deposits?|costs?)\b(?:\s+(?:is|are|was|would be|will be|of|runs?|about|around|only|just))*"
+    r"\s+(\d[\d,]*(?:\.\d+)?)\s*(k\b)?", re.I)
+_YEAR_RE = re.compile(r"\b(19[5-9]\d|20\d\d)\b")
+
+_UNAVAILABLE_RE = re.compile(r"\b(rented|taken|leased|gone|off the market|no longer)\b", re.I)
+_AVAILABLE_RE = re.compile(r"\b(still (open|up|on the market)|vacant|open)\b", re.I)
+_TENANT_PAYS_RE = re.compile(r"\b((tenant|you|renter|resident)s? pays?|separate(ly)?|not included|extra|on you)\b", re.I)
+_NO_FEE_RE = re.compile(r"\b(no (application |broker |admin |move[- ]in )?fees?|no fee|free|none|nothing|waived)\b", re.I)
+_PARKING_YES_RE = re.compile(r"\b(garage|driveway|lot|spots?|spaces?|street parking|covered|assigned|carport)\b", re.I)
+_PETS_YES_RE = re.compile(r"\b(pet[- ]friendly|dogs? (are )?(ok|okay|fine|welcome)|cats? (are )?(ok|okay|fine|welcome))\b", re.I)
+_RENOVATED_RE = re.compile(r"\b(renovated|remodeled|updated|new|replaced|redone|painted|upgraded|refinished)\b", re.I)
+_UNRENOVATED_RE = re.compile(r"\b(original|nothing (major|recent)?|as is)\b", re.I)
+
+_MONTH_TO_MONTH_RE = re.compile(r"\bmonth[- ]to[- ]month\b", re.I)
+_DURATION_RE = re.compile(rf"\b(\d+|{_NUMBER_WORD}|twenty[- ]four)[- ](months?|years?|weeks?)\b", re.I)
+_YEAR_LEASE_RE = re.compile(r"\b(year(ly)? lease|annual|yearly|a year|one year)\b", re.I)
+
+_MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+_ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "tenth": 10, "fifteenth": 15,
+             "twentieth": 20}
+_NOW_RE = re.compile(r"\b(now|today|immediately|asap|right away|any ?time|vacant|empty)\b", re.I)
+_ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_SLASH_DATE_RE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")
+_MONTH_DATE_RE = re.compile(
+    r"\b(" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\.?(?:\s+(?:the\s+)?(\d{1,2})(?:st|nd|rd|th)?)?"
+    r"(?:,?\s+(\d{4}))?\b", re.I)
+_DAY_OF_MONTH_RE = re.compile(
+    r"\b(?:the\s+)?(\d{1,2}(?:st|nd|rd|th)|" + "|".join(_ORDINALS) + r")(?:\s+of\s+(next|this|the)\s+month)?\b", re.I)
+_END_OF_MONTH_RE = re.compile(r"\bend of (the |this |next )?month\b", re.I)
+_RELATIVE_RE = re.compile(rf"\b(?:in\s+)?(\d+|{_NUMBER_WORD})\s+(days?|weeks?)\b|\b(tomorrow|next week|next month)\b",
+                          re.I)
+
+
+def question_key(question: str) -> str:
+    key = DEFAULT_QUESTION_KEYS.get(question)
+    if key:
+        return key
+    return _SLUG_RE.sub("_", question.lower()).strip("_")[:64] or "question"
+
+
+def _number(text: str) -> float:
+    return float(text.replace(",", ""))
+
+
+def _count(word: str) -> int:
+    word = word.lower()
+    if word.isdigit():
+        return int(word)
+    if word.startswith("twenty") and word != "twenty":  # twenty-four
+        return 24
+    return _NUMBER_WORDS.get(word, 1)
+
+
+def _words_to_number(words: str) -> Optional[float]:
+    total, current = 0, 0
+    for word in re.findall(r"[a-z]+", words.lower()):
+        if word in _NUMBER_WORDS:
+            current += _NUMBER_WORDS[word]
+        elif word == "hundred":
+            current = max(current, 1) * 100
+        elif word == "thousand":
+            total += max(current, 1) * 1000
+            current = 0
+    return float(total + current) or None
+
+
+def money(text: str) -> Optional[float]:
+    """
+    First dollar amount: "$3,200", "$1.5k", "45 dollars", "fifty dollars", "a hundred".
+    """
+    m = _MONEY_RE.search(text)
+    if m:
+        value = _number(m.group(1) or m.group(3))
+        return value * 1000 if m.group(2) else value
+    m = _WORD_AMOUNT_RE.search(text)
+    if m:
+        value = _words_to_number(m.group(1) + " " + m.group(2))
+        if value and (m.group(2).lower() in ("dollar", "dollars", "bucks") or value >= 100):
+            return value
+    return None
+
+
+def fee_amount(text: str) -> Optional[float]:
+    """
+    money(), else a bare amount right after a fee word ("application fee is 50").
+    """
+    value = money(text)
+    if value is None:
+        m = _FEE_AMOUNT_RE.search(text)
+        if m:
+            value = _number(m.group(1)) * (1000 if m.group(2) else 1)
+    return value
+
+
+def period(text: str) -> Optional[str]:
+    if _MONTHLY_RE.search(text):
+        return "month"
+    if _ONCE_RE.search(text):
+        return "once"
+    return None
+
+
+def _flip(side: str) -> str:
+    return "no" if side == "yes" else "yes"
+
+
+def yes_no(text: str, yes_re: Optional["re.Pattern"] = None, no_re: Optional["re.Pattern"] = None) -> Optional[str]:
+    """
+    "yes" or "no" from the first word that takes a side (or the question's own yes/no phrases);
+    a negation flips the word or phrase right after it ("not included" is no, "not rented" yes)
+    and is a "no" on its own; a leading "no"/"none" flips the yes-words of its clause ("no pets
+    allowed" is no, "no, but cats are allowed" conditional). "conditional" when the answer takes
+    both sides, qualifies a yes ("but", "only", "under 40 lbs") or says what it depends on. None
+    when it takes no side, and for hedges ("not sure", "I don't know", "let me check") that say
+    nothing else.
+    """
+    depends = _DEPENDS_ON_RE.search(text)
+    text = HEDGE_RE.sub(" ", text.lower())
+    words = list(_WORD_RE.finditer(text))
+    no_clauses = []  # (start, end) of the text a leading "no"/"none" applies to
+    for w in words:
+        if w.group() in _NO_QUANTIFIERS:
+            end = _CLAUSE_END_RE.search(text, w.end())
+            no_clauses.append((w.end(), end.start() if end else len(text)))
+
+    def in_no_clause(pos: int) -> bool:
+        return any(start <= pos < end for start, end in no_clauses)
+
+    sides = []  # (position, side)
+    phrase_starts = set()
+    for pattern, side in ((yes_re, "yes"), (no_re, "no")):
+        if pattern is None:
+            continue
+        for m in pattern.finditer(text):
+            first = next((i for i, w in enumerate(words) if w.start() >= m.start()), None)
+            negated = first is not None and first > 0 and words[first - 1].group() in _NEGATIONS
+            if side == "yes" and in_no_clause(m.start()):
+                negated = not negated
+            sides.append((m.start(), _flip(side) if negated else side))
+            if first is not None:
+                phrase_starts.add(first)
+    for i, w in enumerate(words):
+        word = w.group()
+        negated = i > 0 and words[i - 1].group() in _NEGATIONS
+        if word in _NEGATIONS:
+            following = words[i + 1].group() if i + 1 < len(words) else None
+            if following not in _YES and following not in _NO and i + 1 not in phrase_starts:
+                sides.append((w.start(), "no"))
+        elif word in _NO:
+            sides.append((w.start(), "yes" if negated else "no"))
+        elif word in _YES:
+            if in_no_clause(w.start()):
+                negated = not negated
+            sides.append((w.start(), "no" if negated else "yes"))
+    sides = [side for _, side in sorted(sides)]
+    if not sides:
+        return "conditional" if depends or _CONDITIONAL_RE.search(text) else None
+    if "yes" in sides and "no" in sides:
+        return "conditional"
+    if sides[0] == "yes" and _CONDITIONAL_RE.search(text):
+        return "conditional"
+    return sides[0]
+
+
+def _add_months(d: date, months: int) -> date:
+    month = d.month - 1 + months
+    year = d.year + month // 12
+    month = month % 12 + 1
+    return d.replace(year=year, month=month, day=min(d.day, calendar.monthrange(year, month)[1]))
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def move_in_date(text: str, today: date) -> Tuple[Optional[str], Optional[date]]:
+    """
+    (value_text, value_date) of a move-in answer. A date without a year is the next one on or after today.
+    """
+    m = _ISO_DATE_RE.search(text)
+    if m:
+        return None, _safe_date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    m = _MONTH_DATE_RE.search(text)
+    if m and not (m.group(1).lower() == "may" and not m.group(2) and not m.group(3)):  # "may" is usually the verb
+        month, day = _MONTHS[m.group(1).lower()], int(m.group(2) or 1)
+        d = _safe_date(int(m.group(3)) if m.group(3) else today.year, month, day)
+        if d and not m.group(3) and d < today:
+            d = _safe_date(today.year + 1, month, day)
+        return None, d
+    m = _SLASH_DATE_RE.search(text)
+    if m:
+        year = int(m.group(3)) if m.group(3) else today.year
+        year += 2000 if year < 100 else 0
+        d = _safe_date(year, int(m.group(1)), int(m.group(2)))
+        if d and not m.group(3) and d < today:
+            d = _safe_date(year + 1, int(m.group(1)), int(m.group(2)))
+        return None, d
+    if _END_OF_MONTH_RE.search(text):
+        base = _add_months(today.replace(day=1), 1 if "next" in text.lower() else 0)
+        return None, base.replace(day=calendar.monthrange(base.year, base.month)[1])
+    m = _DAY_OF_MONTH_RE.search(text)
+    if m:
+        token = m.group(1).lower()
+        day = _ORDINALS.get(token) or int(token[:-2])
+        base = today.replace(day=1)
+        if (m.group(2) or "").lower() == "next" or (m.group(2) or "").lower() != "this" and day < today.day:
+            base = _add_months(base, 1)
+        return None, _safe_date(base.year, base.month, day)
+    m = _RELATIVE_RE.search(text)
+    if m:
+        phrase = (m.group(3) or "").lower()
+        if phrase == "tomorrow":
+            return None, today + timedelta(days=1)
+        if phrase == "next week":
+            return None, today + timedelta(days=7)
+        if phrase == "next month":
+            return None, _add_months(today.replace(day=1), 1)
+        n = _count(m.group(1))
+        return None, today + timedelta(days=n * (7 if m.group(2).lower().startswith("week") else 1))
+    if _NOW_RE.search(text):
+        return "now", today
+    return None, None
+
+
+def lease_months(text: str) -> Tuple[Optional[str], Optional[float]]:
+    """
+    (value_text, value_months) of a lease-term answer: a fixed term (renewing month to month
+    after it or not), else month_to_month (1 month).
+    """
+    m = _DURATION_RE.search(text)
+    if m:
+        n, unit = _count(m.group(1)), m.group(2).lower()
+        months = n * 12 if unit.startswith("year") else n / 4.345 if unit.startswith("week") else n
+        return "fixed", round(float(months), 2)
+    if _YEAR_LEASE_RE.search(text):
+        return "fixed", 12.0
+    if _MONTH_TO_MONTH_RE.search(text):
+        return "month_to_month", 1.0
+    return None, None
+
+
+def _generic(text: str, today: date) -> Dict[str, Any]:
+    value_num = money(text)
+    if value_num is None:
+        m = _NUMBER_RE.search(text)
+        if m:
+            value_num = _number(m.group(1)) * (1000 if m.group(2) else 1)
+    return {"value_text": yes_no(text), "value_num": value_num}
+
+
+def _available(text: str, today: date) -> Dict[str, Any]:
+    return {"value_text": yes_no(text, _AVAILABLE_RE, _UNAVAILABLE_RE)}
+
+
+def _move_in(text: str, today: date) -> Dict[str, Any]:
+    value_text, value_date = move_in_date(text, today)
+    return {"value_text": value_text, "value_date": value_date}
+
+
+def _utilities(text: str, today: date) -> Dict[str, Any]:
+    return {"value_text": yes_no(text, no_re=_TENANT_PAYS_RE)}
+
+
+def _fees(text: str, today: date) -> Dict[str, Any]:
+    amount = fee_amount(text)
+    if amount is not None:
+        return {"value_text": "yes", "value_num": amount, "value_period": period(text) or "once"}
+    if _NO_FEE_RE.search(text):
+        return {"value_text": "no", "value_num": 0.0}
+    return {"value_text": yes_no(text) or ("yes" if _FEE_RE.search(text) else None)}
+
+
+def _lease_term(text: str, today: date) -> Dict[str, Any]:
+    value_text, months = lease_months(text)
+    return {"value_text": value_text, "value_months": months}
+
+
+def _costed(yes_re: "re.Pattern") -> Callable[[str, date], Dict[str, Any]]:
+    def extract(text: str, today: date) -> Dict[str, Any]:
+        amount = fee_amount(text)
+        if amount is None:
+            return {"value_text": yes_no(text, yes_re)}
+        # a price means it is offered
+        return {"value_text": yes_no(text, yes_re) or "yes", "value_num": amount, "value_period": period(text)}
+    return extract
+
+
+def _renovations(text: str, today: date) -> Dict[str, Any]:
+    year = _YEAR_RE.search(text)
+    return {"value_text": yes_no(text, _RENOVATED_RE, _UNRENOVATED_RE),
+            "value_num": float(year.group(1)) if year else None}
+
+
+EXTRACTORS: Dict[str, Callable[[str, date], Dict[str, Any]]] = {
+    "available": _available,
+    "move_in": _move_in,
+    "utilities": _utilities,
+    "fees": _fees,
+    "lease_term": _lease_term,
+    "pets": _costed(_PETS_YES_RE),
+    "parking": _costed(_PARKING_YES_RE),
+    "renovations": _renovations,
+}
+
+
+def extract(question: str, text: Optional[str], today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Typed values (VALUE_FIELDS, None when not found) of an answer, by its question's extractor.
+    """
+    out = dict.fromkeys(VALUE_FIELDS)
+    if text:
+        extractor = EXTRACTORS.get(question_key(question), _generic)
+        out.update(extractor(text, today or date.today()))
+    return out
+
+
+def extract_value(text: Optional[str]) -> Tuple[Optional[str], Optional[float]]:
+    """
+    (value_text, value_num) for an answer to a question without its own extractor: the first
+    yes/no word decides value_text; value_num is the first dollar amount, else the first number.
+    """
+    values = _generic(text, date.today()) if text else {}
+    return values.get("value_text"), values.get("value_num")
+
+
+def answer_facts(answers: Dict[str, str], today: Optional[date] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    {question_key: {field: value}} of a conversation's answers, JSON-ready (dates as ISO strings),
+    without the fields that were not found.
+    """
+    facts = {}
+    for question, raw in (answers or {}).items():
+        values = {k: v.isoformat() if isinstance(v, date) else v
+                  for k, v in extract(question, raw, today).items() if v is not None}
+        if values:
+            facts[question_key(question)] = values
+    return facts
+
+
+def answer_rows(call_sid: str, listing_id: Optional[str], answers: Dict[str, str],
+                today: Optional[date] = None) -> List[Dict]:
+    """
+    Rows for the answers table from a conversation's {question: answer} dict.
+    """
+    rows = []
+    for question, raw in (answers or {}).items():
+        rows.append(dict({
+            "call_sid": call_sid,
+            "listing_id": listing_id or None,
+            "question_key": question_key(question),
+            "question": question,
+            "raw_text": raw,
+        }, **extract(question, raw, today)))
+    return rows
+
+
+if __name__ == "__main__":
+    import logging
+    from apps.storage.db import session_scope
+    from apps.storage.repositories import AnswerRepository
+
+    logging.basicConfig(level=logging.INFO)
+    with session_scope(write=True) as db:
+        count = AnswerRepository(db).backfill()
+    logging.getLogger(__name__).info("Backfilled answers for %d conversations", count)
@@ -0,0 +1,169 @@
+"""
+Cache of LLM clarification prompts, keyed on (normalized question, normalized short answer).
+
+Landlords give the same vague answers ("yeah", "maybe", "not sure") to the same questions
+over and over, and the clarification the LLM writes for them depends on nothing else, so
+it is generated once and reused. Only short answers are cached (CLARIFY_CACHE_MAX_ANSWER_WORDS);
+a longer answer carries specifics the clarification should respond to. Fallback templates
+are never cached, so a slow LLM does not pin the template in place.
+
+Entries sit in an in-process LRU with TTL and, with CLARIFY_CACHE_REDIS, in a shared Redis
+tier. Pre-warm the cache for DEFAULT_QUESTIONS x COMMON_VAGUE_ANSWERS with:
+    python -m apps.conversation.clarifications        # fills the Redis tier
+or in-process at API startup with CLARIFY_CACHE_WARM_ON_STARTUP.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from apps.conversation.llm import get_llm_client
+from apps.conversation.prompts import DEFAULT_QUESTIONS
+from apps.storage.cache import TieredCache, build_cache
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+COMMON_VAGUE_ANSWERS = [
+    "yes", "no", "maybe", "not sure", "i don't know", "i think so", "i guess", "probably",
+    "it depends", "sometimes", "i'd have to check", "let me check", "ok", "sure", "um",
+]
+
+# spellings that call for the same clarification
+ANSWER_SYNONYMS = {
+    "yeah": "yes", "yea": "yes", "yep": "yes", "yup": "yes", "ya": "yes",
+    "nope": "no", "nah": "no",
+    "dunno": "i don't know", "idk": "i don't know", "i dont know": "i don't know",
+    "okay": "ok", "k": "ok", "uh": "um", "uhh": "um", "umm": "um", "hmm": "um",
+    "depends": "it depends", "perhaps": "maybe",
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9' ]+")
+_SPACES = re.compile(r"\s+")
+
+_clarifier: Optional["Clarifier"] = None
+
+
+def normalize_question(question: str) -> str:
+    return _SPACES.sub(" ", (question or "").strip().lower()).rstrip(" ?.!")
+
+
+def normalize_answer(answer: str) -> str:
+    text = (answer or "").lower().replace("’", "'")
+    text = _SPACES.sub(" ", _NON_WORD.sub(" ", text)).strip(" '")
+    return ANSWER_SYNONYMS.get(text, text)
+
+
+def clarification_key(question: str, answer: str) -> Optional[Tuple[str, str]]:
+    """
+    Cache key for a clarification, or None when the answer is too long to share one.
+    """
+    normalized = normalize_answer(answer)
+    if len(normalized.split()) > settings.CLARIFY_CACHE_MAX_ANSWER_WORDS:
+        return None
+    return normalize_question(question), normalized
+
+
+def clarification_messages(question: str, answer: str) -> List[Dict[str, str]]:
+    prompt = f"""
+You are a rental inquiry assistant. You asked: "{question}".
+The user gave a vague answer: "{answer}".
+Generate a polite clarification question to get more detail.
+"""
+    return [{"role": "system", "content": "You clarify vague answers."},
+            {"role": "user", "content": prompt}]
+
+
+class Clarifier:
+    """
+    Clarification prompts from the cache, else from the LLM's fast tier (then cached),
+    else the caller's fallback. Counts hits, misses and answers too long to cache.
+    Runs inside the Twilio webhook, so the cache is read and written with its async forms:
+    a Redis round trip never blocks the event loop.
+    """
+
+    def __init__(self, cache: TieredCache):
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    async def clarify(self, question: str, answer: str, fallback: Optional[str] = None) -> str:
+        key = clarification_key(question, answer)
+        if key is None:
+            self.uncacheable += 1
+        else:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = await get_llm_client().complete(
+            "clarify", clarification_messages(question, answer), temperature=0.7, max_tokens=100, fallback=fallback,
+        )
+        if key is not None and not result.fallback:
+            await self.cache.aset(key, result.text)
+        return result.text
+
+    async def warm(self, questions: Iterable[str] = DEFAULT_QUESTIONS,
+                   answers: Iterable[str] = COMMON_VAGUE_ANSWERS, concurrency: int = 4) -> int:
+        """
+        Generate and cache clarifications for every (question, answer) pair not cached yet.
+        Pairs that fail are skipped. Returns how many were added.
+        """
+        pending = {}
+        for q in questions:
+            for a in answers:
+                key = clarification_key(q, a)
+                if key is not None and key not in pending and await self.cache.aget(key) is None:
+                    pending[key] = (q, a)
+        gate = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(key, q, a) -> bool:
+            async with gate:
+                result = await get_llm_client().complete(
+                    "clarify", clarification_messages(q, a), temperature=0.7, max_tokens=100, fallback="",
+                )
+            if result.fallback:
+                return False
+            await self.cache.aset(key, result.text)
+            return True
+
+        added = await asyncio.gather(*(one(key, q, a) for key, (q, a) in pending.items()))
+        logger.info("Clarification cache warmed: %d of %d pairs added", sum(added), len(pending))
+        return sum(added)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncacheable": self.uncacheable,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "cache": self.cache.stats(),
+        }
+
+
+def get_clarifier() -> Clarifier:
+    """
+    Process-wide clarifier (in-process LRU, plus Redis when CLARIFY_CACHE_REDIS is set).
+    """
+    global _clarifier
+    if _clarifier is None:
+        _clarifier = Clarifier(build_cache(
+            "clarify",
+            max_entries=settings.CLARIFY_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.CLARIFY_CACHE_TTL_SECONDS,
+            use_redis=settings.CLARIFY_CACHE_REDIS,
+            redis_url=str(settings.REDIS_URL or ""),
+        ))
+    return _clarifier
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if not settings.CLARIFY_CACHE_REDIS:
+        logger.warning("CLARIFY_CACHE_REDIS is off; the warmed entries will not outlive this process")
+    asyncio.run(get_clarifier().warm())
@@ -1,8 +1,6 @@
-import openai
 from enum import Enum, auto
-from config.settings import settings
-
-openai.api_key = settings.OPENAI_API_KEY
+from apps.conversation.adequacy import needs_clarification
+from apps.conversation.clarifications import get_clarifier
 
 class DialogueState(Enum):
     INTRO = auto()
@@ -14,9 +12,11 @@ class DialogueState(Enum):
 class GPTDialogueManager:
     """
     GPT-powered dialogue manager:
-    - Uses GPT-4 to interpret ambiguous answers.
+    - Uses GPT to interpret ambiguous answers.
     - Generates clarifications or follow-up questions dynamically.
     - Produces natural prompts instead of fixed strings.
+    Clarifications come from the clarification cache (apps/conversation/clarifications.py), else
+    the shared LLM client's fast tier; when it runs out of its latency budget the template is used.
     """
 
     def __init__(self, listing_context, questions):
@@ -26,9 +26,26 @@ class GPTDialogueManager:
         self.state = DialogueState.INTRO
         self.current_index = 0
 
+    async def anext_prompt(self, last_response: str = None) -> str:
+        """
+        Generate the next prompt; a clarification is asked of the LLM within its latency budget.
+        """
+        if self.state != DialogueState.CLARIFY:
+            return self.next_prompt(last_response)
+        return await get_clarifier().clarify(
+            self.questions[self.current_index], last_response or "", fallback=self.template_clarification(),
+        )
+
+    def template_clarification(self) -> str:
+        """
+        Deterministic clarification, used without an LLM or when it is too slow.
+        """
+        return f"Sorry, I didn't quite catch that. Could you tell me a bit more about this: {self.questions[self.current_index]}"
+
     def next_prompt(self, last_response: str = None) -> str:
         """
-        Generate the next prompt using GPT-4.
+        Generate the next prompt without network calls; a clarification is the template one
+        (anext_prompt asks the LLM).
         """
         if self.state == DialogueState.INTRO:
             addr = self.listing.get("address") or self.listing.get("title") or "the rental"
@@ -38,19 +55,7 @@ class GPTDialogueManager:
             return self.questions[self.current_index]
 
         if self.state == DialogueState.CLARIFY:
-            # Ask GPT to generate a clarification prompt
-            prompt = f"""
-You are a rental inquiry assistant. The user gave a vague answer: "{last_response}".
-Generate a polite clarification question to get more detail.
-"""
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "system", "content": "You clarify vague answers."},
-                          {"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=100
-            )
-            return response.choices[0].message["content"].strip()
+            return self.template_clarification()
 
         if self.state == DialogueState.WRAPUP:
             return "Thank you for your time. I will summarize our conversation and follow up if needed."
@@ -68,7 +73,7 @@ Generate a polite clarification question to get more detail.
         if self.state == DialogueState.ASKING:
             q = self.questions[self.current_index]
             self.answers[q] = text or ""
-            if not text or len(text.strip()) < 4:
+            if needs_clarification(q, text):
                 self.state = DialogueState.CLARIFY
                 return
             self.current_index += 1
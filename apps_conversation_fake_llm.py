@@ -0,0 +1,122 @@
+"""
+Local fake of the OpenAI-compatible chat completions API used by LlmClient, for tests and
+offline development.
+
+Implements:
+- POST /v1/chat/completions   canned completion echoing the model, with token usage
+
+Each request waits `delay` seconds first (or the per-model delay from `delays`), so callers
+can exercise latency budgets and fallbacks; `fail` answers every request with a 500.
+
+Usage:
+    python -m apps.conversation.fake_llm --port 8766 --delay 0.2
+    # then LLM_BASE_URL=http://127.0.0.1:8766/v1
+
+In tests:
+    with FakeLlmServer(delays={"gpt-4o-mini": 5.0}) as server:
+        client = LlmClient(base_url=server.url + "/v1", api_key="test")
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+
+def completion(model: str, messages: List[Dict], reply: Optional[str] = None) -> Dict:
+    text = reply or f"Could you tell me a little more about that? ({model})"
+    prompt_tokens = sum(len((m.get("content") or "").split()) for m in messages)
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(text.split()),
+            "total_tokens": prompt_tokens + len(text.split()),
+        },
+    }
+
+
+class FakeLlmServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0,
+                 delays: Optional[Dict[str, float]] = None, reply: Optional[str] = None, fail: bool = False):
+        self.delay = delay
+        self.delays = delays or {}
+        self.reply = reply
+        self.fail = fail
+        self.requests: List[Dict] = []
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLlmServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                pass
+
+            def _send(self, status: int, payload) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests.append(payload)
+                if path.rstrip("/") != "/v1/chat/completions":
+                    return self._send(404, {"error": {"message": "not found"}})
+                model = payload.get("model", "")
+                time.sleep(server.delays.get(model, server.delay))
+                if server.fail:
+                    return self._send(500, {"error": {"message": "fake failure"}})
+                self._send(200, completion(model, payload.get("messages") or [], server.reply))
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before each response")
+    parser.add_argument("--reply", default=None, help="fixed completion text")
+    parser.add_argument("--fail", action="store_true", help="answer every request with a 500")
+    args = parser.parse_args()
+    fake = FakeLlmServer(args.host, args.port, delay=args.delay, reply=args.reply, fail=args.fail)
+    print(f"Fake LLM listening on {fake.url}")
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
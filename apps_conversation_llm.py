@@ -0,0 +1,199 @@
+"""
+Shared async LLM client for the conversation code paths.
+
+Every call names a task, and the task picks its latency tier: a fast model with a tight
+budget for clarifications asked while the landlord waits on the line, a larger model with
+a generous budget for summaries. A call that runs past its budget (or fails) is cut off
+and, when the caller gave one, answered with a deterministic fallback instead, so a
+Twilio webhook always responds in time.
+
+Requests go to an OpenAI-compatible /chat/completions endpoint at LLM_BASE_URL; point it
+at the local fake (apps/conversation/fake_llm.py) for tests and offline development.
+stats() reports per-model latency and token histograms, timeouts, errors and fallbacks.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 5000, 10000, 30000)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096)
+
+
+@dataclass
+class LlmTier:
+    model: str
+    budget_ms: float
+
+
+def task_tiers() -> Dict[str, LlmTier]:
+    return {
+        "clarify": LlmTier(settings.LLM_FAST_MODEL, settings.LLM_CLARIFY_BUDGET_MS),
+        "summary": LlmTier(settings.LLM_LARGE_MODEL, settings.LLM_SUMMARY_BUDGET_MS),
+    }
+
+
+class LlmUnavailable(Exception):
+    """
+    Raised when a call without a fallback ran out of budget or failed.
+    """
+
+
+@dataclass
+class LlmResult:
+    text: str
+    model: str
+    latency_ms: float
+    fallback: bool = False  # text is the caller's fallback, not a completion
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += value
+        self.n += 1
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+        return {"count": self.n, "avg": self.total / self.n if self.n else 0.0, "histogram": dict(zip(labels, self.counts))}
+
+
+class ModelMetrics:
+    def __init__(self):
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.completion_tokens = Histogram(TOKEN_BUCKETS)
+        self.timeouts = 0
+        self.errors = 0
+        self.fallbacks = 0
+
+    def snapshot(self) -> Dict:
+        return {
+            "latency_ms": self.latency_ms.snapshot(),
+            "prompt_tokens": self.prompt_tokens.snapshot(),
+            "completion_tokens": self.completion_tokens.snapshot(),
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+        }
+
+
+class LlmClient:
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        self.base_url = (base_url or settings.LLM_BASE_URL).rstrip("/")
+        self.api_key = settings.OPENAI_API_KEY if api_key is None else api_key
+        # an AsyncClient is bound to the loop it was created on; background workers may run their own
+        # loop, so there is one pooled client per loop, and none is replaced while its loop runs
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+        self._metrics: Dict[str, ModelMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                limits=httpx.Limits(max_connections=settings.LLM_MAX_CONNECTIONS),
+                timeout=httpx.Timeout(max(tier.budget_ms for tier in task_tiers().values()) / 1000),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        """
+        Close the client of the running loop.
+        """
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def _model_metrics(self, model: str) -> ModelMetrics:
+        with self._lock:
+            return self._metrics.setdefault(model, ModelMetrics())
+
+    async def complete(self, task: str, messages: List[Dict[str, str]], temperature: float = 0.3,
+                       max_tokens: int = 200, fallback: Optional[str] = None,
+                       budget_ms: Optional[float] = None) -> LlmResult:
+        """
+        Run a chat completion for `task` within its tier's budget (or `budget_ms`, for a request
+        that asks for several replies' worth of output). On timeout or error returns `fallback`
+        (LlmResult.fallback set) when given, else raises LlmUnavailable.
+        """
+        tier = task_tiers()[task]
+        budget_ms = tier.budget_ms if budget_ms is None else budget_ms
+        metrics = self._model_metrics(tier.model)
+        payload = {"model": tier.model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        started = time.perf_counter()
+        try:
+            resp = await asyncio.wait_for(self._http().post("/chat/completions", json=payload, timeout=budget_ms / 1000),
+                                          timeout=budget_ms / 1000)
+            resp.raise_for_status()
+            body = resp.json()
+            text = body["choices"][0]["message"]["content"].strip()
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            # the budget is also httpx's timeout, which may fire first
+            metrics.timeouts += 1
+            return self._fallback(task, tier, metrics, started, fallback, "budget of %.0f ms exceeded" % budget_ms)
+        except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+            metrics.errors += 1
+            return self._fallback(task, tier, metrics, started, fallback, e)
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        usage = body.get("usage") or {}
+        with self._lock:
+            metrics.latency_ms.observe(latency_ms)
+            if "prompt_tokens" in usage:
+                metrics.prompt_tokens.observe(usage["prompt_tokens"])
+            if "completion_tokens" in usage:
+                metrics.completion_tokens.observe(usage["completion_tokens"])
+        return LlmResult(text=text, model=tier.model, latency_ms=latency_ms)
+
+    def _fallback(self, task: str, tier: LlmTier, metrics: ModelMetrics, started: float,
+                  fallback: Optional[str], reason) -> LlmResult:
+        latency_ms = (time.perf_counter() - started) * 1000
+        if fallback is None:
+            logger.warning("LLM %s on %s failed after %.0f ms: %s", task, tier.model, latency_ms, reason)
+            raise LlmUnavailable(f"{task} on {tier.model}: {reason}")
+        metrics.fallbacks += 1
+        logger.info("LLM %s on %s fell back after %.0f ms: %s", task, tier.model, latency_ms, reason)
+        return LlmResult(text=fallback, model=tier.model, latency_ms=latency_ms, fallback=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            models = {name: m.snapshot() for name, m in self._metrics.items()}
+        tiers = {task: {"model": t.model, "budget_ms": t.budget_ms} for task, t in task_tiers().items()}
+        return {"tiers": tiers, "models": models}
+
+
+_client: Optional[LlmClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LlmClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LlmClient()
+        return _client
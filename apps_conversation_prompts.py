@@ -1,4 +1,4 @@
- DEFAULT_QUESTIONS = [
+DEFAULT_QUESTIONS = [
     "Is the unit still available?",
     "What is the earliest move-in date?",
     "Are utilities included in the rent?",
@@ -0,0 +1,206 @@
+"""
+Hot store of live call sessions for the Twilio webhook, keyed by CallSid.
+
+A session holds what a turn needs: the listing context, the question list and the
+dialogue state and answers (with their typed facts, apps/conversation/answers.py),
+plus (in-process only) the live GPTDialogueManager.
+Sessions sit in an in-process LRU with TTL eviction and, with SESSION_STORE_REDIS,
+in a shared Redis tier so any worker can serve the next turn. The database is only
+written behind the store (apps/telephony/webhooks.py), so a turn served from the
+store makes no database round trip.
+"""
+
+import logging
+from dataclasses import asdict, dataclass, field
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from apps.conversation.answers import answer_facts, question_key
+from apps.conversation.gpt_dialogue_manager import GPTDialogueManager, DialogueState
+from apps.conversation.transcripts import turn_event
+from apps.storage.cache import RedisTier, TTLCache
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_session_store: Optional["SessionStore"] = None
+
+
+@dataclass
+class CallSession:
+    call_sid: str
+    listing_id: str
+    listing_context: Dict[str, Any] = field(default_factory=dict)  # address/title; empty when the listing is unknown
+    questions: List[str] = field(default_factory=list)
+    state: str = "INTRO"
+    answers: Dict[str, str] = field(default_factory=dict)
+    facts: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # typed values per question_key, kept per turn
+    current_index: int = 0
+    turn: int = 0  # turns served; tells a stale in-process copy from the shared one
+    pending_turns: List[Dict[str, Any]] = field(default_factory=list)  # turn events not yet written to the DB
+    dm: Optional[GPTDialogueManager] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def restore(cls, call_sid: str, listing_id: str, listing_context: Dict[str, Any], questions: List[str],
+                state: Optional[str], answers: Optional[Dict[str, str]]) -> "CallSession":
+        """
+        Rebuild a session from a stored conversation. The question index is not stored, so it is
+        derived from the answers: one per answered question, less the one still being clarified.
+        """
+        answers = dict(answers or {})
+        index = sum(1 for q in questions if q in answers)
+        if state == "CLARIFY":
+            index = max(0, index - 1)
+        return cls(call_sid=call_sid, listing_id=listing_id, listing_context=listing_context,
+                   questions=list(questions), state=state or "INTRO", answers=answers, facts=answer_facts(answers),
+                   current_index=index)
+
+    def dialogue_manager(self) -> GPTDialogueManager:
+        """
+        The live dialogue manager, built from the session state on first use and then kept.
+        """
+        if self.dm is None:
+            dm = GPTDialogueManager(listing_context=self.listing_context, questions=self.questions)
+            try:
+                dm.state = DialogueState[self.state]
+            except KeyError:
+                pass
+            dm.answers = dict(self.answers)
+            dm.current_index = self.current_index
+            self.dm = dm
+        return self.dm
+
+    def capture(self, prompt: Optional[str] = None, speech_result: Optional[str] = None,
+                confidence: Optional[float] = None, llm_ms: Optional[float] = None,
+                total_ms: Optional[float] = None) -> None:
+        """
+        Copy the dialogue manager's state back into the session at the end of a turn, extract the
+        answered question's facts and buffer the turn's event in pending_turns.
+        """
+        dm = self.dialogue_manager()
+        question = None
+        if speech_result and self.state in ("ASKING", "CLARIFY") and self.current_index < len(self.questions):
+            question = self.questions[self.current_index]
+        self.pending_turns.append(turn_event(
+            self.turn, prompt, speech_result, confidence, self.state, dm.state.name,
+            question, dm.answers.get(question) if question else None, llm_ms=llm_ms, total_ms=total_ms,
+        ))
+        self.state = dm.state.name
+        self.answers = dict(dm.answers)
+        if question is not None:
+            key = question_key(question)
+            facts = answer_facts({question: self.answers.get(question, "")}).get(key)
+            if facts:
+                self.facts[key] = facts
+            else:
+                self.facts.pop(key, None)
+        self.current_index = dm.current_index
+        self.turn += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out.pop("dm", None)
+        return out
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CallSession":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__ and k != "dm"})
+
+
+class SessionStore:
+    """
+    In-process TTLCache of live sessions in front of an optional RedisTier of their snapshots.
+    With Redis, the shared snapshot is authoritative: the in-process session (and its dialogue
+    manager) is reused only while it is at the same turn, otherwise it is rebuilt from the snapshot.
+    The webhook uses the async forms (aget/aput/adiscard), which await Redis instead of blocking
+    the event loop; the sync ones are for threads (CallExecutor).
+    Without Redis, a session dropped from memory (LRU or TTL) while it still had turns not written
+    to the DB is kept for take_evicted(), so the webhook can flush it instead of losing the turns.
+    """
+
+    def __init__(self, memory: TTLCache, redis_tier: Optional[RedisTier] = None):
+        self.memory = memory
+        self.redis = redis_tier
+        self._evicted: List[Dict[str, Any]] = []
+        self._evicted_lock = Lock()
+        if redis_tier is None:  # with Redis the shared snapshot outlives the local copy
+            memory.on_evict = self._on_evict
+
+    def _on_evict(self, call_sid: str, session: CallSession) -> None:
+        if session.pending_turns:
+            logger.info("Session %s evicted with %d unwritten turns", call_sid, len(session.pending_turns))
+            with self._evicted_lock:
+                self._evicted.append(session.to_dict())
+
+    def take_evicted(self) -> List[Dict[str, Any]]:
+        """
+        Snapshots of evicted sessions with unwritten turns, handed out once; the caller flushes them.
+        """
+        with self._evicted_lock:
+            evicted, self._evicted = self._evicted, []
+        return evicted
+
+    def get(self, call_sid: str) -> Optional[CallSession]:
+        local = self.memory.get(call_sid)
+        if self.redis is None:
+            return local
+        return self._resolve(call_sid, local, self.redis.get(call_sid))
+
+    async def aget(self, call_sid: str) -> Optional[CallSession]:
+        local = self.memory.get(call_sid)
+        if self.redis is None:
+            return local
+        return self._resolve(call_sid, local, await self.redis.aget(call_sid))
+
+    def _resolve(self, call_sid: str, local: Optional[CallSession],
+                 data: Optional[Dict[str, Any]]) -> Optional[CallSession]:
+        if data is None:
+            return local
+        if local is not None and local.turn == data.get("turn"):
+            return local
+        session = CallSession.from_dict(data)
+        self.memory.set(call_sid, session)
+        return session
+
+    def put(self, session: CallSession) -> None:
+        self.memory.set(session.call_sid, session)
+        if self.redis is not None:
+            self.redis.set(session.call_sid, session.to_dict())
+
+    async def aput(self, session: CallSession) -> None:
+        self.memory.set(session.call_sid, session)
+        if self.redis is not None:
+            await self.redis.aset(session.call_sid, session.to_dict())
+
+    def discard(self, call_sid: str) -> None:
+        self.memory.pop(call_sid)
+        if self.redis is not None:
+            self.redis.delete(call_sid)
+
+    async def adiscard(self, call_sid: str) -> None:
+        self.memory.pop(call_sid)
+        if self.redis is not None:
+            await self.redis.adelete(call_sid)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"memory": self.memory.stats()}
+        if self.redis is not None:
+            out["redis"] = self.redis.stats()
+        return out
+
+
+def get_session_store() -> SessionStore:
+    """
+    Process-wide session store (in-process LRU, plus Redis when SESSION_STORE_REDIS is set).
+    """
+    global _session_store
+    if _session_store is None:
+        redis_tier = None
+        if settings.SESSION_STORE_REDIS and settings.REDIS_URL:
+            try:
+                redis_tier = RedisTier(str(settings.REDIS_URL), prefix="rental:session:",
+                                       ttl_seconds=settings.SESSION_TTL_SECONDS)
+            except ImportError:
+                logger.warning("redis package not installed; session store runs in-process only")
+        _session_store = SessionStore(TTLCache(settings.SESSION_MAX_ENTRIES, settings.SESSION_TTL_SECONDS), redis_tier)
+    return _session_store
@@ -1,27 +1,71 @@
-import openai
+import json
+import re
+from typing import Dict, List
+
+from apps.conversation.llm import get_llm_client
 from config.settings import settings
 
-openai.api_key = settings.OPENAI_API_KEY
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def _prompt(listing, answers: dict) -> str:
+    return f"""Listing: {listing.get('title') or listing.get('address') or 'Rental'}
+Answers:
+{answers}
+"""
 
-def summarize_conversation(listing, answers: dict) -> str:
+
+async def summarize_conversation(listing, answers: dict) -> str:
     """
-    Use GPT-4 to summarize the conversation answers into a concise paragraph.
+    Summarize the conversation answers into a concise paragraph on the LLM's large-model tier.
+    Raises LlmUnavailable when the model fails or runs out of its budget.
     """
     prompt = f"""
 Summarize the following rental inquiry conversation into a short paragraph.
 Do not list the questions. Focus only on the answers and key insights.
 
-Listing: {listing.get('title') or listing.get('address') or 'Rental'}
-Answers:
-{answers}
-"""
-    response = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[
+{_prompt(listing, answers)}"""
+    result = await get_llm_client().complete(
+        "summary",
+        [
             {"role": "system", "content": "You are a summarization assistant."},
             {"role": "user", "content": prompt}
         ],
         temperature=0.5,
         max_tokens=300
     )
-    return response.choices[0].message["content"].strip()
+    return result.text
+
+
+async def summarize_conversations(conversations: List[Dict]) -> Dict[str, str]:
+    """
+    Summarize several conversations ({"call_sid", "listing_context", "answers"}) in one request.
+    Returns {call_sid: summary} for the conversations the reply covered; the caller summarizes
+    the rest one by one. The reply is as long as that many single summaries, so the request gets
+    that many times the summary budget. Raises LlmUnavailable when the model fails or runs out of it.
+    """
+    sections = "\n".join(f"### {c['call_sid']}\n{_prompt(c['listing_context'], c['answers'])}" for c in conversations)
+    prompt = f"""
+Summarize each of the following rental inquiry conversations into a short paragraph.
+Do not list the questions. Focus only on the answers and key insights.
+Reply with only a JSON object mapping each conversation id (the ### heading) to its summary.
+
+{sections}"""
+    result = await get_llm_client().complete(
+        "summary",
+        [
+            {"role": "system", "content": "You are a summarization assistant."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.5,
+        max_tokens=300 * len(conversations),
+        budget_ms=settings.LLM_SUMMARY_BUDGET_MS * len(conversations),
+    )
+    try:
+        summaries = json.loads(_FENCE_RE.sub("", result.text.strip()))
+    except ValueError:
+        return {}
+    if not isinstance(summaries, dict):
+        return {}
+    wanted = {c["call_sid"] for c in conversations}
+    return {k: v.strip() for k, v in summaries.items() if k in wanted and isinstance(v, str) and v.strip()}
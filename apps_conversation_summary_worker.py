@@ -0,0 +1,222 @@
+"""
+Background summarization of finished calls.
+
+The Twilio webhook no longer summarizes on the call's last turn: the session flush marks
+the conversation's summary as pending (conversations.summary_status) and enqueues its
+CallSid here, and the TwiML goes back at once. The conversations table is the durable
+queue; the in-process queue only wakes the workers:
+
+- SUMMARY_CONCURRENCY workers take CallSids off the queue and gather up to
+  SUMMARY_BATCH_SIZE of them within SUMMARY_BATCH_WAIT_MS, so several finished calls can
+  share one LLM request (SUMMARY_BATCHING; conversations a batched reply misses are
+  summarized one by one).
+- A job is claimed with a conditional UPDATE pending -> running, so a CallSid enqueued
+  twice, or by two processes, is summarized once; a done summary is never redone.
+- A failed attempt goes back to pending and is retried with exponential backoff up to
+  SUMMARY_MAX_ATTEMPTS, then marked failed with its error.
+- recover() re-enqueues pending summaries and reclaims running ones older than
+  SUMMARY_STALE_SECONDS (their process died, or their batch failed after the claim); the
+  API runs it at startup and the workers every SUMMARY_RECOVER_INTERVAL_SECONDS.
+- A job is summarized with the listing context its session had, handed over with the
+  CallSid; a recovered job falls back to the conversation's listing row.
+
+Drain the pending summaries from a separate process (e.g. from cron) with:
+    python -m apps.conversation.summary_worker
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from apps.conversation.summarizer import summarize_conversation, summarize_conversations
+from apps.storage.async_repositories import AsyncConversationRepository
+from apps.storage.db import get_async_sessionmaker
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_worker: Optional["SummaryWorker"] = None
+
+
+class SummaryWorker:
+    def __init__(self, concurrency: Optional[int] = None, batch_size: Optional[int] = None,
+                 batch_wait_ms: Optional[float] = None, sessionmaker=None):
+        self.concurrency = max(1, concurrency or settings.SUMMARY_CONCURRENCY)
+        self.batch_size = max(1, batch_size or settings.SUMMARY_BATCH_SIZE)
+        self.batch_wait = (settings.SUMMARY_BATCH_WAIT_MS if batch_wait_ms is None else batch_wait_ms) / 1000
+        self._sessionmaker = sessionmaker
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._queued: Set[str] = set()
+        self._contexts: Dict[str, Dict[str, Any]] = {}  # listing context of the session, per CallSid
+        self.counts = {"enqueued": 0, "claimed": 0, "done": 0, "retried": 0, "failed": 0, "skipped": 0,
+                       "requests": 0, "batched_requests": 0}
+
+    def sessions(self):
+        return (self._sessionmaker or get_async_sessionmaker(write=True))()
+
+    def _ensure_started(self) -> asyncio.Queue:
+        # workers are tasks of the loop that enqueues; a new loop (tests, benchmarks) gets new ones
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._queued.clear()
+            self._loop = loop
+            self._tasks = [loop.create_task(self._run()) for _ in range(self.concurrency)]
+            self._tasks.append(loop.create_task(self._recover_periodically()))
+        return self._queue
+
+    def enqueue(self, call_sid: str, listing_context: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Wake a worker for a pending summary, with the call's listing context when the caller has it.
+        Must run on the event loop; False when already queued.
+        """
+        queue = self._ensure_started()
+        if listing_context:
+            self._contexts[call_sid] = listing_context
+        if call_sid in self._queued:
+            return False
+        self._queued.add(call_sid)
+        queue.put_nowait(call_sid)
+        self.counts["enqueued"] += 1
+        return True
+
+    async def recover(self) -> int:
+        """
+        Enqueue every pending summary (reclaiming stale running ones); returns how many.
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.SUMMARY_STALE_SECONDS)
+        async with self.sessions() as db:
+            call_sids = await AsyncConversationRepository(db).pending_summaries(stale_before)
+        for call_sid in call_sids:
+            self.enqueue(call_sid)
+        if call_sids:
+            logger.info("Recovered %d pending summaries", len(call_sids))
+        return len(call_sids)
+
+    async def _recover_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SUMMARY_RECOVER_INTERVAL_SECONDS)
+            try:
+                await self.recover()
+            except Exception:
+                logger.exception("Summary recovery failed")
+
+    async def drain(self) -> None:
+        """
+        Wait until the queue is empty and every taken batch is processed.
+        """
+        await self._ensure_started().join()
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            for call_sid in batch:
+                self._queued.discard(call_sid)
+            try:
+                await self.process(batch)
+            except Exception:
+                # claimed jobs stay running until recover() reclaims them as stale
+                logger.exception("Summary batch %s failed", batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def process(self, call_sids: List[str]) -> None:
+        """
+        Claim and summarize a batch, then record each result or schedule its retry.
+        """
+        async with self.sessions() as db:
+            jobs = await AsyncConversationRepository(db).claim_summaries(call_sids)
+        self.counts["claimed"] += len(jobs)
+        self.counts["skipped"] += len(call_sids) - len(jobs)
+        claimed = {job["call_sid"] for job in jobs}
+        for call_sid in call_sids:
+            if call_sid not in claimed:  # done or taken elsewhere
+                self._contexts.pop(call_sid, None)
+        if not jobs:
+            return
+        for job in jobs:
+            job["listing_context"] = self._contexts.get(job["call_sid"]) or job["listing_context"]
+
+        summaries, errors = await self._summarize(jobs)
+        async with self.sessions() as db:
+            repo = AsyncConversationRepository(db)
+            for job in jobs:
+                call_sid = job["call_sid"]
+                if call_sid in summaries:
+                    await repo.save_summary(call_sid, summaries[call_sid])
+                    self._contexts.pop(call_sid, None)
+                    self.counts["done"] += 1
+                    continue
+                final = job["attempts"] >= settings.SUMMARY_MAX_ATTEMPTS
+                await repo.fail_summary(call_sid, errors.get(call_sid, "no summary"), final)
+                if final:
+                    self._contexts.pop(call_sid, None)
+                    self.counts["failed"] += 1
+                    logger.warning("Giving up on the summary of call %s after %d attempts", call_sid, job["attempts"])
+                else:
+                    self.counts["retried"] += 1
+                    delay = settings.SUMMARY_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                    asyncio.get_running_loop().call_later(delay, self.enqueue, call_sid)
+
+    async def _summarize(self, jobs: List[Dict[str, Any]]):
+        summaries: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        if len(jobs) > 1 and settings.SUMMARY_BATCHING:
+            self.counts["requests"] += 1
+            self.counts["batched_requests"] += 1
+            try:
+                summaries.update(await summarize_conversations(jobs))
+            except Exception as e:
+                logger.warning("Batched summary of %d calls failed, summarizing one by one: %s", len(jobs), e)
+        rest = [job for job in jobs if job["call_sid"] not in summaries]
+        self.counts["requests"] += len(rest)
+        results = await asyncio.gather(*(summarize_conversation(job["listing_context"], job["answers"]) for job in rest),
+                                       return_exceptions=True)
+        for job, result in zip(rest, results):
+            if isinstance(result, Exception):
+                errors[job["call_sid"]] = f"{type(result).__name__}: {result}"
+            elif result:
+                summaries[job["call_sid"]] = result
+        return summaries, errors
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.counts, queued=self._queue.qsize() if self._queue is not None else 0)
+
+
+def get_summary_worker() -> SummaryWorker:
+    global _worker
+    if _worker is None:
+        _worker = SummaryWorker()
+    return _worker
+
+
+async def _drain_pending() -> None:
+    worker = get_summary_worker()
+    # retries re-enqueue themselves after their backoff; recover() picks up whatever is still pending
+    while await worker.recover():
+        await worker.drain()
+        await asyncio.sleep(settings.SUMMARY_RETRY_BASE_SECONDS)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_drain_pending())
+    logger.info("Summary worker: %s", get_summary_worker().stats())
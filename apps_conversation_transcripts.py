@@ -0,0 +1,84 @@
+"""
+Per-turn transcript log of calls.
+
+Every webhook turn appends one event: turn index, prompt, speech result, Twilio
+confidence, state transition, the question answered (with its answer after the turn)
+and timings. Events are buffered on the call session and written in batches
+(apps/telephony/webhooks.py); the conversation's state and answer rows are derived
+from each batch incrementally instead of rewriting the answers blob.
+
+Turns of finished calls are compressed into one archive row per call with:
+    python -m apps.conversation.transcripts
+"""
+
+import json
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+TURN_FIELDS = (
+    "turn", "prompt", "speech_result", "confidence", "state_from", "state_to",
+    "question", "answer", "llm_ms", "total_ms", "created_at",
+)
+
+
+def turn_event(turn: int, prompt: Optional[str], speech_result: Optional[str], confidence: Optional[float],
+               state_from: str, state_to: str, question: Optional[str], answer: Optional[str],
+               llm_ms: Optional[float] = None, total_ms: Optional[float] = None) -> Dict[str, Any]:
+    """
+    A turn event as buffered on the session; JSON-safe (created_at is epoch seconds) so it can sit in Redis.
+    """
+    return {
+        "turn": turn,
+        "prompt": prompt,
+        "speech_result": speech_result,
+        "confidence": confidence,
+        "state_from": state_from,
+        "state_to": state_to,
+        "question": question,
+        "answer": answer,
+        "llm_ms": None if llm_ms is None else round(llm_ms, 1),
+        "total_ms": None if total_ms is None else round(total_ms, 1),
+        "created_at": time.time(),
+    }
+
+
+def turn_row(call_sid: str, event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Row for the conversation_turns table from a buffered turn event.
+    """
+    row = {k: event.get(k) for k in TURN_FIELDS}
+    row["call_sid"] = call_sid
+    if isinstance(row["created_at"], (int, float)):
+        row["created_at"] = datetime.utcfromtimestamp(row["created_at"])
+    return row
+
+
+def answers_delta(events: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    {question: answer} as of the last of `events` that answered each question.
+    """
+    return {e["question"]: e.get("answer") or "" for e in events if e.get("question")}
+
+
+def compress_turns(turns: List[Dict[str, Any]]) -> bytes:
+    return zlib.compress(json.dumps(turns, separators=(",", ":"), default=str).encode("utf-8"), 9)
+
+
+def expand_turns(payload: bytes) -> List[Dict[str, Any]]:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+if __name__ == "__main__":
+    import logging
+    from datetime import timedelta
+    from apps.storage.db import session_scope
+    from apps.storage.repositories import ConversationRepository
+    from config.settings import settings
+
+    logging.basicConfig(level=logging.INFO)
+    older_than = datetime.utcnow() - timedelta(hours=settings.TRANSCRIPT_ARCHIVE_AFTER_HOURS)
+    with session_scope(write=True) as db:
+        count = ConversationRepository(db).archive_turns(older_than)
+    logging.getLogger(__name__).info("Archived turns of %d conversations", count)
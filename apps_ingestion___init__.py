@@ -1,5 +1,6 @@
 
 
+from .base_provider import ListingProvider, ResultsTruncated
 from .factory import create_provider
 
-__all__ = ["create_provider"]
+__all__ = ["ListingProvider", "ResultsTruncated", "create_provider"]
@@ -0,0 +1,159 @@
+"""
+Non-blocking Apify actor run manager.
+
+An actor run is started once; its default dataset is then paged with offset/limit while
+the run is still going, so the first items reach the mapper long before the run ends.
+Status polling backs off exponentially while the dataset has nothing new.
+
+Everything is async: the provider streams a run from the fan-out's event loop (or, for sync
+callers, the shared background loop of base_provider.iter_sync), so any number of searches
+can have actor runs in flight without parking a thread per run in time.sleep(). A run whose
+stream is closed or cancelled before it finished (the consumer stopped, the fan-out deadline
+fired) is aborted, so paid scraping stops with it.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from config.settings import settings
+from .base_provider import ResultsTruncated
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+
+
+class ApifyRunManager:
+    """
+    Starts actor runs and streams their dataset. The pagination cursor is
+    "<run_id>:<dataset_id>:<offset>", so a run can be resumed from any caller.
+    """
+
+    def __init__(self, token: str, base_url: Optional[str] = None):
+        self.token = token
+        self.base_url = (base_url or settings.APIFY_BASE_URL).rstrip("/")
+        # an AsyncClient is bound to the loop it was created on: one pooled client per loop
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+
+    def _http(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                # a header, not the token= query parameter: httpx logs full request URLs
+                headers={"Authorization": f"Bearer {self.token}"},
+                timeout=httpx.Timeout(15.0),
+                limits=httpx.Limits(max_connections=settings.APIFY_MAX_CONNECTIONS),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def start_run(self, actor_id: str, run_input: Dict) -> Dict:
+        resp = await self._http().post(f"/v2/acts/{actor_id}/runs", json=run_input)
+        resp.raise_for_status()
+        run = resp.json()["data"]
+        logger.info("Started Apify run %s for actor %s", run["id"], actor_id)
+        return run
+
+    async def run_status(self, run_id: str) -> str:
+        resp = await self._http().get(f"/v2/actor-runs/{run_id}")
+        resp.raise_for_status()
+        return resp.json()["data"]["status"]
+
+    async def abort_run(self, run_id: str) -> None:
+        """
+        Abort a run that is still going. Runs on cleanup paths, so failures are logged, not raised.
+        """
+        try:
+            resp = await self._http().post(f"/v2/actor-runs/{run_id}/abort")
+            resp.raise_for_status()
+            logger.info("Aborted Apify run %s", run_id)
+        except httpx.HTTPError as e:
+            logger.warning("Could not abort Apify run %s: %s", run_id, e)
+
+    async def dataset_items(self, dataset_id: str, offset: int, limit: int) -> List[Dict]:
+        resp = await self._http().get(f"/v2/datasets/{dataset_id}/items",
+                                      params={"offset": offset, "limit": limit, "clean": "true", "format": "json"})
+        resp.raise_for_status()
+        return resp.json()
+
+    async def next_page(self, actor_id: str, run_input: Dict, cursor: Optional[str], limit: int) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Return the next dataset page and the cursor after it. Starts the run when cursor is None.
+        Waits (with backoff) while the run is active and has produced nothing new; returns
+        ([], None) once the run succeeded and is drained. Raises ResultsTruncated when the run
+        ended otherwise (failed, aborted, timed out) or is still going after APIFY_RUN_TIMEOUT_SECONDS.
+        """
+        if cursor is None:
+            run = await self.start_run(actor_id, run_input)
+            run_id, dataset_id, offset = run["id"], run["defaultDatasetId"], 0
+        else:
+            run_id, dataset_id, raw_offset = cursor.split(":", 2)
+            offset = int(raw_offset)
+
+        delay = settings.APIFY_POLL_INITIAL_SECONDS
+        deadline = time.monotonic() + settings.APIFY_RUN_TIMEOUT_SECONDS
+        while True:
+            # read status before items: if the run was already finished, this read is complete
+            status = await self.run_status(run_id)
+            items = await self.dataset_items(dataset_id, offset, limit)
+            if items:
+                return items, f"{run_id}:{dataset_id}:{offset + len(items)}"
+            if status == "SUCCEEDED":
+                return [], None
+            if status in TERMINAL_STATUSES:
+                raise ResultsTruncated(f"Apify run {run_id} ended with status {status}")
+            if time.monotonic() >= deadline:
+                raise ResultsTruncated(f"Apify run {run_id} still {status} after {settings.APIFY_RUN_TIMEOUT_SECONDS}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.APIFY_POLL_MAX_SECONDS)
+
+    async def iter_pages(self, actor_id: str, run_input: Dict, page_size: int = 100) -> AsyncIterator[List[Dict]]:
+        """
+        Start a run and yield its dataset page by page until the run succeeded and is drained.
+        The run is aborted when the iteration ends any other way: the caller closed it early,
+        its task was cancelled, or next_page raised.
+        """
+        run = await self.start_run(actor_id, run_input)
+        run_id = run["id"]
+        cursor: Optional[str] = f"{run_id}:{run['defaultDatasetId']}:0"
+        try:
+            while cursor:
+                items, cursor = await self.next_page(actor_id, run_input, cursor, page_size)
+                if items:
+                    yield items
+        finally:
+            if cursor:
+                await self.abort_run(run_id)
+
+    async def iter_items(self, actor_id: str, run_input: Dict, page_size: int = 100) -> AsyncIterator[Dict]:
+        async for items in self.iter_pages(actor_id, run_input, page_size):
+            for item in items:
+                yield item
+
+    async def aclose(self) -> None:
+        """
+        Close the client of the running loop.
+        """
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+_managers: Dict[str, ApifyRunManager] = {}
+
+
+def get_run_manager(token: str) -> ApifyRunManager:
+    """
+    One manager (with one pooled async client per event loop) per token for the whole process.
+    """
+    if token not in _managers:
+        _managers.setdefault(token, ApifyRunManager(token))
+    return _managers[token]
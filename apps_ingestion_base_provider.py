@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import threading
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from .filters import RentalFilters
+from config.settings import settings
+
+# Keys of the canonical listing dict every adapter's mapper produces.
+CANONICAL_FIELDS = (
+    "listing_id", "provider", "search_id", "title", "address", "city", "state", "zipcode",
+    "price", "beds", "baths", "sqft", "url", "contact_phone", "content_hash",
+)
+
+# Provider-supplied fields that make up a listing's content; search/dedup bookkeeping is excluded.
+HASHED_FIELDS = (
+    "title", "address", "city", "state", "zipcode",
+    "price", "beds", "baths", "sqft", "url", "contact_phone",
+)
+
+
+def content_hash(listing: Dict) -> str:
+    """
+    Stable sha1 of a listing's HASHED_FIELDS, used to tell changed listings from unchanged ones on re-ingestion.
+    Numbers are normalized so 2 and 2.0 hash the same.
+    """
+    parts = []
+    for k in HASHED_FIELDS:
+        v = listing.get(k)
+        if isinstance(v, float) and v.is_integer():
+            v = int(v)
+        parts.append("" if v is None else str(v).strip())
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResultsTruncated(Exception):
+    """
+    Raised by fetch_page when the provider stopped before its results were exhausted (a body
+    cut off mid-way, a result-page cap). `items` are the listings of the page that did arrive:
+    iter_pages yields them, then re-raises, so they are persisted but the run is never taken
+    as complete (not cached, no listings marked removed).
+    """
+
+    def __init__(self, message: str, items: Optional[List[Dict]] = None):
+        super().__init__(message)
+        self.items = items or []
+
+
+def batched(items: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """
+    Re-chunk a stream of listings into lists of at most `size` items.
+    """
+    batch: List[Dict] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def abatched(items: AsyncIterable[Dict], size: int) -> AsyncIterator[List[Dict]]:
+    """
+    batched() for an async stream of listings.
+    """
+    batch: List[Dict] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _BackgroundLoop:
+    """
+    A daemon thread running an asyncio loop that sync code can submit coroutines to.
+    """
+
+    def __init__(self, name: str):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+_loop: Optional[_BackgroundLoop] = None
+_loop_lock = threading.Lock()
+
+
+def background_loop() -> _BackgroundLoop:
+    """
+    The loop sync callers of async provider streams run them on (iter_sync).
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = _BackgroundLoop("provider-streams")
+        return _loop
+
+
+async def _anext(pages: AsyncIterator[List[Dict]]):
+    return await pages.__anext__()
+
+
+def iter_sync(pages: AsyncIterator[List[Dict]]) -> Iterator[List[Dict]]:
+    """
+    Drive an async page stream from sync code on the shared background loop. The calling thread
+    waits only for the next page; closing the returned generator closes the stream on the loop.
+    """
+    loop = background_loop()
+    try:
+        while True:
+            try:
+                page = loop.run(_anext(pages))
+            except StopAsyncIteration:
+                return
+            yield page
+    finally:
+        loop.run(pages.aclose())
+
+
+class ListingProvider:
+    """
+    Base class for listing provider adapters.
+
+    Subclasses implement fetch_page(); callers consume iter_pages()/iter_listings(),
+    which walk the provider's cursor until `limit` listings were produced or the
+    provider runs out. Pages are yielded as they arrive, so nothing forces the whole
+    result set into memory. A stream that ends without raising ran out naturally; one cut
+    short raises ResultsTruncated after its last page.
+
+    aiter_pages()/aiter_listings() are the async forms for async callers and the fan-out
+    (CompositeProvider); adapters with async I/O override aiter_pages().
+    """
+
+    name = "base"
+
+    def fetch_page(self, filters: RentalFilters, cursor: Optional[str], page_size: int) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetch one page of canonical listing dicts starting at `cursor` (None for the first page).
+        Returns (items, next_cursor); next_cursor is None when there are no more pages.
+        """
+        raise NotImplementedError
+
+    def iter_pages(self, filters: RentalFilters, limit: int, page_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        page_size = max(1, page_size or settings.INGEST_PAGE_SIZE)
+        remaining = limit
+        cursor: Optional[str] = None
+        while remaining > 0:
+            try:
+                items, cursor = self.fetch_page(filters, cursor, min(page_size, remaining))
+            except ResultsTruncated as e:
+                if e.items:
+                    yield e.items[:remaining]
+                raise
+            items = items[:remaining]
+            if not items:
+                return
+            remaining -= len(items)
+            yield items
+            if not cursor:
+                return
+
+    def iter_listings(self, filters: RentalFilters, limit: int, page_size: Optional[int] = None) -> Iterator[Dict]:
+        for page in self.iter_pages(filters, limit, page_size):
+            yield from page
+
+    async def aiter_pages(self, filters: RentalFilters, limit: int,
+                          page_size: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        """
+        Async form of iter_pages. This default runs the blocking stream in the loop's default
+        executor one page at a time, so a thread is held only while a page is being fetched.
+        """
+        pages = self.iter_pages(filters, limit, page_size)
+        loop = asyncio.get_running_loop()
+        fetching = None
+        try:
+            while True:
+                fetching = loop.run_in_executor(None, next, pages, None)
+                page = await fetching
+                if page is None:
+                    return
+                yield page
+        finally:
+            # a page still being fetched when the stream was cancelled finishes in its thread
+            if fetching is None or (fetching.done() and not fetching.cancelled()):
+                pages.close()
+
+    async def aiter_listings(self, filters: RentalFilters, limit: int,
+                             page_size: Optional[int] = None) -> AsyncIterator[Dict]:
+        async for page in self.aiter_pages(filters, limit, page_size):
+            for item in page:
+                yield item
@@ -0,0 +1,122 @@
+import logging
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from .base_provider import ListingProvider
+from .filters import RentalFilters
+from apps.storage.cache import TieredCache, build_cache
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_search_cache: Optional[TieredCache] = None
+
+
+def get_search_cache() -> TieredCache:
+    """
+    Process-wide cache of provider search results (in-process LRU, plus Redis when SEARCH_CACHE_REDIS is set).
+    """
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = build_cache(
+            "search",
+            max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+            use_redis=settings.SEARCH_CACHE_REDIS,
+            redis_url=str(settings.REDIS_URL or ""),
+        )
+    return _search_cache
+
+
+def filters_key(provider_name: str, filters: RentalFilters) -> Tuple:
+    """
+    Normalize filters so equivalent searches ("austin"/" Austin ", 0/None prices) share a key.
+    """
+    return (
+        provider_name,
+        (filters.city or "").strip().lower(),
+        (filters.state or "").strip().upper(),
+        filters.min_price or None,
+        filters.max_price or None,
+        filters.beds or None,
+        filters.baths or None,
+        tuple(sorted(t.strip().lower() for t in (filters.property_types or []))),
+        tuple(sorted(k.strip().lower() for k in (filters.keywords or []))),
+    )
+
+
+class CachedProvider(ListingProvider):
+    """
+    Wraps a provider with the search cache. A cached entry holds the listings fetched for a
+    key and whether the provider was exhausted; it serves any later request whose limit it
+    covers. On a miss the inner stream is passed through page by page and stored once it ends
+    without error, unless it was empty or grew past SEARCH_CACHE_MAX_LISTINGS. A stream that
+    raises (ResultsTruncated included) or that the consumer stops early is not stored, so a
+    partial result is never replayed as a complete one. The async stream uses the cache's async
+    forms, so a Redis round trip does not block the event loop.
+    """
+
+    def __init__(self, inner: ListingProvider, cache: Optional[TieredCache] = None):
+        self.inner = inner
+        self.name = getattr(inner, "name", type(inner).__name__)
+        self.timeout = getattr(inner, "timeout", None)
+        self.cache = cache or get_search_cache()
+
+    def iter_pages(self, filters: RentalFilters, limit: int, page_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        key = filters_key(self.name, filters)
+        hit = self._hit(key, self.cache.get(key), limit)
+        if hit is not None:
+            yield from self._replay(hit, page_size)
+            return
+
+        collected: Optional[List[Dict]] = []
+        for page in self.inner.iter_pages(filters, limit, page_size):
+            collected = self._collect(collected, page)
+            yield page
+        entry = self._entry(collected, limit)
+        if entry is not None:
+            self.cache.set(key, entry)
+
+    async def aiter_pages(self, filters: RentalFilters, limit: int,
+                          page_size: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        key = filters_key(self.name, filters)
+        hit = self._hit(key, await self.cache.aget(key), limit)
+        if hit is not None:
+            for page in self._replay(hit, page_size):
+                yield page
+            return
+
+        collected: Optional[List[Dict]] = []
+        async for page in self.inner.aiter_pages(filters, limit, page_size):
+            collected = self._collect(collected, page)
+            yield page
+        entry = self._entry(collected, limit)
+        if entry is not None:
+            await self.cache.aset(key, entry)
+
+    @staticmethod
+    def _hit(key: Tuple, entry: Optional[Dict], limit: int) -> Optional[List[Dict]]:
+        if entry and (entry["complete"] or len(entry["items"]) >= limit):
+            logger.debug("Search cache hit for %s", key)
+            return entry["items"][:limit]
+        return None
+
+    @staticmethod
+    def _replay(items: List[Dict], page_size: Optional[int]) -> Iterator[List[Dict]]:
+        size = max(1, page_size or settings.INGEST_PAGE_SIZE)
+        for i in range(0, len(items), size):
+            # callers annotate listings in place (search_id), so hand out copies
+            yield [dict(x) for x in items[i:i + size]]
+
+    @staticmethod
+    def _collect(collected: Optional[List[Dict]], page: List[Dict]) -> Optional[List[Dict]]:
+        if collected is not None:
+            collected.extend(dict(x) for x in page)
+            if len(collected) > settings.SEARCH_CACHE_MAX_LISTINGS:
+                return None
+        return collected
+
+    @staticmethod
+    def _entry(collected: Optional[List[Dict]], limit: int) -> Optional[Dict]:
+        # reached only when the inner stream ran out or hit the limit
+        if not collected:  # never cache empty results; failing adapters also return nothing
+            return None
+        return {"items": collected, "complete": len(collected) < limit}
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from .base_provider import CANONICAL_FIELDS, ListingProvider, ResultsTruncated, content_hash, iter_sync
+from .filters import RentalFilters
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderStats:
+    provider: str
+    count: int = 0
+    latency_ms: float = 0.0
+    status: str = "pending"  # ok | timeout | error | truncated (stopped before its results ran out)
+    error: Optional[str] = None
+
+
+class CompositeProvider(ListingProvider):
+    """
+    Fans one search out to several providers concurrently and merges their pages into
+    a single stream of canonical listing dicts.
+
+    Each provider's stream (its aiter_pages) runs as a task on the caller's event loop: async
+    adapters (the Apify path) hold no thread while they wait, blocking ones hold an executor
+    thread only while a page is being fetched. Sync callers use iter_pages(), which drives the
+    fan-out on the shared background loop.
+
+    Each provider has its own idle deadline: it has to deliver
+    each page within its timeout (the provider's `timeout` attribute if set, else
+    PROVIDER_TIMEOUT_SECONDS) of the previous one, and the time the consumer spends on a page
+    (its DB writes) does not count. A provider that fails or goes idle past its deadline is
+    reported in `stats`, its stream is cancelled (an Apify run is aborted) and it is no longer
+    waited on, so it never holds back the others, while a
+    long paginated stream that keeps delivering is never cut off. Provider ids are only unique
+    within their provider, so listing_id is namespaced as "<provider>:<id>" ("zillow:123" and
+    "rentpath:123" are different listings); a repeated id is dropped (first page to deliver wins).
+    """
+
+    name = "composite"
+
+    def __init__(self, providers: List[ListingProvider], timeout: Optional[float] = None):
+        self.providers = providers
+        self.timeout = timeout if timeout is not None else settings.PROVIDER_TIMEOUT_SECONDS
+        self.stats: List[ProviderStats] = []
+
+    def iter_pages(self, filters: RentalFilters, limit: int, page_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        yield from iter_sync(self.aiter_pages(filters, limit, page_size))
+
+    async def aiter_pages(self, filters: RentalFilters, limit: int,
+                          page_size: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        # Bounded so a slow consumer throttles the producers instead of buffering everything.
+        q: "asyncio.Queue[Tuple[int, Optional[List[Dict]]]]" = asyncio.Queue(maxsize=4 * max(1, len(self.providers)))
+        started = time.monotonic()
+        stats_list = [ProviderStats(provider=getattr(p, "name", type(p).__name__)) for p in self.providers]
+        timeouts = [getattr(p, "timeout", None) or self.timeout for p in self.providers]
+        deadlines = [started + t for t in timeouts]
+        self.stats = stats_list
+
+        tasks = [asyncio.ensure_future(self._run(i, provider, stats_list[i], filters, limit, page_size, q, started))
+                 for i, provider in enumerate(self.providers)]
+
+        pending = set(range(len(self.providers)))
+        seen = set()
+        remaining = limit
+        try:
+            while pending and remaining > 0:
+                now = time.monotonic()
+                for i in [i for i in pending if deadlines[i] <= now]:
+                    pending.discard(i)
+                    self._mark_timeout(stats_list[i], now - started)
+                    tasks[i].cancel()
+                if not pending:
+                    break
+                try:
+                    i, page = await asyncio.wait_for(q.get(), min(deadlines[i] for i in pending) - now)
+                except asyncio.TimeoutError:
+                    continue
+                if i not in pending:
+                    continue  # late page from a provider that already timed out
+                deadlines[i] = time.monotonic() + timeouts[i]
+                stats = stats_list[i]
+                if page is None:
+                    pending.discard(i)
+                    continue
+                merged = []
+                for item in page:
+                    listing = self._canonical(item, stats.provider)
+                    if listing is None or listing["listing_id"] in seen:
+                        continue
+                    seen.add(listing["listing_id"])
+                    merged.append(listing)
+                merged = merged[:remaining]
+                if merged:
+                    stats.count += len(merged)
+                    remaining -= len(merged)
+                    yielded_at = time.monotonic()
+                    yield merged
+                    paused = time.monotonic() - yielded_at
+                    deadlines = [d + paused for d in deadlines]
+        finally:
+            # streams still running (limit reached, consumer stopped early) are cancelled and wound down
+            for i in pending:
+                tasks[i].cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            elapsed = time.monotonic() - started
+            for i in pending:
+                if stats_list[i].status == "pending":
+                    stats_list[i].status = "ok"
+                    stats_list[i].latency_ms = round(elapsed * 1000, 1)
+            for stats in stats_list:
+                logger.info("Provider %s: %d listings in %.0f ms (%s)", stats.provider, stats.count, stats.latency_ms, stats.status)
+
+    @staticmethod
+    def _mark_timeout(stats: ProviderStats, elapsed: float) -> None:
+        stats.status = "timeout"
+        stats.latency_ms = round(elapsed * 1000, 1)
+        logger.warning("Provider %s timed out after %.1fs", stats.provider, elapsed)
+
+    async def _run(self, i: int, provider: ListingProvider, stats: ProviderStats, filters: RentalFilters, limit: int,
+                   page_size: Optional[int], q: asyncio.Queue, started: float) -> None:
+        try:
+            async for page in provider.aiter_pages(filters, limit, page_size):
+                await q.put((i, page))
+            status, error = "ok", None
+        except ResultsTruncated as e:
+            logger.warning("Provider %s truncated: %s", stats.provider, e)
+            status, error = "truncated", str(e)
+        except Exception as e:
+            logger.exception("Provider %s failed: %s", stats.provider, e)
+            status, error = "error", str(e)
+        # A provider that already timed out keeps that status; the consumer stopped waiting on it.
+        if stats.status == "pending":
+            stats.status, stats.error = status, error
+            stats.latency_ms = round((time.monotonic() - started) * 1000, 1)
+        await q.put((i, None))
+
+    @staticmethod
+    def _canonical(item: Dict, provider_name: str) -> Optional[Dict]:
+        """
+        The canonical keys the item has (a key the provider left out stays out, so the upsert keeps
+        the stored column) with listing_id namespaced by provider; None for an item without an id.
+        """
+        if not item.get("listing_id"):
+            return None
+        out = {k: item[k] for k in CANONICAL_FIELDS if k in item}
+        out["provider"] = item.get("provider") or provider_name
+        out["listing_id"] = f"{out['provider']}:{item['listing_id']}"
+        out["content_hash"] = out.get("content_hash") or content_hash(out)
+        return out
@@ -0,0 +1,103 @@
+import hashlib
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_COUNTRY_CODE = "1"  # listings are US-only today
+
+_UNIT_RE = re.compile(r"(?:\b(?:apt|apartment|unit|suite|ste|fl|floor|rm|room)\b\.?|#)\s*#?\s*([a-z0-9][a-z0-9-]*)")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "av": "ave", "road": "rd", "boulevard": "blvd", "drive": "dr",
+    "lane": "ln", "court": "ct", "place": "pl", "terrace": "ter", "parkway": "pkwy", "highway": "hwy",
+    "square": "sq", "circle": "cir", "trail": "trl",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+}
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Return the E.164 form of a phone number ("(512) 555-0100" -> "+15125550100"), or None if it is not parseable.
+    """
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if phone.strip().startswith("+"):
+        return "+" + digits if 8 <= len(digits) <= 15 else None
+    if len(digits) == 10:
+        return "+" + DEFAULT_COUNTRY_CODE + digits
+    if len(digits) == 11 and digits.startswith(DEFAULT_COUNTRY_CODE):
+        return "+" + digits
+    return None
+
+
+def normalize_address(address: Optional[str]) -> Tuple[str, str]:
+    """
+    Split an address line into (normalized street, unit): lower-cased, punctuation stripped,
+    street suffixes and directions abbreviated. "12 North Main Street, Apt. 4B" -> ("12 n main st", "4b").
+    """
+    if not address:
+        return "", ""
+    text = address.lower()
+    unit = ""
+    m = _UNIT_RE.search(text)
+    if m:
+        unit = m.group(1)
+        text = text[:m.start()] + " " + text[m.end():]
+    tokens = [_ABBREVIATIONS.get(t, t) for t in _NON_ALNUM_RE.sub(" ", text).split()]
+    return " ".join(tokens), unit
+
+
+def dedup_key(listing: Dict) -> Optional[str]:
+    """
+    Identity of the physical unit behind a listing, independent of provider and listing_id.
+    Uses street + zip (or city/state) + unit when an address is known; otherwise falls back to
+    the E.164 phone + unit + beds, which still catches one landlord re-posted across providers.
+    """
+    street, unit = normalize_address(listing.get("address"))
+    zip5 = re.sub(r"\D", "", str(listing.get("zipcode") or ""))[:5]
+    if street:
+        where = zip5 or "{}|{}".format((listing.get("city") or "").strip().lower(), (listing.get("state") or "").strip().lower())
+        parts = ("addr", street, where, unit)
+    else:
+        phone = normalize_phone(listing.get("contact_phone"))
+        if not phone:
+            return None
+        parts = ("phone", phone, unit, str(listing.get("beds") or ""))
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class DedupIndex:
+    """
+    Assigns dedup_key/canonical_id to listings as they are ingested.
+
+    Keys are hashed, so resolution is a dict lookup per listing plus one batched DB lookup
+    (`lookup`: keys -> canonical listing_id) for keys not seen earlier in this ingestion;
+    there is no pairwise comparison. The first listing to claim a key is canonical
+    (canonical_id None); later ones point at it and act as provider aliases.
+    """
+
+    def __init__(self, lookup: Callable[[List[str]], Dict[str, str]]):
+        self._lookup = lookup
+        self._canonical: Dict[str, str] = {}
+
+    def assign(self, listings: Iterable[Dict]) -> int:
+        """
+        Annotate listings in place (E.164 contact_phone, dedup_key, canonical_id). Returns the number of duplicates.
+        """
+        listings = list(listings)
+        for l in listings:
+            l["contact_phone"] = normalize_phone(l.get("contact_phone")) or l.get("contact_phone")
+            l["dedup_key"] = dedup_key(l)
+
+        unknown = {l["dedup_key"] for l in listings if l["dedup_key"] and l["dedup_key"] not in self._canonical}
+        if unknown:
+            self._canonical.update(self._lookup(list(unknown)))
+
+        duplicates = 0
+        for l in listings:
+            key = l["dedup_key"]
+            canonical = self._canonical.setdefault(key, l["listing_id"]) if key else l["listing_id"]
+            l["canonical_id"] = None if canonical == l["listing_id"] else canonical
+            duplicates += l["canonical_id"] is not None
+        return duplicates
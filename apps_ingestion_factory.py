@@ -4,10 +4,27 @@ def create_provider():
     """
     Factory to produce a listings provider adapter based on LISTING_PROVIDER.
     Supported: zillow, zumper, rentcom, rentpath (legacy).
+    A comma-separated list (e.g. "zillow,rentpath") returns a CompositeProvider that
+    queries all of them concurrently and merges the results.
+    Each adapter is wrapped in CachedProvider unless SEARCH_CACHE_ENABLED is off.
     Use this function across the codebase instead of importing provider modules directly.
     """
-    provider = (settings.LISTING_PROVIDER or "zillow").strip().lower()
+    names = [n.strip().lower() for n in (settings.LISTING_PROVIDER or "zillow").split(",") if n.strip()]
+    providers = [_with_cache(_create_single(n)) for n in (names or ["zillow"])]
+    if len(providers) > 1:
+        from .composite_provider import CompositeProvider
+        return CompositeProvider(providers)
+    return providers[0]
 
+
+def _with_cache(provider):
+    if not settings.SEARCH_CACHE_ENABLED:
+        return provider
+    from .cache import CachedProvider
+    return CachedProvider(provider)
+
+
+def _create_single(provider: str):
     if provider == "zillow":
         from .zillow_provider import ZillowProvider
         return ZillowProvider()
@@ -22,4 +39,4 @@ def create_provider():
         from .rentpath_provider import RentPathProvider
         return RentPathProvider()
 
-    raise ValueError(f"Unknown listing provider configured: {settings.LISTING_PROVIDER}")
+    raise ValueError(f"Unknown listing provider configured: {provider}")
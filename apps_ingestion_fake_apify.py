@@ -0,0 +1,178 @@
+"""
+Local fake of the Apify API subset used by ApifyRunManager, for tests and offline development.
+
+Implements:
+- POST /v2/acts/<actor>/runs             start a run (returns id/defaultDatasetId, status RUNNING)
+- GET  /v2/actor-runs/<run_id>           run status (SUCCEEDED once every item was produced)
+- POST /v2/actor-runs/<run_id>/abort     stop a running run (status ABORTED)
+- GET  /v2/datasets/<id>/items           items produced so far, honoring offset/limit
+
+Each run "scrapes" `items` synthetic Zillow-like listings (fewer when its input asks for a
+smaller "limit") at `rate` items/sec, so callers see the dataset grow while the run is
+RUNNING, just like a real actor. Runs keep their input for inspection.
+
+Usage:
+    python -m apps.ingestion.fake_apify --port 8765 --items 500 --rate 100
+    # then APIFY_BASE_URL=http://127.0.0.1:8765 ZILLOW_SCRAPER_SERVICE=apify ZILLOW_SCRAPER_API_KEY=test
+
+In tests:
+    with FakeApifyServer(items=50, rate=500) as server:
+        manager = ApifyRunManager("test", base_url=server.url)
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def make_item(run_no: int, i: int) -> Dict:
+    return {
+        "zpid": f"{run_no}{i:06d}",
+        "address": {"street": f"{100 + i} Fake St", "city": "Austin", "state": "TX", "zip": "78701"},
+        "price": 1200 + (i % 20) * 75,
+        "bedrooms": i % 4,
+        "bathrooms": 1 + i % 2,
+        "area": 500 + (i % 10) * 90,
+        "url": f"https://www.zillow.com/homedetails/{run_no}{i:06d}_zpid/",
+        "phone": f"(512) 555-{i % 10000:04d}",
+    }
+
+
+class _Run:
+    def __init__(self, run_no: int, items: int, rate: float, fail: bool, run_input: Optional[Dict] = None):
+        self.id = f"run{run_no}"
+        self.dataset_id = f"ds{run_no}"
+        self.run_no = run_no
+        self.input = run_input or {}
+        self.total = min(items, int(self.input.get("limit") or items))
+        self.rate = rate
+        self.fail = fail
+        self.started = time.monotonic()
+        self.aborted_at: Optional[float] = None
+
+    def produced(self) -> int:
+        now = self.aborted_at or time.monotonic()
+        return min(self.total, int((now - self.started) * self.rate))
+
+    def status(self) -> str:
+        if self.aborted_at is not None:
+            return "ABORTED"
+        if self.produced() < self.total:
+            return "RUNNING"
+        return "FAILED" if self.fail else "SUCCEEDED"
+
+    def abort(self) -> None:
+        if self.status() == "RUNNING":
+            self.aborted_at = time.monotonic()
+
+    def items(self, offset: int, limit: int) -> List[Dict]:
+        end = min(self.produced(), offset + limit)
+        return [make_item(self.run_no, i) for i in range(offset, end)]
+
+
+class FakeApifyServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, items: int = 100, rate: float = 1000.0, fail: bool = False):
+        self.items = items
+        self.rate = rate
+        self.fail = fail
+        self.runs: Dict[str, _Run] = {}
+        self.requests: List[str] = []
+        self.auth: List[str] = []  # Authorization header of each request
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeApifyServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                pass
+
+            def _send(self, status: int, payload) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                server.requests.append(f"POST {path}")
+                server.auth.append(self.headers.get("Authorization") or "")
+                parts = path.strip("/").split("/")
+                if len(parts) == 4 and parts[:2] == ["v2", "acts"] and parts[3] == "runs":
+                    length = int(self.headers.get("Content-Length") or 0)
+                    run_input = json.loads(self.rfile.read(length) or b"{}")
+                    with server._lock:
+                        run = _Run(next(server._counter), server.items, server.rate, server.fail, run_input)
+                        server.runs[run.id] = run
+                    return self._send(201, {"data": {"id": run.id, "defaultDatasetId": run.dataset_id, "status": "RUNNING"}})
+                if len(parts) == 4 and parts[:2] == ["v2", "actor-runs"] and parts[3] == "abort" \
+                        and parts[2] in server.runs:
+                    run = server.runs[parts[2]]
+                    run.abort()
+                    return self._send(200, {"data": {"id": run.id, "defaultDatasetId": run.dataset_id, "status": run.status()}})
+                self._send(404, {"error": {"type": "page-not-found"}})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                server.requests.append(f"GET {url.path}")
+                server.auth.append(self.headers.get("Authorization") or "")
+                parts = url.path.strip("/").split("/")
+                if len(parts) == 3 and parts[:2] == ["v2", "actor-runs"] and parts[2] in server.runs:
+                    run = server.runs[parts[2]]
+                    return self._send(200, {"data": {"id": run.id, "defaultDatasetId": run.dataset_id, "status": run.status()}})
+                if len(parts) == 4 and parts[:2] == ["v2", "datasets"] and parts[3] == "items":
+                    run = next((r for r in server.runs.values() if r.dataset_id == parts[2]), None)
+                    if run:
+                        qs = parse_qs(url.query)
+                        offset = int(qs.get("offset", ["0"])[0])
+                        limit = int(qs.get("limit", ["1000"])[0])
+                        return self._send(200, run.items(offset, limit))
+                self._send(404, {"error": {"type": "record-not-found"}})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Apify API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--items", type=int, default=500, help="items produced per run")
+    parser.add_argument("--rate", type=float, default=100.0, help="items produced per second")
+    parser.add_argument("--fail", action="store_true", help="end runs with status FAILED")
+    args = parser.parse_args()
+    fake = FakeApifyServer(args.host, args.port, args.items, args.rate, args.fail)
+    print(f"Fake Apify listening on {fake.url}")
+    try:
+        fake.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
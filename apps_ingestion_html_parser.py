@@ -0,0 +1,254 @@
+"""
+Incremental extractor for Zillow search-result pages fetched through proxy scrapers
+(ZenRows, ScraperAPI).
+
+Built on the stdlib html.parser so it can be fed the response in chunks as it
+downloads. Two sources are read from the page:
+- embedded JSON blobs (<script type="application/json">, __NEXT_DATA__, and the
+  comment-wrapped search page store), walked for dicts carrying a zpid;
+- rendered listing cards (<article data-test="property-card">), used when the page
+  ships without the JSON state.
+
+Listings are yielded as raw dicts shaped for ZillowProvider._map_provider_to_internal,
+de-duplicated on zpid within a page.
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional
+
+_NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_ZPID_RE = re.compile(r"(\d+)_zpid|zpid_(\d+)")
+_CARD_FIELDS = {
+    "property-card-addr": "address",
+    "property-card-price": "price",
+}
+
+
+def _parse_number(text) -> Optional[float]:
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return text
+    m = _NUMBER_RE.search(str(text))
+    return float(m.group(0).replace(",", "")) if m else None
+
+
+def _as_int(value) -> Optional[int]:
+    n = _parse_number(value)
+    return int(n) if n is not None else None
+
+
+def _split_address(full: str) -> Dict[str, str]:
+    """
+    "123 Main St APT 4, Austin, TX 78701" -> street/city/state/zipcode.
+    Building cards prefix the address with the building name ("The Grove | 3100 S Congress Ave, ...").
+    """
+    parts = [p.strip() for p in (full or "").split("|")[-1].split(",")]
+    out = {"address": parts[0] if parts else "", "city": "", "state": "", "zipcode": ""}
+    if len(parts) >= 3:
+        out["city"] = parts[-2]
+        tail = parts[-1].split()
+        out["state"] = tail[0] if tail else ""
+        out["zipcode"] = tail[1] if len(tail) > 1 else ""
+    elif len(parts) == 2:
+        out["city"] = parts[1]
+    return out
+
+
+def _from_json_item(item: Dict) -> Optional[Dict]:
+    zpid = item.get("zpid") or item.get("id")
+    if not zpid:
+        return None
+    info = item.get("hdpData", {}).get("homeInfo", {}) if isinstance(item.get("hdpData"), dict) else {}
+    address = item.get("addressStreet") or info.get("streetAddress")
+    listing = _split_address(item["address"]) if isinstance(item.get("address"), str) else {}
+    return {
+        "zpid": str(zpid),
+        "title": item.get("statusText") or item.get("buildingName") or "",
+        "address": address or listing.get("address", ""),
+        "city": item.get("addressCity") or info.get("city") or listing.get("city", ""),
+        "state": item.get("addressState") or info.get("state") or listing.get("state", ""),
+        "zipcode": item.get("addressZipcode") or info.get("zipcode") or listing.get("zipcode", ""),
+        "price": _as_int(item.get("unformattedPrice") or info.get("price") or item.get("price")),
+        "beds": _parse_number(item.get("beds") if item.get("beds") is not None else info.get("bedrooms")),
+        "baths": _parse_number(item.get("baths") if item.get("baths") is not None else info.get("bathrooms")),
+        "sqft": _as_int(item.get("area") or info.get("livingArea")),
+        "url": item.get("detailUrl") or "",
+        "phone": item.get("phone") or item.get("contactPhone") or "",
+    }
+
+
+def _walk_json(blob) -> Iterator[Dict]:
+    """
+    Iteratively walk a decoded JSON blob and yield every dict that looks like a search result.
+    """
+    stack = [blob]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "zpid" in node and ("detailUrl" in node or "price" in node or "unformattedPrice" in node):
+                mapped = _from_json_item(node)
+                if mapped:
+                    yield mapped
+                continue
+            stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(reversed([v for v in node if isinstance(v, (dict, list))]))
+
+
+class ListingHTMLParser(HTMLParser):
+    """
+    Feed HTML in chunks with feed(); collect finished listings with drain().
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._ready: List[Dict] = []
+        self._seen = set()
+        self._script: Optional[List[str]] = None
+        self._card: Optional[Dict] = None
+        self._capture: Optional[List] = None  # [field, tag, depth, text parts]
+
+    # -- public API -------------------------------------------------------------------------
+
+    def drain(self) -> List[Dict]:
+        ready, self._ready = self._ready, []
+        return ready
+
+    # -- HTMLParser hooks -------------------------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "script":
+            if a.get("type") == "application/json" or a.get("id") == "__NEXT_DATA__":
+                self._script = []
+            return
+
+        if tag == "article" and (a.get("data-test") == "property-card" or "list-card" in (a.get("class") or "")):
+            self._card = {"zpid": _zpid(a.get("id")), "lis": []}
+            return
+
+        if self._card is None:
+            return
+        if self._capture is not None:
+            if tag == self._capture[1]:
+                self._capture[2] += 1
+            return
+
+        field = _CARD_FIELDS.get(a.get("data-test") or "")
+        if tag == "address":
+            field = "address"
+        if tag == "a" and a.get("href") and not self._card.get("url"):
+            href = a["href"]
+            if "_zpid" in href or "/homedetails/" in href or "/b/" in href:
+                self._card["url"] = href
+                self._card["zpid"] = self._card.get("zpid") or _zpid(href)
+        if tag == "li":
+            field = "li"
+        if field:
+            self._capture = [field, tag, 1, []]
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._script is not None:
+            self._emit_json("".join(self._script))
+            self._script = None
+            return
+
+        if self._card is None:
+            return
+        if self._capture is not None and tag == self._capture[1]:
+            self._capture[2] -= 1
+            if self._capture[2] == 0:
+                field, _, _, parts = self._capture
+                text = " ".join(" ".join(parts).split())
+                if field == "li":
+                    self._card["lis"].append(text)
+                else:
+                    self._card.setdefault(field, text)
+                self._capture = None
+            return
+        if tag == "article":
+            self._emit_card(self._card)
+            self._card = None
+            self._capture = None
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+        elif self._capture is not None:
+            self._capture[3].append(data)
+
+    # -- emitters ---------------------------------------------------------------------------
+
+    def _emit(self, item: Optional[Dict]) -> None:
+        if not item or not item.get("zpid") or item["zpid"] in self._seen:
+            return
+        self._seen.add(item["zpid"])
+        self._ready.append(item)
+
+    def _emit_json(self, text: str) -> None:
+        text = text.strip()
+        if text.startswith("<!--"):
+            text = text[4:]
+        if text.endswith("-->"):
+            text = text[:-3]
+        if "zpid" not in text:
+            return
+        try:
+            blob = json.loads(text)
+        except ValueError:
+            return
+        for item in _walk_json(blob):
+            self._emit(item)
+
+    def _emit_card(self, card: Dict) -> None:
+        beds = baths = sqft = None
+        for li in card.get("lis", []):
+            low = li.lower()
+            if "studio" in low:
+                beds = 0
+            elif "bd" in low or "bed" in low:
+                beds = _parse_number(li)
+            elif "ba" in low:
+                baths = _parse_number(li)
+            elif "sqft" in low or "sq ft" in low:
+                sqft = _as_int(li)
+        address = card.get("address", "")
+        item = {
+            "zpid": card.get("zpid"),
+            "title": address.split("|")[0].strip() if "|" in address else "",
+            "price": _as_int(card.get("price")),
+            "beds": beds,
+            "baths": baths,
+            "sqft": sqft,
+            "url": card.get("url") or "",
+            "phone": "",
+        }
+        item.update(_split_address(address))
+        self._emit(item)
+
+
+def _zpid(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    m = _ZPID_RE.search(text)
+    return (m.group(1) or m.group(2)) if m else None
+
+
+def iter_listings_from_chunks(chunks: Iterable[str]) -> Iterator[Dict]:
+    """
+    Stream raw listing dicts out of an HTML page delivered as text chunks.
+    """
+    parser = ListingHTMLParser()
+    for chunk in chunks:
+        if chunk:
+            parser.feed(chunk)
+            yield from parser.drain()
+    parser.close()
+    yield from parser.drain()
+
+
+def iter_listings_from_html(html: str) -> Iterator[Dict]:
+    return iter_listings_from_chunks([html])
@@ -0,0 +1,284 @@
+"""
+Process-wide pooled HTTP client shared by the ingestion adapters.
+
+One requests.Session (keep-alive, HTTP_POOL_MAXSIZE connections per host) serves every
+search, so TLS handshakes are paid once per connection instead of once per search.
+Requests are retried with jittered exponential backoff on connection errors, 429 and
+5xx, honoring Retry-After; each provider has its own circuit breaker so a failing
+upstream is short-circuited instead of eating every search's timeout.
+
+stats() reports per-provider request/retry/failure counters and, per host pool, how
+many requests went over how many connections (the difference is connection reuse).
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+USER_AGENT = "rental-outreach/1.0 (+https://your-org.example.com)"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request while a provider's circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures; after `reset_seconds` one
+    trial call is let through (half-open), which closes the circuit on success or
+    re-opens it on failure. A trial that has not reported back within `reset_seconds`
+    is given up on and the next call becomes the trial.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"  # closed | open | half_open
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == "closed":
+                return
+            now = time.monotonic()
+            if self.state == "half_open" and now - self.trial_started_at >= self.reset_seconds:
+                logger.warning("Trial call for %s never reported back; circuit open again", self.name)
+                self.state = "open"
+            if self.state == "open" and now - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self.trial_started_at = now
+                return
+            raise CircuitOpenError(f"circuit for {self.name} is {self.state}")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info("Circuit for %s closed", self.name)
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning("Circuit for %s opened after %d failures", self.name, self.failures)
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def record_abandoned(self) -> None:
+        """
+        End a call that gave no verdict on the upstream (its caller stopped it before any result):
+        a half-open trial goes back to open without restarting the reset timer, so the next call is the trial.
+        """
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn under the breaker; any exception counts as a failure.
+        """
+        self.before_call()
+        try:
+            out = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return out
+
+
+@dataclass
+class ProviderHttpStats:
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    short_circuited: int = 0
+    latency_ms_total: float = 0.0
+
+
+def _retry_after_seconds(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class HttpClient:
+    """
+    Pooled, retrying HTTP client. `provider` names the breaker and stats bucket of each call.
+    """
+
+    def __init__(self, pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None,
+                 max_retries: Optional[int] = None):
+        self.max_retries = settings.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections or settings.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or settings.HTTP_POOL_MAXSIZE,
+            pool_block=True,  # cap connections per host; extra callers wait for a free one
+            max_retries=0,
+        )
+        self.adapter = adapter
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._stats: Dict[str, ProviderHttpStats] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(
+                    provider, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_SECONDS)
+            return self._breakers[provider]
+
+    def _provider_stats(self, provider: str) -> ProviderHttpStats:
+        with self._lock:
+            return self._stats.setdefault(provider, ProviderHttpStats())
+
+    def _backoff(self, attempt: int, resp: Optional[requests.Response]) -> Optional[float]:
+        """
+        Seconds to wait before retry `attempt` (1-based), or None when a Retry-After is beyond what we wait for.
+        """
+        if resp is not None:
+            retry_after = _retry_after_seconds(resp)
+            if retry_after is not None:
+                return retry_after if retry_after <= settings.HTTP_RETRY_AFTER_MAX_SECONDS else None
+        cap = min(settings.HTTP_BACKOFF_MAX_SECONDS, settings.HTTP_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+        return random.uniform(0, cap)  # full jitter
+
+    def request(self, method: str, url: str, provider: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the provider's breaker with retries. Returns a 2xx/3xx response;
+        raises requests.HTTPError for a final error status, CircuitOpenError while the circuit is open.
+        """
+        method = method.upper()
+        breaker = self.breaker(provider)
+        stats = self._provider_stats(provider)
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            with self._lock:
+                stats.short_circuited += 1
+            raise
+
+        attempt = 0
+        started = time.perf_counter()
+        try:
+            while True:
+                resp, error = None, None
+                with self._lock:
+                    stats.requests += 1
+                try:
+                    resp = self.session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                retryable = error is not None or resp.status_code in RETRY_STATUSES
+                if not retryable:
+                    break
+                if resp is not None and resp.status_code != 429 and method not in IDEMPOTENT_METHODS:
+                    break
+                delay = self._backoff(attempt + 1, resp) if attempt < self.max_retries else None
+                if delay is None:
+                    break
+                attempt += 1
+                with self._lock:
+                    stats.retries += 1
+                logger.info("Retrying %s %s for %s in %.2fs (%s)", method, url.split("?")[0], provider, delay,
+                            error or resp.status_code)
+                if resp is not None:
+                    resp.close()
+                time.sleep(delay)
+        except Exception:
+            # anything else the call raised (an SSL or URL error, a broken body) still has to reach
+            # the breaker, or a half-open trial would never report back
+            with self._lock:
+                stats.failures += 1
+            breaker.record_failure()
+            raise
+        finally:
+            with self._lock:
+                stats.latency_ms_total += (time.perf_counter() - started) * 1000
+
+        if error is not None:
+            with self._lock:
+                stats.failures += 1
+            breaker.record_failure()
+            raise error
+        if resp.status_code in RETRY_STATUSES:
+            with self._lock:
+                stats.failures += 1
+            breaker.record_failure()
+        else:
+            # other 4xx are the caller's problem, not the upstream's health
+            breaker.record_success()
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError:
+            resp.close()
+            raise
+        return resp
+
+    def get(self, url: str, provider: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, provider, **kwargs)
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        pools = self.adapter.poolmanager.pools
+        out = {}
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                out[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                    "connections": pool.num_connections,
+                    "requests": pool.num_requests,
+                    "reused": max(0, pool.num_requests - pool.num_connections),
+                }
+        return out
+
+    def stats(self) -> Dict:
+        with self._lock:
+            providers = {name: asdict(s) for name, s in self._stats.items()}
+            breakers = {name: b.state for name, b in self._breakers.items()}
+        for name, state in breakers.items():
+            providers.setdefault(name, asdict(ProviderHttpStats()))["circuit"] = state
+        return {"providers": providers, "pools": self.pool_stats()}
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -16,3 +16,4 @@ class Listing(BaseModel):
     contact_phone: Optional[str]
     provider: str
     search_id: Optional[str] = None
+    content_hash: Optional[str] = None
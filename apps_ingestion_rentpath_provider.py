@@ -1,21 +1,35 @@
-import requests
-from typing import Iterable
-from .base_provider import ListingProvider
+from typing import Dict, Iterable, List, Optional, Tuple
+from .base_provider import ListingProvider, content_hash
 from .filters import RentalFilters
+from .http_client import HttpClient, get_http_client
 from .models import Listing
 from config.settings import settings
 
 class RentPathProvider(ListingProvider):
     """
-    Provider using RentPath partner API. This example assumes a generic /listings endpoint.
+    Provider using RentPath partner API. This example assumes a generic /listings endpoint
+    with cursor pagination (`cursor` param, `next_cursor` in the response).
     Adjust fields and paths to your contract. Includes contact_phone necessary for calls.
     """
 
-    def __init__(self):
+    name = "rentpath"
+
+    def __init__(self, http: Optional[HttpClient] = None):
         self.base_url = settings.RENTPATH_BASE_URL
         self.api_key = settings.RENTPATH_API_KEY
+        self.http = http or get_http_client()
 
     def search(self, filters: RentalFilters, limit: int) -> Iterable[Listing]:
+        for item in self.iter_listings(filters, limit):
+            yield Listing(**item)
+
+    def search_listings(self, city: str = "", state: str = "", min_price: int = 0, max_price: int = 0,
+                        beds: int = 0, baths: int = 0, limit: int = 50) -> List[Dict]:
+        filters = RentalFilters(city=city, state=state, min_price=min_price or None, max_price=max_price or None,
+                                beds=beds or None, baths=baths or None)
+        return list(self.iter_listings(filters, limit))
+
+    def fetch_page(self, filters: RentalFilters, cursor: Optional[str], page_size: int) -> Tuple[List[Dict], Optional[str]]:
         headers = {"Authorization": f"Bearer {self.api_key}"}
         params = {
             "city": filters.city,
@@ -24,26 +38,35 @@ class RentPathProvider(ListingProvider):
             "max_price": filters.max_price,
             "beds": filters.beds,
             "baths": filters.baths,
-            "limit": limit,
+            "limit": page_size,
+            "cursor": cursor,
         }
         params = {k: v for k, v in params.items() if v is not None}
-        resp = requests.get(f"{self.base_url}/listings", headers=headers, params=params, timeout=20)
-        resp.raise_for_status()
-        data = resp.json()
-
-        for item in data.get("results", []):
-            yield Listing(
-                listing_id=str(item.get("id")),
-                title=item.get("title"),
-                address=(item.get("address") or {}).get("line1"),
-                city=(item.get("address") or {}).get("city"),
-                state=(item.get("address") or {}).get("state"),
-                zipcode=(item.get("address") or {}).get("zip"),
-                price=item.get("price"),
-                beds=item.get("beds"),
-                baths=item.get("baths"),
-                sqft=item.get("sqft"),
-                url=item.get("url"),
-                contact_phone=(item.get("contact") or {}).get("phone"),
-                provider="rentpath",
-            )
+        data = self.http.get(f"{self.base_url}/listings", provider=self.name, headers=headers, params=params, timeout=20).json()
+
+        # an item without an id cannot be told apart from the others; str(None) would merge them all
+        items = [self._map_provider_to_internal(item) for item in data.get("results", [])
+                 if item.get("id") not in (None, "")]
+        next_cursor = data.get("next_cursor")
+        return items, (str(next_cursor) if next_cursor else None)
+
+    def _map_provider_to_internal(self, item: Dict) -> Dict:
+        address = item.get("address") or {}
+        listing = {
+            "listing_id": str(item.get("id")),
+            "provider": "rentpath",
+            "search_id": "",
+            "title": item.get("title"),
+            "address": address.get("line1"),
+            "city": address.get("city"),
+            "state": address.get("state"),
+            "zipcode": address.get("zip"),
+            "price": item.get("price"),
+            "beds": item.get("beds"),
+            "baths": item.get("baths"),
+            "sqft": item.get("sqft"),
+            "url": item.get("url"),
+            "contact_phone": (item.get("contact") or {}).get("phone"),
+        }
+        listing["content_hash"] = content_hash(listing)
+        return listing
@@ -1,5 +1,5 @@
-#  
- 
+"""
+Zillow listings provider adapter.
 
 IMPORTANT:
 - Zillow does not provide an unrestricted public scraping API. Use a licensed
@@ -7,81 +7,133 @@ IMPORTANT:
 - Update ZILLOW_* and ZILLOW_SCRAPER_* settings in config/settings.py and .env.
 """
 
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Tuple
+import asyncio
 import logging
+import time
 import requests
 from config.settings import settings
+from .base_provider import ListingProvider, ResultsTruncated, content_hash, iter_sync
+from .apify import get_run_manager
+from .filters import RentalFilters
+from .html_parser import iter_listings_from_chunks
+from .http_client import HttpClient, get_http_client
 
 logger = logging.getLogger(__name__)
 
+HTML_CHUNK_SIZE = 64 * 1024
+ZILLOW_MAX_RESULT_PAGES = 20  # Zillow stops paginating search results after 20 pages
 
-class RentPathProvider:
-    """
-    Adapter class preserved under the RentPathProvider name for compatibility.
 
-    It delegates to Zillow-style fetch logic and returns canonical listings.
-    If you prefer to rename callers, replace imports to use apps.ingestion.zillow_provider.ZillowProvider
-    and remove this compatibility shim.
+class ZillowProvider(ListingProvider):
+    """
+    Zillow adapter: fetches pages from the configured integration path and returns canonical listings.
+    HTTP goes through the shared pooled client; upstream failures raise so callers see them.
     """
 
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, session: Optional[requests.Session] = None):
+    name = "zillow"
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, http: Optional[HttpClient] = None):
         # Use Zillow-configured settings by default
         self.api_key = api_key or getattr(settings, "ZILLOW_API_KEY", "")
         self.base_url = base_url or getattr(settings, "ZILLOW_BASE_URL", "https://api.zillow.com")
-        self.session = session or requests.Session()
-        self.session.headers.update({
-            "User-Agent": "rental-outreach/1.0 (+https://your-org.example.com)",
-            "Accept": "application/json"
-        })
+        self.http = http or get_http_client()
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """
+        Per-page deadline under CompositeProvider: an Apify run may take up to APIFY_RUN_TIMEOUT_SECONDS
+        to produce its next items; the other paths use PROVIDER_TIMEOUT_SECONDS.
+        """
+        if self._service() == "apify":
+            return float(settings.APIFY_RUN_TIMEOUT_SECONDS)
+        return None
+
+    @staticmethod
+    def _service() -> str:
+        return (getattr(settings, "ZILLOW_SCRAPER_SERVICE", "") or "").lower()
 
     def search_listings(self, city: str = "", state: str = "", min_price: int = 0, max_price: int = 0,
                         beds: int = 0, baths: int = 0, limit: int = 50) -> List[Dict]:
         """
-        Search listings using the configured Zillow integration path.
+        Eager wrapper over iter_listings() for callers that want the whole result as a list;
+        a truncated result is returned as far as it got.
+        """
+        filters = RentalFilters(city=city, state=state, min_price=min_price or None, max_price=max_price or None,
+                                beds=beds or None, baths=baths or None)
+        listings: List[Dict] = []
+        try:
+            for page in self.iter_pages(filters, limit):
+                listings.extend(page)
+        except ResultsTruncated as e:
+            logger.warning("Zillow search truncated after %d listings: %s", len(listings), e)
+        return listings
+
+    def iter_pages(self, filters: RentalFilters, limit: int, page_size: Optional[int] = None) -> Iterator[List[Dict]]:
+        if self._service() == "apify":
+            yield from iter_sync(self._search_via_apify(filters, limit, page_size))
+        else:
+            yield from super().iter_pages(filters, limit, page_size)
+
+    async def aiter_pages(self, filters: RentalFilters, limit: int,
+                          page_size: Optional[int] = None) -> AsyncIterator[List[Dict]]:
+        if self._service() == "apify":
+            pages = self._search_via_apify(filters, limit, page_size)
+        else:
+            pages = super().aiter_pages(filters, limit, page_size)
+        async for page in pages:
+            yield page
+
+    def fetch_page(self, filters: RentalFilters, cursor: Optional[str], page_size: int) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetch one page using the configured Zillow integration path.
 
         Strategy:
         - If ZILLOW_SCRAPER_SERVICE is configured, route to the chosen scraper integration.
+          An Apify actor run cannot be resumed from a cursor, so that path runs the actor for
+          `page_size` listings and returns them as the only page; iter_pages/aiter_pages stream
+          a whole search from one run.
         - Otherwise attempt a hypothetical Zillow partner API under ZILLOW_BASE_URL.
 
-        Returns a list of canonical listing dicts.
+        Returns (canonical listing dicts, next cursor or None).
         """
-        service = (getattr(settings, "ZILLOW_SCRAPER_SERVICE", "") or "").lower()
+        service = self._service()
         if service == "apify":
-            return self._search_via_apify(city, state, min_price, max_price, beds, baths, limit)
+            pages = self.iter_pages(filters, page_size, page_size)
+            try:
+                return next(pages, []), None
+            finally:
+                pages.close()
         if service == "zenrows":
-            return self._search_via_zenrows(city, state, min_price, max_price, beds, baths, limit)
+            return self._search_via_zenrows(filters, cursor, page_size)
         if service == "scraperapi":
-            return self._search_via_scraperapi(city, state, min_price, max_price, beds, baths, limit)
+            return self._search_via_scraperapi(filters, cursor, page_size)
 
         # Fallback to partner API style call
-        return self._search_via_partner_api(city, state, min_price, max_price, beds, baths, limit)
+        return self._search_via_partner_api(filters, cursor, page_size)
 
-    def _search_via_partner_api(self, city, state, min_price, max_price, beds, baths, limit):
+    def _search_via_partner_api(self, filters: RentalFilters, cursor: Optional[str], page_size: int):
         """
         Example partner API call (adapt to your partner API spec).
+        Assumes cursor pagination: `cursor` request param, `next_cursor` in the response.
         """
         endpoint = f"{self.base_url.rstrip('/')}/v1/listings/search"
         params = {
-            "city": city,
-            "state": state,
-            "min_price": min_price or None,
-            "max_price": max_price or None,
-            "beds": beds or None,
-            "baths": baths or None,
-            "limit": limit
+            "city": filters.city,
+            "state": filters.state,
+            "min_price": filters.min_price or None,
+            "max_price": filters.max_price or None,
+            "beds": filters.beds or None,
+            "baths": filters.baths or None,
+            "limit": page_size,
+            "cursor": cursor,
         }
         params = {k: v for k, v in params.items() if v is not None}
-        headers = self.session.headers.copy()
+        headers = {"Accept": "application/json"}
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
 
-        try:
-            resp = self.session.get(endpoint, params=params, headers=headers, timeout=15)
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            logger.exception("Zillow partner API search failed: %s", e)
-            return []
+        data = self.http.get(endpoint, provider="zillow", params=params, headers=headers, timeout=15).json()
 
         results = data.get("listings") or data.get("results") or []
         items = []
@@ -89,101 +141,130 @@ class RentPathProvider:
             mapped = self._map_provider_to_internal(p)
             if mapped:
                 items.append(mapped)
-        return items
+        next_cursor = data.get("next_cursor") or data.get("next")
+        return items, (str(next_cursor) if next_cursor else None)
 
-    def _search_via_apify(self, city, state, min_price, max_price, beds, baths, limit):
+    async def _search_via_apify(self, filters: RentalFilters, limit: int,
+                                page_size: Optional[int]) -> AsyncIterator[List[Dict]]:
         """
-        Example integration with Apify actor that scrapes Zillow.
-        Requires ZILLOW_SCRAPER_API_KEY (Apify token) and an actor configured.
+        Integration with an Apify actor that scrapes Zillow.
+        Requires ZILLOW_SCRAPER_API_KEY (Apify token) and APIFY_ACTOR_ID.
+        Starts one actor run asking for `limit` listings and streams its dataset while it is still
+        running (apps/ingestion/apify.py). Stopping the stream early, by reaching `limit`, closing it
+        or cancelling it, aborts the run.
+
+        Every run reports back to the apify breaker: a run that drains (even with no items) or reaches
+        `limit` is a success; an error, or a cancellation once the run was idle past its deadline (the
+        fan-out gave up on it), is a failure; a stream closed or cancelled before its first page for any
+        other reason gave no verdict, so a half-open trial is handed on.
         """
         apify_key = getattr(settings, "ZILLOW_SCRAPER_API_KEY", "") or ""
         if not apify_key:
             logger.warning("Apify API key not configured (ZILLOW_SCRAPER_API_KEY).")
-            return []
+            return
 
-        # Replace actor_id with your authorized actor
-        actor_id = "eunit/zillow-rent-data-scraper"
-        apify_run_url = f"https://api.apify.com/v2/acts/{actor_id}/runs?token={apify_key}"
         input_payload = {
-            "city": city,
-            "state": state,
-            "min_price": min_price or None,
-            "max_price": max_price or None,
-            "beds": beds or None,
-            "limit": limit
+            "city": filters.city,
+            "state": filters.state,
+            "min_price": filters.min_price or None,
+            "max_price": filters.max_price or None,
+            "beds": filters.beds or None,
+            "limit": limit,
         }
+        # the run manager has its own pooled async client; only the breaker is shared
+        breaker = self.http.breaker("apify")
+        breaker.before_call()
+        page_size = max(1, page_size or settings.INGEST_PAGE_SIZE)
+        remaining = limit
+        pages = get_run_manager(apify_key).iter_pages(settings.APIFY_ACTOR_ID, input_payload, min(page_size, limit))
+        got_page, last_page_at = False, time.monotonic()
         try:
-            resp = self.session.post(apify_run_url, json={"body": input_payload}, timeout=10)
-            resp.raise_for_status()
-            run_info = resp.json()
-            # Actor-specific: robust integration should poll run status then fetch dataset
-            items = run_info.get("defaultDataset", {}).get("items") or run_info.get("items") or []
-        except Exception as e:
-            logger.exception("Apify run failed: %s", e)
-            items = []
-
-        results = []
-        for p in items:
-            mapped = self._map_provider_to_internal(p)
-            if mapped:
-                results.append(mapped)
-        return results
+            async for items in pages:
+                got_page, last_page_at = True, time.monotonic()
+                breaker.record_success()
+                results = []
+                for p in items:
+                    mapped = self._map_provider_to_internal(p)
+                    if mapped:
+                        results.append(mapped)
+                results = results[:remaining]
+                if results:
+                    remaining -= len(results)
+                    yield results
+                if remaining <= 0:
+                    break
+            breaker.record_success()
+        except (GeneratorExit, asyncio.CancelledError) as e:
+            if isinstance(e, asyncio.CancelledError) and time.monotonic() - last_page_at >= self.timeout:
+                breaker.record_failure()
+            elif not got_page:
+                breaker.record_abandoned()
+            raise
+        except BaseException:
+            breaker.record_failure()
+            raise
+        finally:
+            await pages.aclose()
 
-    def _search_via_zenrows(self, city, state, min_price, max_price, beds, baths, limit):
+    def _search_via_zenrows(self, filters: RentalFilters, cursor: Optional[str], page_size: int):
         """
-        Example proxy fetch using ZenRows. Replace parsing logic with a real parser for the HTML returned.
+        Proxy fetch of the Zillow search page through ZenRows, parsed by the streaming HTML extractor.
         """
         zen_key = getattr(settings, "ZILLOW_SCRAPER_API_KEY", "") or ""
         if not zen_key:
             logger.warning("ZenRows API key not configured (ZILLOW_SCRAPER_API_KEY).")
-            return []
+            return [], None
 
-        query = f"https://www.zillow.com/homes/for_rent/{city}-{state}/"
+        query = self._search_page_url(filters, cursor)
         proxy_url = f"https://api.zenrows.com/v1/?apikey={zen_key}&url={requests.utils.quote(query)}"
-        try:
-            resp = self.session.get(proxy_url, timeout=15)
-            resp.raise_for_status()
-            html = resp.text
-            # TODO: parse HTML and extract listing items into structured dicts
-            parsed_items = []
-        except Exception as e:
-            logger.exception("ZenRows proxy fetch failed: %s", e)
-            parsed_items = []
+        return self._fetch_html_page(proxy_url, "zenrows", cursor, page_size)
 
-        results = []
-        for p in parsed_items:
-            mapped = self._map_provider_to_internal(p)
-            if mapped:
-                results.append(mapped)
-        return results
-
-    def _search_via_scraperapi(self, city, state, min_price, max_price, beds, baths, limit):
+    def _search_via_scraperapi(self, filters: RentalFilters, cursor: Optional[str], page_size: int):
         """
         Example integration for ScraperAPI or similar proxy service.
         """
         scraper_key = getattr(settings, "ZILLOW_SCRAPER_API_KEY", "") or ""
         if not scraper_key:
             logger.warning("ScraperAPI key not configured (ZILLOW_SCRAPER_API_KEY).")
-            return []
+            return [], None
 
-        query = f"https://www.zillow.com/homes/for_rent/{city}-{state}/"
+        query = self._search_page_url(filters, cursor)
         proxy_url = f"http://api.scraperapi.com?api_key={scraper_key}&url={requests.utils.quote(query)}"
-        try:
-            resp = self.session.get(proxy_url, timeout=15)
-            resp.raise_for_status()
-            html = resp.text
-            # TODO: parse HTML into structured listing dicts
-            parsed_items = []
-        except Exception as e:
-            logger.exception("ScraperAPI fetch failed: %s", e)
-            parsed_items = []
+        return self._fetch_html_page(proxy_url, "scraperapi", cursor, page_size)
+
+    @staticmethod
+    def _search_page_url(filters: RentalFilters, cursor: Optional[str]) -> str:
+        # cursor is the 1-based search result page number for the scraper paths
+        page = int(cursor or 1)
+        url = f"https://www.zillow.com/homes/for_rent/{filters.city}-{filters.state}/"
+        return url if page <= 1 else f"{url}{page}_p/"
 
+    def _fetch_html_page(self, proxy_url: str, service: str, cursor: Optional[str], page_size: int):
+        """
+        Stream the proxied HTML into the incremental extractor and map listings as they are parsed.
+        A result page is fixed-size on Zillow's side, so page_size does not truncate it.
+        Failures before the body arrives raise; a body cut off mid-way, or the last result page
+        Zillow serves, raises ResultsTruncated with what was parsed.
+        """
         results = []
-        for p in parsed_items:
-            mapped = self._map_provider_to_internal(p)
-            if mapped:
-                results.append(mapped)
-        return results
+        with self.http.get(proxy_url, provider=service, timeout=15, stream=True) as resp:
+            resp.encoding = resp.encoding or "utf-8"
+            chunks = resp.iter_content(chunk_size=HTML_CHUNK_SIZE, decode_unicode=True)
+            try:
+                for p in iter_listings_from_chunks(chunks):
+                    mapped = self._map_provider_to_internal(p)
+                    if mapped:
+                        results.append(mapped)
+            except requests.RequestException as e:
+                if not results:
+                    raise
+                raise ResultsTruncated(f"{service} page {cursor or 1} cut off after {len(results)} listings: {e}",
+                                       results) from e
+
+        page = int(cursor or 1)
+        if results and page >= ZILLOW_MAX_RESULT_PAGES:
+            raise ResultsTruncated(f"Zillow serves no search results past page {ZILLOW_MAX_RESULT_PAGES}", results)
+        return results, (str(page + 1) if results else None)
 
     def _map_provider_to_internal(self, p: Dict) -> Optional[Dict]:
         """
@@ -209,7 +290,7 @@ class RentPathProvider:
             url = p.get("url") or p.get("listing_url") or p.get("detail_url") or ""
             contact_phone = p.get("contact", {}).get("phone") or p.get("phone") or p.get("contact_phone") or ""
 
-            return {
+            listing = {
                 "listing_id": listing_id,
                 "provider": "zillow",
                 "search_id": "",  # set by caller when ingesting into a search context
@@ -225,6 +306,12 @@ class RentPathProvider:
                 "url": url,
                 "contact_phone": contact_phone
             }
+            listing["content_hash"] = content_hash(listing)
+            return listing
         except Exception as e:
             logger.exception("Failed to map Zillow provider listing: %s", e)
             return None
+
+
+# Compatibility alias for callers that imported the adapter under its old name.
+RentPathProvider = ZillowProvider
@@ -0,0 +1,309 @@
+"""
+Cold storage of completed searches.
+
+A search completed more than SEARCH_ARCHIVE_AFTER_DAYS ago is written to two
+zstd-compressed Parquet files in the object store (apps/storage/objects.py):
+
+    archives/searches/<search_id>/summaries.parquet   one row per conversation
+    archives/searches/<search_id>/listings.parquet    one row per listing of the search
+
+and its rows leave the hot tables: its search_listings links, and the listings no other
+search links to, with their conversations, answers and turns. The searches row stays
+as the catalog (archived_at, archive_key), so the dashboard can still page an archived
+search's summaries from its file (SearchArchive.summaries_page).
+
+Run the archival job with:
+    python -m apps.storage.archive
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.orm import Session
+
+from .cache import TTLCache
+from .db import SessionLocal
+from .objects import ObjectStore, create_object_store
+from .orm_models import (AnswerORM, ConversationORM, ListingORM, SearchListingORM, SearchORM, TurnArchiveORM,
+                         TurnORM)
+from .repositories import PLACEHOLDER_PREFIX, SUMMARY_SORTS, ConversationRepository
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PREFIX = "archives/searches/"
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+_archive_cache: Optional[TTLCache] = None
+
+
+def _schemas():
+    import pyarrow as pa  # optional dependency, only needed for archival and archived reads
+
+    summaries = pa.schema([
+        ("call_sid", pa.string()),
+        ("listing_id", pa.string()),
+        ("title", pa.string()),
+        ("address", pa.string()),
+        ("city", pa.string()),
+        ("state", pa.string()),
+        ("zipcode", pa.string()),
+        ("price", pa.int64()),
+        ("beds", pa.float64()),
+        ("baths", pa.float64()),
+        ("sqft", pa.int64()),
+        ("url", pa.string()),
+        ("summary_text", pa.string()),
+        ("summary_status", pa.string()),
+        ("recording_key", pa.string()),
+        ("answers", pa.string()),  # answers as JSON
+        ("facts", pa.string()),  # facts as JSON
+    ])
+    listings = pa.schema([
+        ("listing_id", pa.string()),
+        ("provider", pa.string()),
+        ("title", pa.string()),
+        ("address", pa.string()),
+        ("city", pa.string()),
+        ("state", pa.string()),
+        ("zipcode", pa.string()),
+        ("price", pa.int64()),
+        ("beds", pa.float64()),
+        ("baths", pa.float64()),
+        ("sqft", pa.int64()),
+        ("url", pa.string()),
+        ("contact_phone", pa.string()),
+        ("dedup_key", pa.string()),
+        ("canonical_id", pa.string()),
+        ("content_hash", pa.string()),
+        ("content_changed_at", pa.timestamp("us")),
+        ("score", pa.float64()),
+        ("first_seen_at", pa.timestamp("us")),
+        ("removed_at", pa.timestamp("us")),
+    ])
+    return summaries, listings
+
+
+def _to_parquet(rows: List[Dict], schema) -> bytes:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buf = pa.BufferOutputStream()
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), buf, compression="zstd")
+    return buf.getvalue().to_pybytes()
+
+
+def _from_parquet(data: bytes) -> List[Dict]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    return pq.read_table(pa.BufferReader(data)).to_pylist()
+
+
+def get_archive_cache() -> TTLCache:
+    """
+    Parsed summaries of recently read archived searches, so paging one does not re-read its file.
+    """
+    global _archive_cache
+    if _archive_cache is None:
+        _archive_cache = TTLCache(settings.SEARCH_ARCHIVE_CACHE_ENTRIES, ttl_seconds=600)
+    return _archive_cache
+
+
+class SearchArchive:
+    def __init__(self, db: Optional[Session] = None, store: Optional[ObjectStore] = None):
+        self.db = db or SessionLocal()
+        self._store = store
+
+    @property
+    def store(self) -> ObjectStore:
+        if self._store is None:
+            self._store = create_object_store(bucket=settings.S3_BUCKET_ARCHIVE or None)
+        return self._store
+
+    def archive_older_than(self, older_than: datetime, limit: int = 100) -> int:
+        """
+        Archive up to `limit` searches completed before `older_than`; returns how many were archived.
+        """
+        stmt = select(SearchORM.search_id)\
+            .where(SearchORM.archived_at.is_(None), SearchORM.completed_at < older_than)\
+            .order_by(SearchORM.completed_at).limit(limit)
+        search_ids = list(self.db.execute(stmt).scalars())
+        for search_id in search_ids:
+            self.archive_search(search_id)
+        return len(search_ids)
+
+    def archive_search(self, search_id: str, now: Optional[datetime] = None) -> str:
+        """
+        Write a search's summaries and listings to Parquet, then drop its rows from the hot tables.
+        The files are written before anything is deleted, so a failed upload leaves the search hot.
+        Returns the archive key prefix.
+        """
+        summaries_schema, listings_schema = _schemas()
+        prefix = f"{ARCHIVE_PREFIX}{search_id}/"
+        summaries = self._summary_rows(search_id)
+        listings = self._listing_rows(search_id)
+        self.store.put(prefix + "summaries.parquet", _to_parquet(summaries, summaries_schema),
+                       content_type=PARQUET_CONTENT_TYPE)
+        self.store.put(prefix + "listings.parquet", _to_parquet(listings, listings_schema),
+                       content_type=PARQUET_CONTENT_TYPE)
+
+        purged = self._purge(search_id, [l["listing_id"] for l in listings])
+        self.db.execute(update(SearchORM).where(SearchORM.search_id == search_id)
+                        .values(archived_at=now or datetime.utcnow(), archive_key=prefix))
+        self.db.commit()
+        get_archive_cache().pop(search_id)
+        logger.info("Archived search %s to %s: %d summaries, %d listings (%d purged from hot tables)",
+                    search_id, prefix, len(summaries), len(listings), purged)
+        return prefix
+
+    def _summary_rows(self, search_id: str) -> List[Dict]:
+        """
+        The calls made to the search's listings. A call's conversation carries its listing once
+        CallExecutor linked the real CallSid (ConversationRepository.link_call); the placeholder of
+        a call that was never placed is not a call and is left out (it is purged with its listing).
+        """
+        stmt = select(
+            ConversationORM.call_sid, ListingORM.listing_id, ListingORM.title, ListingORM.address, ListingORM.city,
+            ListingORM.state, ListingORM.zipcode, ListingORM.price, ListingORM.beds, ListingORM.baths, ListingORM.sqft,
+            ListingORM.url, ConversationORM.summary_text, ConversationORM.summary_status, ConversationORM.recording_key,
+            ConversationORM.answers, ConversationORM.facts,
+        ).join(ListingORM, ConversationORM.listing_id == ListingORM.listing_id)\
+            .join(SearchListingORM, SearchListingORM.listing_id == ListingORM.listing_id)\
+            .where(SearchListingORM.search_id == search_id, ~ConversationORM.call_sid.startswith(PLACEHOLDER_PREFIX))
+        rows = []
+        for row in self.db.execute(stmt):
+            r = dict(row._mapping)
+            r["answers"] = json.dumps(r["answers"] or {})
+            r["facts"] = json.dumps(r["facts"] or {})
+            rows.append(r)
+        return rows
+
+    def _listing_rows(self, search_id: str) -> List[Dict]:
+        _, schema = _schemas()
+        listing_cols = [ListingORM.__table__.c[name] for name in schema.names if name in ListingORM.__table__.c]
+        links = SearchListingORM.__table__
+        stmt = select(*listing_cols, links.c.score, links.c.first_seen_at, links.c.removed_at)\
+            .join(links, links.c.listing_id == ListingORM.__table__.c.listing_id)\
+            .where(links.c.search_id == search_id)
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
+
+    def _purge(self, search_id: str, listing_ids: List[str]) -> int:
+        """
+        Unlink a search's listings and delete those no other search links to, with their conversations.
+        Children are deleted explicitly rather than relying on ON DELETE CASCADE, which SQLite skips by default.
+        """
+        self.db.execute(delete(SearchListingORM).where(SearchListingORM.search_id == search_id))
+        batch_size = max(1, settings.UPSERT_BATCH_SIZE)
+        purged = 0
+        for i in range(0, len(listing_ids), batch_size):
+            linked_elsewhere = exists().where(SearchListingORM.listing_id == ListingORM.listing_id)
+            orphans = list(self.db.execute(select(ListingORM.listing_id).where(
+                ListingORM.listing_id.in_(listing_ids[i:i + batch_size]), ~linked_elsewhere)).scalars())
+            if not orphans:
+                continue
+            # materialized first: deleting the conversations must not change what the children matched
+            call_sids = list(self.db.execute(select(ConversationORM.call_sid)
+                                             .where(ConversationORM.listing_id.in_(orphans))).scalars())
+            for j in range(0, len(call_sids), batch_size):
+                chunk = call_sids[j:j + batch_size]
+                for child in (AnswerORM, TurnORM, TurnArchiveORM):
+                    self.db.execute(delete(child).where(child.call_sid.in_(chunk)))
+                self.db.execute(delete(ConversationORM).where(ConversationORM.call_sid.in_(chunk)))
+            self.db.execute(delete(ListingORM).where(ListingORM.listing_id.in_(orphans)))
+            purged += len(orphans)
+        return purged
+
+    def summaries(self, search: SearchORM) -> List[Dict]:
+        """
+        Every summary row of an archived search, read from its Parquet file (cached).
+        """
+        cache = get_archive_cache()
+        rows = cache.get(search.search_id)
+        if rows is None:
+            rows = _from_parquet(self.store.get(search.archive_key + "summaries.parquet"))
+            cache.set(search.search_id, rows)
+        return rows
+
+    def summaries_page(self, search: SearchORM, limit: int = 50, cursor: Optional[str] = None,
+                       sort: str = "price", order: str = "asc",
+                       min_price: Optional[int] = None, max_price: Optional[int] = None,
+                       min_beds: Optional[float] = None, status: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        ConversationRepository.list_summaries_page over an archived search: same filters, ordering,
+        cursors and item shape. Raises ValueError on bad arguments.
+        """
+        if sort not in SUMMARY_SORTS or order not in ("asc", "desc"):
+            raise ValueError(f"unsupported sort {sort!r} {order!r}")
+        if status not in (None, "", "all", "done", "pending", "failed"):
+            raise ValueError(f"unsupported status {status!r}")
+        rows = [r for r in self.summaries(search) if _matches(r, min_price, max_price, min_beds, status)]
+
+        # NULLs last in either direction, then call_sid ascending
+        present = sorted((r for r in rows if r[sort] is not None), key=lambda r: r["call_sid"])
+        present.sort(key=lambda r: r[sort], reverse=order == "desc")
+        rows = present + sorted((r for r in rows if r[sort] is None), key=lambda r: r["call_sid"])
+
+        if cursor:
+            value, last_sid = ConversationRepository._decode_cursor(cursor, sort, order)
+            rows = [r for r in rows if _after(r, sort, order, value, last_sid)]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = ConversationRepository._encode_cursor(sort, order, last[sort], last["call_sid"])
+        return [_summary_item(r) for r in rows], next_cursor
+
+
+def _matches(r: Dict, min_price, max_price, min_beds, status) -> bool:
+    if min_price is not None and (r["price"] is None or r["price"] < min_price):
+        return False
+    if max_price is not None and (r["price"] is None or r["price"] > max_price):
+        return False
+    if min_beds is not None and (r["beds"] is None or r["beds"] < min_beds):
+        return False
+    if status == "done" and not r["summary_text"]:
+        return False
+    if status == "pending" and r["summary_text"]:
+        return False
+    if status == "failed" and r.get("summary_status") != "failed":
+        return False
+    return True
+
+
+def _after(r: Dict, sort: str, order: str, value: Any, last_sid: str) -> bool:
+    v = r[sort]
+    if value is None:
+        return v is None and r["call_sid"] > last_sid
+    if v is None:
+        return True
+    if v == value:
+        return r["call_sid"] > last_sid
+    return v > value if order == "asc" else v < value
+
+
+def _summary_item(r: Dict) -> Dict:
+    return {
+        "listing_id": r["listing_id"],
+        "call_sid": r["call_sid"],
+        "listing_details": {k: r[k] for k in
+                            ("title", "address", "city", "state", "zipcode", "price", "beds", "baths", "sqft", "url")},
+        "summary_text": r["summary_text"] or "",
+        "summary_status": "done" if r["summary_text"] else r.get("summary_status") or "pending",
+        "facts": json.loads(r.get("facts") or "{}"),  # absent from archives written before facts existed
+        "archived": True,
+    }
+
+
+if __name__ == "__main__":
+    from .db import session_scope
+
+    logging.basicConfig(level=logging.INFO)
+    older_than = datetime.utcnow() - timedelta(days=settings.SEARCH_ARCHIVE_AFTER_DAYS)
+    with session_scope(write=True) as db:
+        count = SearchArchive(db).archive_older_than(older_than)
+    logger.info("Archived %d searches completed before %s", count, older_than)
@@ -0,0 +1,213 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .orm_models import ListingORM, ConversationORM, AnswerORM, TurnORM, TurnArchiveORM
+from .repositories import ON_CONFLICT_INSERTS, PLACEHOLDER_PREFIX, merge_answer_rows
+from apps.conversation.answers import answer_facts, question_key
+from apps.conversation.transcripts import answers_delta, turn_row
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncListingRepository:
+    """
+    Read side of ListingRepository for async routes.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, listing_id: str) -> Optional[ListingORM]:
+        return await self.db.get(ListingORM, listing_id)
+
+
+class AsyncConversationRepository:
+    """
+    ConversationRepository for async routes (the Twilio webhook); same semantics, awaitable I/O.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_or_create(self, call_sid: Optional[str], listing_id: str) -> ConversationORM:
+        """
+        If call_sid exists, return that conversation. Otherwise create a placeholder
+        conversation keyed by a temporary SID and ensure listing_id is stored.
+        """
+        if call_sid:
+            obj = await self.db.get(ConversationORM, call_sid)
+            if obj:
+                return obj
+
+        temp_sid = call_sid or f"{PLACEHOLDER_PREFIX}{listing_id}"
+        obj = await self.db.get(ConversationORM, temp_sid)
+        if not obj:
+            # end the read first: on a (deferred) read session, SQLite cannot upgrade a read
+            # transaction that another writer has overtaken, while a fresh one waits for the lock
+            await self.db.rollback()
+            obj = ConversationORM(call_sid=temp_sid, listing_id=listing_id or None, state="INTRO", answers={},
+                                  questions=[])
+            self.db.add(obj)
+            await self.db.commit()
+            logger.info("Created new conversation placeholder %s for listing %s", temp_sid, listing_id)
+        return obj
+
+    async def attach_questions(self, call_sid: str, questions: List[str]):
+        obj = await self.db.get(ConversationORM, call_sid)
+        if obj:
+            obj.questions = questions
+            await self.db.commit()
+            logger.debug("Attached %d questions to conversation %s", len(questions), call_sid)
+        else:
+            logger.warning("attach_questions: conversation %s not found", call_sid)
+
+    async def update(self, call_sid: str, state: str, answers: Dict[str, str]):
+        obj = await self.db.get(ConversationORM, call_sid)
+        if not obj:
+            obj = ConversationORM(call_sid=call_sid, listing_id=None, state=state, answers=answers, questions=[],
+                                  facts=answer_facts(answers))
+            self.db.add(obj)
+            self.db.add_all(merge_answer_rows([], obj))
+            await self.db.commit()
+            logger.info("Created conversation record on update for call_sid %s", call_sid)
+            return
+        obj.state = state
+        obj.answers = answers
+        obj.facts = answer_facts(answers)
+        existing = (await self.db.execute(select(AnswerORM).where(AnswerORM.call_sid == call_sid))).scalars().all()
+        self.db.add_all(merge_answer_rows(existing, obj))
+        await self.db.commit()
+        logger.debug("Updated conversation %s state=%s", call_sid, state)
+
+    async def append_turns(self, call_sid: str, listing_id: str, state: str, events: List[Dict[str, Any]],
+                           answers: Optional[Dict[str, str]] = None,
+                           facts: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """
+        Append a batch of turn events (apps/conversation/transcripts.py) and derive the current
+        state from them: the conversation's state column and the answer rows of the questions the
+        batch answered. The answers blob is rewritten only when `answers` is given (at call end),
+        the typed facts whenever `facts` is. One transaction per batch.
+        A turn already logged (the same batch flushed twice: an evicted session and the call-status
+        callback, two workers on a shared Redis session) is skipped, not an error.
+        """
+        values = {"state": state}
+        if answers is not None:
+            values["answers"] = answers
+        if facts is not None:
+            values["facts"] = facts
+        res = await self.db.execute(update(ConversationORM).where(ConversationORM.call_sid == call_sid).values(**values))
+        if not res.rowcount:
+            self.db.add(ConversationORM(call_sid=call_sid, listing_id=listing_id or None, state=state,
+                                        answers=answers or {}, questions=[], facts=facts))
+            await self.db.flush()
+            logger.info("Created conversation record on append_turns for call_sid %s", call_sid)
+        if events:
+            dialect_insert = ON_CONFLICT_INSERTS.get(self.db.get_bind().dialect.name)
+            stmt = insert(TurnORM) if dialect_insert is None else \
+                dialect_insert(TurnORM).on_conflict_do_nothing(index_elements=["call_sid", "turn"])
+            await self.db.execute(stmt, [turn_row(call_sid, e) for e in events])
+        delta = answers_delta(events)
+        if delta:
+            keys = [question_key(q) for q in delta]
+            existing = (await self.db.execute(select(AnswerORM).where(
+                AnswerORM.call_sid == call_sid, AnswerORM.question_key.in_(keys)))).scalars().all()
+            convo = ConversationORM(call_sid=call_sid, listing_id=listing_id or None)
+            self.db.add_all(merge_answer_rows(existing, convo, answers=delta))
+        await self.db.commit()
+        logger.debug("Appended %d turns to conversation %s state=%s", len(events), call_sid, state)
+
+    async def current_answers(self, convo: ConversationORM) -> Dict[str, str]:
+        """
+        A conversation's answers: the blob (written at call end) overlaid with its answer rows,
+        which are kept current turn by turn.
+        """
+        answers = dict(convo.answers or {})
+        rows = await self.db.execute(select(AnswerORM.question, AnswerORM.raw_text)
+                                     .where(AnswerORM.call_sid == convo.call_sid))
+        answers.update({question: raw or "" for question, raw in rows})
+        return answers
+
+    async def turn_count(self, call_sid: str) -> int:
+        """
+        Next turn index of a call: turns logged so far, archived or not.
+        """
+        live = await self.db.scalar(select(func.count()).select_from(TurnORM).where(TurnORM.call_sid == call_sid))
+        archived = await self.db.scalar(select(TurnArchiveORM.turns).where(TurnArchiveORM.call_sid == call_sid))
+        return (live or 0) + (archived or 0)
+
+    async def save_summary(self, call_sid: str, summary: str):
+        obj = await self.db.get(ConversationORM, call_sid)
+        if obj:
+            obj.summary_text = summary
+            obj.summary_status = "done"
+            obj.summary_updated_at = datetime.utcnow()
+            await self.db.commit()
+            logger.info("Saved summary for conversation %s", call_sid)
+        else:
+            logger.warning("save_summary: conversation %s not found", call_sid)
+
+    async def request_summary(self, call_sid: str) -> None:
+        """
+        Mark a conversation's summary as pending. Idempotent: a summary already pending, running or done is left alone.
+        """
+        await self.db.execute(update(ConversationORM).where(
+            ConversationORM.call_sid == call_sid,
+            or_(ConversationORM.summary_status.is_(None), ConversationORM.summary_status == "failed"),
+        ).values(summary_status="pending", summary_attempts=0, summary_error=None,
+                 summary_updated_at=datetime.utcnow()))
+        await self.db.commit()
+
+    async def claim_summaries(self, call_sids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Move the pending summaries among `call_sids` to running, one conditional UPDATE each so a
+        conversation is claimed by one worker only. Returns the claimed jobs: call_sid, attempts
+        (including this one), listing_context and answers.
+        """
+        now = datetime.utcnow()
+        claimed = []
+        for call_sid in call_sids:
+            res = await self.db.execute(update(ConversationORM).where(
+                ConversationORM.call_sid == call_sid, ConversationORM.summary_status == "pending",
+            ).values(summary_status="running", summary_attempts=ConversationORM.summary_attempts + 1,
+                     summary_updated_at=now))
+            if res.rowcount:
+                claimed.append(call_sid)
+        await self.db.commit()
+        if not claimed:
+            return []
+        rows = await self.db.execute(
+            select(ConversationORM.call_sid, ConversationORM.summary_attempts, ConversationORM.answers,
+                   ListingORM.title, ListingORM.address)
+            .outerjoin(ListingORM, ListingORM.listing_id == ConversationORM.listing_id)
+            .where(ConversationORM.call_sid.in_(claimed)))
+        return [{
+            "call_sid": r.call_sid,
+            "attempts": r.summary_attempts or 0,
+            "listing_context": {"title": r.title, "address": r.address},
+            "answers": r.answers or {},
+        } for r in rows]
+
+    async def fail_summary(self, call_sid: str, error: str, final: bool) -> None:
+        """
+        Record a failed summary attempt: back to pending for a retry, or failed when `final`.
+        """
+        await self.db.execute(update(ConversationORM).where(ConversationORM.call_sid == call_sid).values(
+            summary_status="failed" if final else "pending", summary_error=error[:500],
+            summary_updated_at=datetime.utcnow()))
+        await self.db.commit()
+
+    async def pending_summaries(self, stale_before: datetime, limit: int = 1000) -> List[str]:
+        """
+        Summaries waiting for a worker: pending, or running since before `stale_before` (their worker died).
+        Stale running ones are put back to pending.
+        """
+        await self.db.execute(update(ConversationORM).where(
+            ConversationORM.summary_status == "running", ConversationORM.summary_updated_at < stale_before,
+        ).values(summary_status="pending"))
+        await self.db.commit()
+        rows = await self.db.execute(select(ConversationORM.call_sid)
+                                     .where(ConversationORM.summary_status == "pending")
+                                     .order_by(ConversationORM.summary_updated_at).limit(limit))
+        return list(rows.scalars())
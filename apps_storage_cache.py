@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL and an entry cap.
+    Expired entries are dropped lazily on access; the least recently used entry
+    is evicted when the cap is reached. `on_evict(key, value)` is called (outside the
+    lock) for every entry dropped either way, not for pop() or clear().
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl_seconds
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+        self._evicted([(key, value)])
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        evicted = []
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+                self.evictions += 1
+        self._evicted(evicted)
+
+    def _evicted(self, entries: List[Tuple[Hashable, Any]]) -> None:
+        if self.on_evict is not None:
+            for key, value in entries:
+                self.on_evict(key, value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisTier:
+    """
+    Optional shared tier backed by Redis (REDIS_URL). Values are JSON-encoded and
+    expire server-side. Connection errors are logged and treated as misses so a
+    Redis outage degrades to the in-process tier instead of failing requests.
+    aget/aset/adelete are the forms for async code: they go through redis.asyncio
+    (one client per event loop) instead of blocking the loop on a socket.
+    """
+
+    def __init__(self, url: str, prefix: str, ttl_seconds: float):
+        import redis  # optional dependency, only needed when a Redis tier is enabled
+
+        self.url = url
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._aclients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self.prefix = prefix
+        self.ttl = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: Hashable) -> str:
+        raw = json.dumps(key, sort_keys=True, default=str).encode("utf-8")
+        return self.prefix + hashlib.sha1(raw).hexdigest()
+
+    def _aclient(self):
+        loop = asyncio.get_running_loop()
+        client = self._aclients.get(loop)
+        if client is None:
+            import redis.asyncio
+
+            client = redis.asyncio.Redis.from_url(self.url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            self._aclients[loop] = client
+        return client
+
+    def _ttl(self, ttl: Optional[float]) -> int:
+        return int(max(1, self.ttl if ttl is None else ttl))
+
+    def _loaded(self, raw: Optional[bytes], default: Any) -> Any:
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+
+    def _failed(self, op: str, e: Exception) -> None:
+        self.errors += 1
+        logger.warning("Redis cache %s failed: %s", op, e)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            raw = self.client.get(self._key(key))
+        except Exception as e:
+            self._failed("get", e)
+            return default
+        return self._loaded(raw, default)
+
+    async def aget(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            raw = await self._aclient().get(self._key(key))
+        except Exception as e:
+            self._failed("get", e)
+            return default
+        return self._loaded(raw, default)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            self.client.setex(self._key(key), self._ttl(ttl), json.dumps(value, default=str))
+        except Exception as e:
+            self._failed("set", e)
+
+    async def aset(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            await self._aclient().setex(self._key(key), self._ttl(ttl), json.dumps(value, default=str))
+        except Exception as e:
+            self._failed("set", e)
+
+    def delete(self, key: Hashable) -> None:
+        try:
+            self.client.delete(self._key(key))
+        except Exception as e:
+            self._failed("delete", e)
+
+    async def adelete(self, key: Hashable) -> None:
+        try:
+            await self._aclient().delete(self._key(key))
+        except Exception as e:
+            self._failed("delete", e)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+class TieredCache:
+    """
+    In-process TTLCache in front of an optional RedisTier. Redis hits are promoted
+    into the local tier; writes go to both. aget/aset are the forms for async code.
+    """
+
+    def __init__(self, memory: TTLCache, redis_tier: Optional[RedisTier] = None):
+        self.memory = memory
+        self.redis = redis_tier
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.redis is not None:
+            value = self.redis.get(key, _MISSING)
+            if value is not _MISSING:
+                self.memory.set(key, value)
+                return value
+        return default
+
+    async def aget(self, key: Hashable, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.redis is not None:
+            value = await self.redis.aget(key, _MISSING)
+            if value is not _MISSING:
+                self.memory.set(key, value)
+                return value
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl)
+        if self.redis is not None:
+            self.redis.set(key, value, ttl)
+
+    async def aset(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl)
+        if self.redis is not None:
+            await self.redis.aset(key, value, ttl)
+
+    def delete(self, key: Hashable) -> None:
+        self.memory.pop(key)
+        if self.redis is not None:
+            self.redis.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"memory": self.memory.stats()}
+        if self.redis is not None:
+            out["redis"] = self.redis.stats()
+        return out
+
+
+def build_cache(name: str, max_entries: int, ttl_seconds: float, use_redis: bool, redis_url: str = "") -> TieredCache:
+    """
+    Build a TieredCache; the Redis tier is added only when requested and importable.
+    """
+    redis_tier = None
+    if use_redis and redis_url:
+        try:
+            redis_tier = RedisTier(redis_url, prefix=f"rental:{name}:", ttl_seconds=ttl_seconds)
+        except ImportError:
+            logger.warning("redis package not installed; %s cache runs in-process only", name)
+    return TieredCache(TTLCache(max_entries, ttl_seconds), redis_tier)
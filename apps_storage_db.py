@@ -1,6 +1,295 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from config.settings import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, pool_size=10, max_overflow=20)
+
+class PoolMetrics:
+    """
+    Checkout counters for the engine's connection pool: how long callers waited for a
+    connection (total/max and a coarse histogram), and how often the wait timed out.
+    """
+
+    BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.wait_buckets = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def observe(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            i = 0
+            while i < len(self.BUCKETS_MS) and wait_ms > self.BUCKETS_MS[i]:
+                i += 1
+            self.wait_buckets[i] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            labels = [f"<={b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": self.wait_ms_total / self.checkouts if self.checkouts else 0.0,
+                "wait_ms_max": self.wait_ms_max,
+                "wait_ms_histogram": dict(zip(labels, self.wait_buckets)),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times every checkout, including the wait for a free connection.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.observe((time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+        pool_metrics.observe((time.perf_counter() - started) * 1000)
+        return conn
+
+
+# Execution option picking how a SQLite transaction begins: DEFERRED (default) or IMMEDIATE
+SQLITE_BEGIN = "sqlite_begin"
+
+
+def is_sqlite(url: str) -> bool:
+    return str(url).startswith("sqlite")
+
+
+def _sqlite_in_memory(url: str) -> bool:
+    database = make_url(str(url)).database
+    return not database or database == ":memory:" or "mode=memory" in str(url)
+
+
+def writer_engine(engine):
+    """
+    The engine for units of work that write: on SQLite their transactions begin IMMEDIATE
+    (configure_sqlite); other databases ignore the option. Works for an AsyncEngine too.
+    """
+    return engine.execution_options(**{SQLITE_BEGIN: "IMMEDIATE"})
+
+
+def configure_sqlite(engine: Engine) -> None:
+    """
+    Embedded mode: WAL, the SQLITE_* pragmas on every new connection, and the transaction mode
+    of each unit of work. SQLite has a single writer. Units of work that write run on
+    writer_engine() (WriteSessionLocal, session_scope(write=True), get_write_db,
+    get_async_sessionmaker(write=True)) and begin IMMEDIATE: they take the write lock up front,
+    so concurrent writers (scheduler threads, the webhook) queue on busy_timeout instead of
+    failing with "database is locked" when a deferred read transaction tries to upgrade to a
+    write. Everything else begins DEFERRED and takes no write lock, so under WAL reads never
+    wait for the writer, and the writer never waits for them. For an AsyncEngine pass its sync_engine.
+    """
+    pragmas = (
+        "journal_mode=WAL",
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        "foreign_keys=ON",
+        "temp_store=MEMORY",
+        f"cache_size=-{int(settings.SQLITE_CACHE_KB)}",
+        f"mmap_size={int(settings.SQLITE_MMAP_BYTES)}",
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None  # the driver would BEGIN (deferred) itself; SQLAlchemy does it below
+        cursor = dbapi_conn.cursor()
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql(f"BEGIN {conn.get_execution_options().get(SQLITE_BEGIN, 'DEFERRED')}")
+
+
+def create_db_engine(url: str) -> Engine:
+    """
+    Sync engine for DATABASE_URL: a server database on the instrumented pool, or embedded SQLite
+    (configure_sqlite); an in-memory SQLite database is one connection shared by all sessions.
+    """
+    url = str(url)
+    if not is_sqlite(url):
+        return create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_pre_ping=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if _sqlite_in_memory(url):
+        kwargs["poolclass"] = StaticPool
+    else:
+        directory = os.path.dirname(make_url(url).database)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        kwargs.update(poolclass=InstrumentedQueuePool, pool_size=settings.DB_POOL_SIZE,
+                      max_overflow=settings.DB_MAX_OVERFLOW, pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS)
+    engine = create_engine(url, **kwargs)
+    configure_sqlite(engine)
+    return engine
+
+
+engine = create_db_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+WriteSessionLocal = sessionmaker(bind=writer_engine(engine), autocommit=False, autoflush=False)
+
+
+def get_db() -> Iterator[Session]:
+    """
+    FastAPI dependency: one session per request, closed (connection returned) when the request ends.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_write_db() -> Iterator[Session]:
+    """
+    get_db for routes that write (WriteSessionLocal).
+    """
+    db = WriteSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def session_scope(write: bool = False) -> Iterator[Session]:
+    """
+    Unit of work for code outside a request (scheduler threads, scripts): commits on success,
+    rolls back on error, always closes. Pass write=True when it writes.
+    """
+    db = WriteSessionLocal() if write else SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+_ASYNC_DRIVERS = (
+    ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+    ("postgresql://", "postgresql+asyncpg://"),
+    ("postgres://", "postgresql+asyncpg://"),
+    ("sqlite+pysqlite://", "sqlite+aiosqlite://"),
+    ("sqlite://", "sqlite+aiosqlite://"),
+)
+
+
+def async_database_url(url: str) -> str:
+    """
+    Map a sync DATABASE_URL onto its async driver; URLs that already name one pass through.
+    """
+    for sync_prefix, async_prefix in _ASYNC_DRIVERS:
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+_async_write_sessionmaker: Optional[async_sessionmaker] = None
+_async_lock = threading.Lock()
+
+
+def get_async_sessionmaker(write: bool = False) -> async_sessionmaker:
+    """
+    Created on first use, so processes that never serve async routes do not need the async driver.
+    With write=True, for units of work that write (writer_engine).
+    """
+    global _async_engine, _async_sessionmaker, _async_write_sessionmaker
+    with _async_lock:
+        if _async_sessionmaker is None:
+            url = settings.ASYNC_DATABASE_URL or async_database_url(str(settings.DATABASE_URL))
+            _async_engine = create_async_db_engine(url)
+            # objects stay readable after commit without a lazy (blocking) refresh
+            _async_sessionmaker = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+            _async_write_sessionmaker = async_sessionmaker(writer_engine(_async_engine), expire_on_commit=False,
+                                                           autoflush=False)
+        return _async_write_sessionmaker if write else _async_sessionmaker
+
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """
+    Async engine; SQLite (aiosqlite) gets the same embedded-mode setup as create_db_engine.
+    """
+    if not is_sqlite(url):
+        return create_async_engine(url, pool_pre_ping=True, pool_size=settings.DB_POOL_SIZE,
+                                   max_overflow=settings.DB_MAX_OVERFLOW, pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS)
+    if _sqlite_in_memory(url):  # not shared with the sync engine
+        async_engine = create_async_engine(url, poolclass=StaticPool)
+    else:
+        # aiosqlite would default to NullPool: a new connection (thread, pragmas) per session
+        async_engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=settings.DB_POOL_SIZE,
+                                           max_overflow=settings.DB_MAX_OVERFLOW,
+                                           pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS)
+    configure_sqlite(async_engine.sync_engine)
+    return async_engine
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency for async routes: one AsyncSession per request, closed when the request ends.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_write_db() -> AsyncIterator[AsyncSession]:
+    """
+    get_async_db for async routes that write.
+    """
+    async with get_async_sessionmaker(write=True)() as db:
+        yield db
+
+
+def pool_stats() -> Dict:
+    pool = engine.pool
+    stats = {"dialect": engine.dialect.name}
+    if hasattr(pool, "checkedout"):  # not on the StaticPool of an in-memory SQLite database
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),  # connections in use right now
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),  # negative while the pool has not filled up to size
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+        })
+    stats.update(pool_metrics.snapshot())
+    if _async_engine is not None:
+        apool = _async_engine.pool
+        if hasattr(apool, "checkedout"):
+            stats["async"] = {"size": apool.size(), "checked_out": apool.checkedout(), "overflow": apool.overflow()}
+    return stats
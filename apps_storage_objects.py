@@ -1,19 +1,143 @@
-import boto3
+"""
+Object storage for call recordings: S3 (multipart) or the local filesystem.
+
+Both backends take a stream of chunks, so a recording is never held in memory whole:
+S3 buffers at most one part (S3_MULTIPART_PART_BYTES) before uploading it, the local
+backend writes chunks to a temporary file that is renamed into place when complete.
+"""
+
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
 from config.settings import settings
 
-class ObjectStore:
-    def __init__(self):
-        if not settings.S3_ENDPOINT_URL:
-            self.client = None
-        else:
-            self.client = boto3.client(
-                "s3",
-                endpoint_url=settings.S3_ENDPOINT_URL,
-                aws_access_key_id=settings.S3_ACCESS_KEY,
-                aws_secret_access_key=settings.S3_SECRET_KEY,
-            )
-        self.bucket = settings.S3_BUCKET_RECORDINGS
-
-    def put(self, key: str, data: bytes, content_type="audio/mpeg"):
-        if self.client:
-            self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type)
+logger = logging.getLogger(__name__)
+
+S3_MIN_PART_BYTES = 5 * 1024 * 1024  # S3 rejects smaller parts, except the last
+
+
+class ObjectStore(ABC):
+    """
+    Interface of the storage backends; create_object_store() picks one from settings.
+    """
+
+    def put(self, key: str, data: bytes, content_type: str = "audio/mpeg") -> int:
+        return self.put_stream(key, [data], content_type=content_type)
+
+    @abstractmethod
+    def put_stream(self, key: str, chunks: Iterable[bytes], content_type: str = "audio/mpeg") -> int:
+        """
+        Store the concatenated chunks under `key`; returns the number of bytes written.
+        """
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """
+        The object stored under `key`.
+        """
+
+
+class S3ObjectStore(ObjectStore):
+    def __init__(self, bucket: Optional[str] = None, part_bytes: Optional[int] = None):
+        import boto3  # only needed for the S3 backend
+
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            aws_access_key_id=settings.S3_ACCESS_KEY,
+            aws_secret_access_key=settings.S3_SECRET_KEY,
+        )
+        self.bucket = bucket or settings.S3_BUCKET_RECORDINGS
+        self.part_bytes = max(S3_MIN_PART_BYTES, part_bytes or settings.S3_MULTIPART_PART_BYTES)
+
+    def put_stream(self, key: str, chunks: Iterable[bytes], content_type: str = "audio/mpeg") -> int:
+        """
+        Objects smaller than one part go up with a single PUT; larger ones as a multipart
+        upload, which is aborted if the stream or an upload fails.
+        """
+        buf = bytearray()
+        upload_id = None
+        parts = []
+        total = 0
+        try:
+            for chunk in chunks:
+                buf += chunk
+                total += len(chunk)
+                if len(buf) >= self.part_bytes:
+                    if upload_id is None:
+                        upload_id = self.client.create_multipart_upload(
+                            Bucket=self.bucket, Key=key, ContentType=content_type)["UploadId"]
+                    parts.append(self._upload_part(key, upload_id, len(parts) + 1, bytes(buf)))
+                    buf.clear()
+            if upload_id is None:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=bytes(buf), ContentType=content_type)
+                return total
+            if buf:
+                parts.append(self._upload_part(key, upload_id, len(parts) + 1, bytes(buf)))
+            self.client.complete_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id,
+                                                  MultipartUpload={"Parts": parts})
+        except Exception:
+            if upload_id is not None:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+        logger.debug("Uploaded %s (%d bytes, %d parts)", key, total, len(parts))
+        return total
+
+    def get(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def _upload_part(self, key: str, upload_id: str, number: int, data: bytes) -> dict:
+        resp = self.client.upload_part(Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data)
+        return {"PartNumber": number, "ETag": resp["ETag"]}
+
+
+class LocalObjectStore(ObjectStore):
+    """
+    Filesystem backend for development and tests; keys are paths under LOCAL_OBJECT_STORE_DIR.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or settings.LOCAL_OBJECT_STORE_DIR)
+
+    def path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"object key escapes the store: {key!r}")
+        return path
+
+    def put_stream(self, key: str, chunks: Iterable[bytes], content_type: str = "audio/mpeg") -> int:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".upload-")
+        total = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    total += len(chunk)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return total
+
+    def get(self, key: str) -> bytes:
+        with open(self.path(key), "rb") as f:
+            return f.read()
+
+
+def create_object_store(bucket: Optional[str] = None) -> ObjectStore:
+    """
+    OBJECT_STORE_BACKEND: s3 | local; empty picks s3 when S3_ENDPOINT_URL is set, local otherwise.
+    `bucket` overrides S3_BUCKET_RECORDINGS on S3.
+    """
+    backend = (settings.OBJECT_STORE_BACKEND or ("s3" if settings.S3_ENDPOINT_URL else "local")).lower()
+    if backend == "s3":
+        if not (bucket or settings.S3_BUCKET_RECORDINGS):
+            raise ValueError("S3 object store needs S3_BUCKET_RECORDINGS")
+        return S3ObjectStore(bucket=bucket)
+    if backend == "local":
+        return LocalObjectStore()
+    raise ValueError(f"Unknown object store backend configured: {backend}")
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
-from sqlalchemy import String, Integer, Float, ForeignKey, JSON, Text
+from sqlalchemy import String, Integer, Float, Boolean, ForeignKey, JSON, Text, Date, DateTime, Index, LargeBinary, UniqueConstraint
+from datetime import date, datetime
 from typing import Optional, Dict, List
 
 Base = declarative_base()
@@ -9,7 +10,6 @@ class ListingORM(Base):
 
     listing_id: Mapped[str] = mapped_column(String, primary_key=True)
     provider: Mapped[str] = mapped_column(String, index=True)
-    search_id: Mapped[Optional[str]] = mapped_column(String, index=True)
 
     title: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     address: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -25,16 +25,162 @@ class ListingORM(Base):
     url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     contact_phone: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
+    # Cross-provider identity of the unit; duplicates point at the canonical listing
+    dedup_key: Mapped[Optional[str]] = mapped_column(String, index=True, nullable=True)
+    canonical_id: Mapped[Optional[str]] = mapped_column(String, index=True, nullable=True)
+
+    # Change detection: hash of the provider content and when it last changed
+    content_hash: Mapped[Optional[str]] = mapped_column(String(40), nullable=True)
+    content_changed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True, nullable=True)
+
     conversations: Mapped[List["ConversationORM"]] = relationship("ConversationORM", back_populates="listing")
+    search_links: Mapped[List["SearchListingORM"]] = relationship("SearchListingORM", back_populates="listing")
+
+class SearchORM(Base):
+    """
+    A search run: its filters and how it was answered, so a later search can be answered from
+    the inventory of an earlier, broader one (ListingRepository.link_from_search).
+    """
+    __tablename__ = "searches"
+
+    search_id: Mapped[str] = mapped_column(String, primary_key=True)
+    provider: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # LISTING_PROVIDER of the run
+    city: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # stored lowercased
+    state: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    min_price: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    max_price: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    beds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    baths: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    source: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # provider | local
+    covered_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # search a local run was answered from
+    # a provider run that was neither truncated nor partially failed has every listing matching its filters
+    complete: Mapped[bool] = mapped_column(Boolean, default=False)
+    results_count: Mapped[int] = mapped_column(Integer, default=0)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # set once the search's rows were moved to cold storage (apps/storage/archive.py)
+    archived_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    archive_key: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # object key prefix of its files
+
+    __table_args__ = (
+        Index("ix_searches_city_state_started_at", "city", "state", "started_at"),
+        Index("ix_searches_archived_at_completed_at", "archived_at", "completed_at"),
+    )
+
+class SearchListingORM(Base):
+    """
+    Membership of a listing in a search, with the per-search state: call priority and removal.
+    """
+    __tablename__ = "search_listings"
+
+    search_id: Mapped[str] = mapped_column(String, primary_key=True)
+    listing_id: Mapped[str] = mapped_column(ForeignKey("listings.listing_id"), primary_key=True, index=True)
+    first_seen_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_seen_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # when the listing dropped out of this search's results (None while it is still listed)
+    removed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # Call priority against the search's filters (apps/workflow/scoring.py), higher first
+    score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # copy of listings.price (kept in sync by ListingRepository) so the dashboard's price
+    # sort and filter within a search run on an index of this table
+    price: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    listing: Mapped["ListingORM"] = relationship("ListingORM", back_populates="search_links")
+
+    __table_args__ = (
+        Index("ix_search_listings_search_id_score", "search_id", "score"),
+        Index("ix_search_listings_search_id_price", "search_id", "price"),
+    )
 
 class ConversationORM(Base):
     __tablename__ = "conversations"
 
     call_sid: Mapped[str] = mapped_column(String, primary_key=True)
-    listing_id: Mapped[str] = mapped_column(ForeignKey("listings.listing_id"), index=True)
+    # NULL while the call's listing is unknown (a webhook turn before CallExecutor linked the call)
+    listing_id: Mapped[Optional[str]] = mapped_column(ForeignKey("listings.listing_id"), index=True, nullable=True)
     state: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     answers: Mapped[Optional[Dict]] = mapped_column(JSON, nullable=True)
     questions: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True)
     summary_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # summary job (apps/conversation/summary_worker.py): pending | running | done | failed; NULL before the call ends
+    summary_status: Mapped[Optional[str]] = mapped_column(String(16), index=True, nullable=True)
+    summary_attempts: Mapped[int] = mapped_column(Integer, default=0)
+    summary_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    summary_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # typed values per question_key, extracted from the answers each turn (apps/conversation/answers.py answer_facts)
+    facts: Mapped[Optional[Dict]] = mapped_column(JSON, nullable=True)
+    # latest recording of the call, stored by apps/telephony/recordings.py
+    recording_sid: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    recording_key: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
     listing: Mapped["ListingORM"] = relationship("ListingORM", back_populates="conversations")
+    answer_rows: Mapped[List["AnswerORM"]] = relationship("AnswerORM", back_populates="conversation", cascade="all, delete-orphan")
+
+class AnswerORM(Base):
+    """
+    One answered question of a conversation, normalized for SQL filtering (apps/conversation/answers.py).
+    """
+    __tablename__ = "answers"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    call_sid: Mapped[str] = mapped_column(ForeignKey("conversations.call_sid", ondelete="CASCADE"), index=True)
+    listing_id: Mapped[Optional[str]] = mapped_column(String, index=True, nullable=True)
+    question_key: Mapped[str] = mapped_column(String(64))
+    question: Mapped[str] = mapped_column(Text)
+    raw_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    value_text: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    value_num: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    value_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    value_months: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    value_period: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    conversation: Mapped["ConversationORM"] = relationship("ConversationORM", back_populates="answer_rows")
+
+    __table_args__ = (
+        UniqueConstraint("call_sid", "question_key", name="uq_answers_call_sid_question_key"),
+        Index("ix_answers_key_value_text", "question_key", "value_text"),
+        Index("ix_answers_key_value_num", "question_key", "value_num"),
+        Index("ix_answers_key_value_date", "question_key", "value_date"),
+        Index("ix_answers_key_value_months", "question_key", "value_months"),
+    )
+
+class TurnORM(Base):
+    """
+    One webhook turn of a call, append-only (apps/conversation/transcripts.py).
+    """
+    __tablename__ = "conversation_turns"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    call_sid: Mapped[str] = mapped_column(ForeignKey("conversations.call_sid", ondelete="CASCADE"), index=True)
+    turn: Mapped[int] = mapped_column(Integer)
+    prompt: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    speech_result: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    confidence: Mapped[Optional[float]] = mapped_column(Float, nullable=True)  # Twilio speech confidence, 0-1
+    state_from: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    state_to: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    # the question the speech answered and its answer after the turn
+    question: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    answer: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    llm_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    total_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, index=True, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("call_sid", "turn", name="uq_conversation_turns_call_sid_turn"),
+    )
+
+class TurnArchiveORM(Base):
+    """
+    The turns of a finished call, compressed into one row once they are past TRANSCRIPT_ARCHIVE_AFTER_HOURS.
+    """
+    __tablename__ = "conversation_turn_archives"
+
+    call_sid: Mapped[str] = mapped_column(ForeignKey("conversations.call_sid", ondelete="CASCADE"), primary_key=True)
+    turns: Mapped[int] = mapped_column(Integer, default=0)
+    first_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    payload: Mapped[bytes] = mapped_column(LargeBinary)  # zlib-compressed JSON list of turns
+    archived_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
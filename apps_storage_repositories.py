@@ -1,42 +1,343 @@
-from typing import Dict, List, Optional
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import partial
+from typing import Dict, List, Optional, Set, Tuple
 from .db import SessionLocal
-from .orm_models import Base, ListingORM, ConversationORM
-from sqlalchemy import select
+from .orm_models import Base, ListingORM, ConversationORM, AnswerORM, SearchORM, SearchListingORM, TurnORM, TurnArchiveORM
+from sqlalchemy import select, insert, update, delete, and_, or_, func, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from apps.conversation.answers import answer_facts, answer_rows
+from apps.conversation.transcripts import TURN_FIELDS, compress_turns, expand_turns
+from apps.ingestion.base_provider import content_hash
+from apps.ingestion.filters import RentalFilters
+from config.settings import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Dialects with INSERT ... ON CONFLICT DO UPDATE (SQLite since 3.24)
+ON_CONFLICT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+LISTING_COLUMNS = tuple(c.name for c in ListingORM.__table__.columns)
+# Bookkeeping columns outside the content hash; refreshed on unchanged listings only when they differ.
+LINK_COLUMNS = ("provider", "dedup_key", "canonical_id")
+SUMMARY_SORTS = ("price", "beds")
+# call_sid prefix of the conversation created for a listing before its call is placed
+PLACEHOLDER_PREFIX = "pending-"
+SUMMARY_PAGE_MAX = 200
+ANSWER_OPS = {
+    "eq": lambda a, v: a.value_text == str(v).lower(),
+    "ne": lambda a, v: a.value_text != str(v).lower(),
+    "lt": lambda a, v: a.value_num < float(v),
+    "lte": lambda a, v: a.value_num <= float(v),
+    "gt": lambda a, v: a.value_num > float(v),
+    "gte": lambda a, v: a.value_num >= float(v),
+    "date_lte": lambda a, v: a.value_date <= date.fromisoformat(str(v)),
+    "date_gte": lambda a, v: a.value_date >= date.fromisoformat(str(v)),
+    "months_lte": lambda a, v: a.value_months <= float(v),
+    "months_gte": lambda a, v: a.value_months >= float(v),
+    "period": lambda a, v: a.value_period == str(v).lower(),
+    "contains": lambda a, v: a.raw_text.ilike(f"%{v}%"),
+}
+
+
+def merge_answer_rows(existing: List[AnswerORM], convo: ConversationORM,
+                      answers: Optional[Dict[str, str]] = None) -> List[AnswerORM]:
+    """
+    Bring a conversation's answer rows in line with its answers dict (or only with `answers`, a
+    delta of it): changed rows are updated in place, new AnswerORM objects are returned for the
+    caller to add. Shared by the sync and async repositories.
+    """
+    now = datetime.utcnow()
+    by_key = {a.question_key: a for a in existing}
+    new = []
+    for row in answer_rows(convo.call_sid, convo.listing_id, convo.answers or {} if answers is None else answers):
+        current = by_key.get(row["question_key"])
+        if current is None:
+            current = AnswerORM(updated_at=now, **row)
+            by_key[row["question_key"]] = current
+            new.append(current)
+        elif any(getattr(current, k) != v for k, v in row.items()):
+            for k, v in row.items():
+                setattr(current, k, v)
+            current.updated_at = now
+    return new
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0  # content changed
+    unchanged: int = 0
+    inserted_ids: List[str] = field(default_factory=list)
+    updated_ids: List[str] = field(default_factory=list)
+    linked_ids: List[str] = field(default_factory=list)  # new to the search, whether or not new to the table
+
+
 class ListingRepository:
-    def __init__(self):
-        self.db = SessionLocal()
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
 
     def create_tables(self):
         Base.metadata.create_all(bind=self.db.get_bind())
 
-    def upsert_many(self, listings: List[Dict]) -> None:
+    def upsert_many(self, listings: List[Dict], now: Optional[datetime] = None,
+                    search_id: Optional[str] = None) -> UpsertResult:
+        """
+        Change-detecting upsert keyed on listing_id, in chunks of UPSERT_BATCH_SIZE; with search_id,
+        each chunk is also linked to that search (search_listings) in the same transaction.
+        Each chunk reads the stored content_hash and link columns of its ids in one query; only new
+        listings and listings whose content hash changed are written in full (stamping content_changed_at).
+        Unchanged listings get their link columns refreshed when those differ and are otherwise not touched.
+        A changed price is copied to every search_listings row of the listing.
+        Postgres and SQLite write with one multi-row INSERT ... ON CONFLICT DO UPDATE per chunk;
+        other dialects with a bulk insert plus a bulk update by primary key.
+        """
+        rows = self._prepare_rows(listings)
+        result = UpsertResult()
+        now = now or datetime.utcnow()
+        batch_size = max(1, settings.UPSERT_BATCH_SIZE)
+        dialect_insert = ON_CONFLICT_INSERTS.get(self.db.get_bind().dialect.name)
+        write_chunk = partial(self._write_chunk_on_conflict, dialect_insert) if dialect_insert is not None \
+            else self._write_chunk_portable
         try:
-            for l in listings:
-                listing_id = l.get("listing_id")
-                if not listing_id:
-                    continue
-                obj = self.db.get(ListingORM, listing_id)
-                if obj:
-                    for k, v in l.items():
-                        if hasattr(obj, k):
-                            setattr(obj, k, v)
-                else:
-                    obj = ListingORM(**l)
-                    self.db.add(obj)
+            for group in self._group_by_keys(rows):
+                for i in range(0, len(group), batch_size):
+                    chunk = group[i:i + batch_size]
+                    self._upsert_chunk(chunk, result, now, write_chunk)
+                    if search_id:
+                        result.linked_ids.extend(self._link_chunk(search_id, [r["listing_id"] for r in chunk], now))
             self.db.commit()
         except IntegrityError:
             self.db.rollback()
             logger.exception("IntegrityError while upserting listings")
             raise
+        logger.debug("Upserted %d listings: %d inserted, %d updated, %d unchanged",
+                     len(rows), result.inserted, result.updated, result.unchanged)
+        return result
+
+    def _prepare_rows(self, listings: List[Dict]) -> List[Dict]:
+        """
+        Drop rows without listing_id and unknown keys and collapse repeated ids (last one wins,
+        as ON CONFLICT cannot touch the same row twice). Each row keeps its own keys, so a column
+        a provider did not supply is neither hashed nor overwritten. Rows mapped without a
+        content_hash get one here.
+        """
+        by_id: Dict[str, Dict] = {}
+        for l in listings:
+            listing_id = l.get("listing_id")
+            if not listing_id:
+                continue
+            row = {k: l[k] for k in LISTING_COLUMNS if k in l and k != "content_changed_at"}
+            row["content_hash"] = row.get("content_hash") or content_hash(row)
+            by_id.pop(listing_id, None)
+            by_id[listing_id] = row
+        return list(by_id.values())
+
+    @staticmethod
+    def _group_by_keys(rows: List[Dict]) -> List[List[Dict]]:
+        """
+        Rows with the same key set, in first-seen order: a multi-row INSERT (and its ON CONFLICT
+        SET) takes one column list.
+        """
+        groups: Dict[frozenset, List[Dict]] = {}
+        for row in rows:
+            groups.setdefault(frozenset(row), []).append(row)
+        return list(groups.values())
+
+    def _upsert_chunk(self, chunk: List[Dict], result: UpsertResult, now: datetime, write_chunk) -> None:
+        table = ListingORM.__table__
+        link_cols = [k for k in LINK_COLUMNS if k in chunk[0]]
+        stmt = select(table.c.listing_id, table.c.content_hash, *[table.c[k] for k in link_cols])\
+            .where(table.c.listing_id.in_([r["listing_id"] for r in chunk]))
+        existing = {row.listing_id: row._mapping for row in self.db.execute(stmt)}
 
-    def list_by_search_id(self, search_id: str) -> List[Dict]:
-        res = self.db.execute(select(ListingORM).where(ListingORM.search_id == search_id)).scalars().all()
-        return [self._to_dict(x) for x in res]
+        to_insert, to_update, to_relink = [], [], []
+        for r in chunk:
+            current = existing.get(r["listing_id"])
+            if current is None:
+                to_insert.append(dict(r, content_changed_at=now))
+            elif current["content_hash"] != r["content_hash"]:
+                to_update.append(dict(r, content_changed_at=now))
+            else:
+                result.unchanged += 1
+                if any(current[k] != r[k] for k in link_cols):
+                    to_relink.append({k: r[k] for k in ["listing_id"] + link_cols})
+
+        if to_insert or to_update:
+            write_chunk(to_insert, to_update)
+        if to_update and "price" in chunk[0]:
+            self._sync_link_prices([r["listing_id"] for r in to_update])
+        if to_relink:
+            # ORM bulk UPDATE by primary key (executemany)
+            self.db.execute(update(ListingORM), to_relink)
+        result.inserted += len(to_insert)
+        result.updated += len(to_update)
+        result.inserted_ids.extend(r["listing_id"] for r in to_insert)
+        result.updated_ids.extend(r["listing_id"] for r in to_update)
+
+    def _write_chunk_on_conflict(self, dialect_insert, to_insert: List[Dict], to_update: List[Dict]) -> None:
+        # One statement for both; ON CONFLICT also covers rows inserted concurrently since the read.
+        table = ListingORM.__table__
+        stmt = dialect_insert(table).values(to_insert + to_update)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.listing_id],
+            set_={k: stmt.excluded[k] for k in (to_insert or to_update)[0] if k != "listing_id"},
+        )
+        self.db.execute(stmt)
+
+    def _write_chunk_portable(self, to_insert: List[Dict], to_update: List[Dict]) -> None:
+        if to_insert:
+            self.db.execute(insert(ListingORM.__table__), to_insert)
+        if to_update:
+            self.db.execute(update(ListingORM), to_update)
+
+    def _sync_link_prices(self, listing_ids: List[str], search_id: Optional[str] = None) -> None:
+        """
+        Copy listings.price onto the search_listings rows of `listing_ids` (of one search, with search_id).
+        """
+        links, listings = SearchListingORM.__table__, ListingORM.__table__
+        price = select(listings.c.price).where(listings.c.listing_id == links.c.listing_id).scalar_subquery()
+        stmt = update(links).where(links.c.listing_id.in_(listing_ids))
+        if search_id is not None:
+            stmt = stmt.where(links.c.search_id == search_id)
+        self.db.execute(stmt.values(price=price))
+
+    def _link_chunk(self, search_id: str, listing_ids: List[str], now: datetime) -> List[str]:
+        """
+        Link listings to a search: new links are inserted, existing ones are marked seen (and listed
+        again, clearing removed_at); both get the listing's current price. Returns the newly linked listing ids.
+        """
+        table = SearchListingORM.__table__
+        linked = set(self.db.execute(select(table.c.listing_id)
+                                     .where(table.c.search_id == search_id, table.c.listing_id.in_(listing_ids)))
+                     .scalars())
+        new = [listing_id for listing_id in listing_ids if listing_id not in linked]
+        if new:
+            self.db.execute(insert(table), [{"search_id": search_id, "listing_id": listing_id,
+                                             "first_seen_at": now, "last_seen_at": now} for listing_id in new])
+        if linked:
+            self.db.execute(update(table).where(table.c.search_id == search_id, table.c.listing_id.in_(linked))
+                            .values(last_seen_at=now, removed_at=None))
+        self._sync_link_prices(listing_ids, search_id)
+        return new
+
+    def mark_removed(self, search_id: str, seen_ids: Set[str], now: Optional[datetime] = None) -> List[str]:
+        """
+        Stamp removed_at on listings of a search that were not seen in its latest complete ingestion.
+        Returns the newly removed listing ids.
+        """
+        table = SearchListingORM.__table__
+        stmt = select(table.c.listing_id).where(table.c.search_id == search_id, table.c.removed_at.is_(None))
+        removed = [listing_id for listing_id in self.db.execute(stmt).scalars() if listing_id not in seen_ids]
+        batch_size = max(1, settings.UPSERT_BATCH_SIZE)
+        for i in range(0, len(removed), batch_size):
+            self.db.execute(update(table)
+                            .where(table.c.search_id == search_id, table.c.listing_id.in_(removed[i:i + batch_size]))
+                            .values(removed_at=now or datetime.utcnow()))
+        self.db.commit()
+        return removed
+
+    def link_from_search(self, source_id: str, search_id: str, filters: RentalFilters, limit: int,
+                         now: Optional[datetime] = None) -> Tuple[List[str], List[str]]:
+        """
+        Answer a search from local inventory: link up to `limit` listings still listed in the
+        search `source_id` that match `filters` (best score there first) to `search_id`.
+        Returns (matched listing ids, newly linked listing ids).
+        """
+        links, listings = SearchListingORM.__table__, ListingORM.__table__
+        stmt = select(links.c.listing_id).join(listings, listings.c.listing_id == links.c.listing_id)\
+            .where(links.c.search_id == source_id, links.c.removed_at.is_(None))
+        if filters.min_price:
+            stmt = stmt.where(listings.c.price >= filters.min_price)
+        if filters.max_price:
+            stmt = stmt.where(listings.c.price <= filters.max_price)
+        if filters.beds:
+            stmt = stmt.where(listings.c.beds >= filters.beds)
+        if filters.baths:
+            stmt = stmt.where(listings.c.baths >= filters.baths)
+        stmt = stmt.order_by(links.c.score.desc().nulls_last(), links.c.listing_id).limit(limit)
+        listing_ids = list(self.db.execute(stmt).scalars())
+
+        now = now or datetime.utcnow()
+        linked: List[str] = []
+        batch_size = max(1, settings.UPSERT_BATCH_SIZE)
+        for i in range(0, len(listing_ids), batch_size):
+            linked.extend(self._link_chunk(search_id, listing_ids[i:i + batch_size], now))
+        self.db.commit()
+        return listing_ids, linked
+
+    def canonical_ids_for_keys(self, keys: List[str]) -> Dict[str, str]:
+        """
+        Map dedup keys to the listing_id of their canonical listing, for the keys already stored.
+        """
+        out: Dict[str, str] = {}
+        batch_size = max(1, settings.UPSERT_BATCH_SIZE)
+        for i in range(0, len(keys), batch_size):
+            stmt = select(ListingORM.dedup_key, ListingORM.listing_id)\
+                .where(ListingORM.dedup_key.in_(keys[i:i + batch_size]), ListingORM.canonical_id.is_(None))
+            for key, listing_id in self.db.execute(stmt):
+                out.setdefault(key, listing_id)
+        return out
+
+    def list_aliases(self, search_id: str) -> Dict[str, List[Dict]]:
+        """
+        Duplicate listings (any search/provider) of the canonical listings in a search, keyed by canonical listing_id.
+        """
+        in_search = select(SearchListingORM.listing_id).where(SearchListingORM.search_id == search_id)
+        stmt = select(ListingORM.canonical_id, ListingORM.provider, ListingORM.listing_id)\
+            .where(ListingORM.canonical_id.in_(in_search))
+        aliases: Dict[str, List[Dict]] = {}
+        for canonical_id, provider, listing_id in self.db.execute(stmt):
+            aliases.setdefault(canonical_id, []).append({"provider": provider, "listing_id": listing_id})
+        return aliases
+
+    def score_inputs(self, search_id: str) -> List[Tuple]:
+        """
+        (listing_id, price, beds, baths, sqft, score) of the listings still listed in a search,
+        read as plain tuples for the columnar scorer.
+        """
+        links, listings = SearchListingORM.__table__, ListingORM.__table__
+        stmt = select(listings.c.listing_id, listings.c.price, listings.c.beds, listings.c.baths, listings.c.sqft,
+                      links.c.score)\
+            .join(links, links.c.listing_id == listings.c.listing_id)\
+            .where(links.c.search_id == search_id, links.c.removed_at.is_(None))
+        return [tuple(row) for row in self.db.execute(stmt)]
+
+    def save_scores(self, search_id: str, scores: Dict[str, float]) -> None:
+        rows = [{"search_id": search_id, "listing_id": k, "score": v} for k, v in scores.items()]
+        batch_size = max(1, settings.UPSERT_BATCH_SIZE)
+        for i in range(0, len(rows), batch_size):
+            # ORM bulk UPDATE by (search_id, listing_id)
+            self.db.execute(update(SearchListingORM), rows[i:i + batch_size])
+        self.db.commit()
+
+    def list_scores(self, search_id: str, limit: int) -> List[Dict]:
+        links, listings = SearchListingORM.__table__, ListingORM.__table__
+        stmt = select(listings.c.listing_id, links.c.score, listings.c.price, listings.c.beds, listings.c.baths,
+                      listings.c.sqft)\
+            .join(links, links.c.listing_id == listings.c.listing_id)\
+            .where(links.c.search_id == search_id, links.c.removed_at.is_(None))\
+            .order_by(links.c.score.desc().nulls_last(), listings.c.listing_id).limit(limit)
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
+
+    def list_by_search_id(self, search_id: str, changed_since: Optional[datetime] = None) -> List[Dict]:
+        """
+        Listings still listed in a search, best score first; with changed_since, only those
+        new to the search or changed since then.
+        """
+        stmt = select(ListingORM, SearchListingORM.score)\
+            .join(SearchListingORM, SearchListingORM.listing_id == ListingORM.listing_id)\
+            .where(SearchListingORM.search_id == search_id, SearchListingORM.removed_at.is_(None))\
+            .order_by(SearchListingORM.score.desc().nulls_last(), ListingORM.listing_id)
+        if changed_since is not None:
+            stmt = stmt.where(or_(ListingORM.content_changed_at >= changed_since,
+                                  SearchListingORM.first_seen_at >= changed_since))
+        return [dict(self._to_dict(obj), search_id=search_id, score=score) for obj, score in self.db.execute(stmt)]
 
     def get_by_id(self, listing_id: str) -> Optional[ListingORM]:
         return self.db.get(ListingORM, listing_id)
@@ -45,7 +346,6 @@ class ListingRepository:
         return {
             "listing_id": obj.listing_id,
             "provider": obj.provider,
-            "search_id": obj.search_id,
             "title": obj.title,
             "address": obj.address,
             "city": obj.city,
@@ -57,12 +357,88 @@ class ListingRepository:
             "sqft": obj.sqft,
             "url": obj.url,
             "contact_phone": obj.contact_phone,
+            "dedup_key": obj.dedup_key,
+            "canonical_id": obj.canonical_id,
+            "content_hash": obj.content_hash,
+            "content_changed_at": obj.content_changed_at,
         }
 
 
+class SearchRepository:
+    """
+    Search runs and their filters, for answering a search from the inventory of an earlier one.
+    """
+
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+
+    def start(self, search_id: str, filters: RentalFilters, provider: str, now: Optional[datetime] = None) -> SearchORM:
+        """
+        Record (or restart) a search run with its filters; it is incomplete until finish().
+        """
+        obj = self.db.get(SearchORM, search_id) or SearchORM(search_id=search_id)
+        obj.provider = provider
+        obj.city = (filters.city or "").strip().lower()
+        obj.state = (filters.state or "").strip().lower()
+        obj.min_price = filters.min_price or None
+        obj.max_price = filters.max_price or None
+        obj.beds = filters.beds or None
+        obj.baths = filters.baths or None
+        obj.source, obj.covered_by, obj.complete, obj.results_count = None, None, False, 0
+        obj.started_at, obj.completed_at = now or datetime.utcnow(), None
+        obj.archived_at, obj.archive_key = None, None  # a new run supersedes an archived one
+        self.db.add(obj)
+        self.db.commit()
+        return obj
+
+    def get(self, search_id: str) -> Optional[SearchORM]:
+        return self.db.get(SearchORM, search_id)
+
+    def finish(self, search_id: str, results_count: int, complete: bool, source: str = "provider",
+               covered_by: Optional[str] = None) -> None:
+        obj = self.db.get(SearchORM, search_id)
+        if not obj:
+            logger.warning("finish: search %s not found", search_id)
+            return
+        obj.results_count, obj.complete, obj.source, obj.covered_by = results_count, complete, source, covered_by
+        obj.completed_at = datetime.utcnow()
+        self.db.commit()
+
+    def find_covering(self, filters: RentalFilters, provider: str, fresh_since: datetime,
+                      exclude: Optional[str] = None) -> Optional[SearchORM]:
+        """
+        The most recent complete provider run, started at or after fresh_since against the same
+        provider and location, whose filters are no narrower than `filters`: every listing matching
+        `filters` is then among its results. None when filters use property types or keywords,
+        which runs do not record.
+        """
+        if filters.property_types or filters.keywords:
+            return None
+        stmt = select(SearchORM).where(
+            SearchORM.city == (filters.city or "").strip().lower(),
+            SearchORM.state == (filters.state or "").strip().lower(),
+            SearchORM.provider == provider,
+            SearchORM.source == "provider",
+            SearchORM.complete.is_(True),
+            SearchORM.archived_at.is_(None),
+            SearchORM.started_at >= fresh_since,
+        )
+        if exclude:
+            stmt = stmt.where(SearchORM.search_id != exclude)
+        # a lower bound (min_price, beds, baths) covers when absent or at most ours; max_price when absent or at least ours
+        for col, ours in ((SearchORM.min_price, filters.min_price), (SearchORM.beds, filters.beds),
+                          (SearchORM.baths, filters.baths)):
+            stmt = stmt.where(or_(col.is_(None), col <= ours) if ours else col.is_(None))
+        if filters.max_price:
+            stmt = stmt.where(or_(SearchORM.max_price.is_(None), SearchORM.max_price >= filters.max_price))
+        else:
+            stmt = stmt.where(SearchORM.max_price.is_(None))
+        return self.db.execute(stmt.order_by(SearchORM.started_at.desc()).limit(1)).scalars().first()
+
+
 class ConversationRepository:
-    def __init__(self):
-        self.db = SessionLocal()
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
 
     def get_or_create(self, call_sid: Optional[str], listing_id: str) -> ConversationORM:
         """
@@ -74,15 +450,38 @@ class ConversationRepository:
             if obj:
                 return obj
 
-        temp_sid = call_sid or f"pending-{listing_id}"
+        temp_sid = call_sid or f"{PLACEHOLDER_PREFIX}{listing_id}"
         obj = self.db.get(ConversationORM, temp_sid)
         if not obj:
-            obj = ConversationORM(call_sid=temp_sid, listing_id=listing_id, state="INTRO", answers={}, questions=[])
+            obj = ConversationORM(call_sid=temp_sid, listing_id=listing_id or None, state="INTRO", answers={},
+                                  questions=[])
             self.db.add(obj)
             self.db.commit()
             logger.info("Created new conversation placeholder %s for listing %s", temp_sid, listing_id)
         return obj
 
+    def link_call(self, call_sid: str, listing_id: str, questions: List[str]) -> ConversationORM:
+        """
+        Move the listing's placeholder conversation (get_or_create without a CallSid) to the real
+        CallSid once the call is placed, with the listing and the questions, so a webhook turn that
+        loads the call from the database gets its listing context. If the first webhook turn
+        already created the conversation, that row is completed instead.
+        """
+        placeholder = self.db.get(ConversationORM, f"{PLACEHOLDER_PREFIX}{listing_id}")
+        obj = self.db.get(ConversationORM, call_sid)
+        if obj is None:
+            obj = ConversationORM(call_sid=call_sid, state=placeholder.state if placeholder else "INTRO",
+                                  answers={}, questions=[])
+            self.db.add(obj)
+        obj.listing_id = listing_id
+        if not obj.questions:
+            obj.questions = list(questions)
+        if placeholder is not None:
+            self.db.delete(placeholder)
+        self.db.commit()
+        logger.info("Linked call %s to listing %s", call_sid, listing_id)
+        return obj
+
     def attach_questions(self, call_sid: str, questions: List[str]):
         obj = self.db.get(ConversationORM, call_sid)
         if obj:
@@ -95,45 +494,308 @@ class ConversationRepository:
     def update(self, call_sid: str, state: str, answers: Dict[str, str]):
         obj = self.db.get(ConversationORM, call_sid)
         if not obj:
-            obj = ConversationORM(call_sid=call_sid, listing_id="", state=state, answers=answers, questions=[])
+            obj = ConversationORM(call_sid=call_sid, listing_id=None, state=state, answers=answers, questions=[],
+                                  facts=answer_facts(answers))
             self.db.add(obj)
+            self.db.add_all(merge_answer_rows([], obj))
             self.db.commit()
             logger.info("Created conversation record on update for call_sid %s", call_sid)
             return
         obj.state = state
         obj.answers = answers
+        obj.facts = answer_facts(answers)
+        self._sync_answers(obj)
         self.db.commit()
         logger.debug("Updated conversation %s state=%s", call_sid, state)
 
+    def _sync_answers(self, obj: ConversationORM) -> None:
+        existing = self.db.execute(select(AnswerORM).where(AnswerORM.call_sid == obj.call_sid)).scalars().all()
+        self.db.add_all(merge_answer_rows(existing, obj))
+
     def save_summary(self, call_sid: str, summary: str):
         obj = self.db.get(ConversationORM, call_sid)
         if obj:
             obj.summary_text = summary
+            obj.summary_status = "done"
+            obj.summary_updated_at = datetime.utcnow()
             self.db.commit()
             logger.info("Saved summary for conversation %s", call_sid)
         else:
             logger.warning("save_summary: conversation %s not found", call_sid)
 
+    def save_recording(self, call_sid: str, recording_sid: str, key: str):
+        obj = self.db.get(ConversationORM, call_sid)
+        if obj:
+            obj.recording_sid = recording_sid
+            obj.recording_key = key
+            self.db.commit()
+            logger.debug("Saved recording %s for conversation %s", key, call_sid)
+        else:
+            logger.warning("save_recording: conversation %s not found", call_sid)
+
+    def list_turns(self, call_sid: str) -> List[Dict]:
+        """
+        A call's turn log in turn order: archived turns first, then those still in conversation_turns.
+        """
+        turns: List[Dict] = []
+        archive = self.db.get(TurnArchiveORM, call_sid)
+        if archive is not None:
+            turns.extend(expand_turns(archive.payload))
+        stmt = select(*[TurnORM.__table__.c[k] for k in TURN_FIELDS])\
+            .where(TurnORM.call_sid == call_sid).order_by(TurnORM.turn)
+        turns.extend(dict(row._mapping) for row in self.db.execute(stmt))
+        return turns
+
+    def archive_turns(self, older_than: datetime, limit: int = 1000) -> int:
+        """
+        Compress the turns of finished calls (state END) whose last turn is older than `older_than`
+        into one TurnArchiveORM row per call, merged with any earlier archive, and delete them.
+        Handles up to `limit` calls per run; returns how many were archived.
+        """
+        table = TurnORM.__table__
+        stmt = select(table.c.call_sid).join(ConversationORM, ConversationORM.call_sid == table.c.call_sid)\
+            .where(ConversationORM.state == "END").group_by(table.c.call_sid)\
+            .having(func.max(table.c.created_at) < older_than).limit(limit)
+        call_sids = list(self.db.execute(stmt).scalars())
+        now = datetime.utcnow()
+        for call_sid in call_sids:
+            rows = self.db.execute(select(*[table.c[k] for k in TURN_FIELDS])
+                                   .where(table.c.call_sid == call_sid).order_by(table.c.turn)).all()
+            turns = [dict(row._mapping) for row in rows]
+            archive = self.db.get(TurnArchiveORM, call_sid)
+            if archive is None:
+                archive = TurnArchiveORM(call_sid=call_sid, first_at=turns[0]["created_at"])
+                self.db.add(archive)
+            else:
+                turns = expand_turns(archive.payload) + turns
+            archive.payload = compress_turns(turns)
+            archive.turns = len(turns)
+            archive.last_at = rows[-1].created_at
+            archive.archived_at = now
+            self.db.execute(delete(table).where(table.c.call_sid == call_sid))
+            self.db.commit()
+        if call_sids:
+            logger.info("Archived turns of %d conversations older than %s", len(call_sids), older_than)
+        return len(call_sids)
+
     def list_summaries(self, search_id: str) -> List[Dict]:
-        stmt = select(ConversationORM, ListingORM).join(ListingORM, ConversationORM.listing_id == ListingORM.listing_id)\
-            .where(ListingORM.search_id == search_id)
+        """
+        Every summary of a search, unpaginated; prefer list_summaries_page for the dashboard.
+        """
+        items, cursor = self.list_summaries_page(search_id, limit=SUMMARY_PAGE_MAX)
+        while cursor:
+            page, cursor = self.list_summaries_page(search_id, limit=SUMMARY_PAGE_MAX, cursor=cursor)
+            items.extend(page)
+        return items
+
+    def list_summaries_page(self, search_id: str, limit: int = 50, cursor: Optional[str] = None,
+                            sort: str = "price", order: str = "asc",
+                            min_price: Optional[int] = None, max_price: Optional[int] = None,
+                            min_beds: Optional[float] = None, status: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One keyset page of a search's summaries, projected to the columns the dashboard shows.
+        Sorted on `sort` (price | beds; NULLs last) then call_sid; `cursor` is the opaque
+        next_cursor of the previous page and must be used with the same sort/order. Price sorts and
+        filters read the search_listings copy, so they run on its (search_id, price) index.
+        `status` filters on summary status: done | pending (no summary yet) | failed (the summary job
+        gave up). Raises ValueError on bad arguments.
+        """
+        if sort not in SUMMARY_SORTS or order not in ("asc", "desc"):
+            raise ValueError(f"unsupported sort {sort!r} {order!r}")
+        if status not in (None, "", "all", "done", "pending", "failed"):
+            raise ValueError(f"unsupported status {status!r}")
+        sort_col = SearchListingORM.price if sort == "price" else getattr(ListingORM, sort)
+        tiebreak = ConversationORM.call_sid
+        stmt = select(
+            ConversationORM.call_sid, ConversationORM.summary_text, ConversationORM.summary_status,
+            ConversationORM.facts,
+            ListingORM.listing_id, ListingORM.title, ListingORM.address, ListingORM.city, ListingORM.state,
+            ListingORM.zipcode, ListingORM.price, ListingORM.beds, ListingORM.baths, ListingORM.sqft, ListingORM.url,
+            sort_col.label("sort_value"),
+        ).join(ListingORM, ConversationORM.listing_id == ListingORM.listing_id)\
+            .join(SearchListingORM, SearchListingORM.listing_id == ListingORM.listing_id)\
+            .where(SearchListingORM.search_id == search_id)
+
+        if min_price is not None:
+            stmt = stmt.where(SearchListingORM.price >= min_price)
+        if max_price is not None:
+            stmt = stmt.where(SearchListingORM.price <= max_price)
+        if min_beds is not None:
+            stmt = stmt.where(ListingORM.beds >= min_beds)
+        if status == "done":
+            stmt = stmt.where(ConversationORM.summary_text.is_not(None), ConversationORM.summary_text != "")
+        elif status == "pending":
+            stmt = stmt.where(or_(ConversationORM.summary_text.is_(None), ConversationORM.summary_text == ""))
+        elif status == "failed":
+            stmt = stmt.where(ConversationORM.summary_status == "failed")
+
+        if cursor:
+            value, last_sid = self._decode_cursor(cursor, sort, order)
+            if value is None:
+                # already in the NULL tail
+                stmt = stmt.where(sort_col.is_(None), tiebreak > last_sid)
+            else:
+                after = sort_col > value if order == "asc" else sort_col < value
+                stmt = stmt.where(or_(after, and_(sort_col == value, tiebreak > last_sid), sort_col.is_(None)))
+
+        direction = sort_col.asc() if order == "asc" else sort_col.desc()
+        stmt = stmt.order_by(direction.nulls_last(), tiebreak.asc()).limit(limit + 1)
         rows = self.db.execute(stmt).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = self._encode_cursor(sort, order, last.sort_value, last.call_sid)
+
         items = []
-        for convo, listing in rows:
+        for row in rows:
             items.append({
-                "listing_id": listing.listing_id,
+                "listing_id": row.listing_id,
+                "call_sid": row.call_sid,
                 "listing_details": {
-                    "title": listing.title,
-                    "address": listing.address,
-                    "city": listing.city,
-                    "state": listing.state,
-                    "zipcode": listing.zipcode,
-                    "price": listing.price,
-                    "beds": listing.beds,
-                    "baths": listing.baths,
-                    "sqft": listing.sqft,
-                    "url": listing.url,
+                    "title": row.title,
+                    "address": row.address,
+                    "city": row.city,
+                    "state": row.state,
+                    "zipcode": row.zipcode,
+                    "price": row.price,
+                    "beds": row.beds,
+                    "baths": row.baths,
+                    "sqft": row.sqft,
+                    "url": row.url,
                 },
-                "summary_text": convo.summary_text or "",
+                "summary_text": row.summary_text or "",
+                "summary_status": "done" if row.summary_text else row.summary_status or "pending",
+                "facts": row.facts or {},
             })
-        return items
+        return items, next_cursor
+
+    @staticmethod
+    def _encode_cursor(sort: str, order: str, value, call_sid: str) -> str:
+        raw = json.dumps([sort, order, value, call_sid], separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort: str, order: str) -> Tuple:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            c_sort, c_order, value, call_sid = json.loads(raw)
+        except (ValueError, TypeError):
+            raise ValueError("malformed cursor")
+        if (c_sort, c_order) != (sort, order):
+            raise ValueError("cursor was issued for a different sort order")
+        return value, call_sid
+
+
+class AnswerRepository:
+    """
+    SQL queries over the normalized answers table: answer facets and listing search by answers.
+    """
+
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+
+    def _scoped(self, stmt, search_id: Optional[str]):
+        if search_id:
+            stmt = stmt.join(SearchListingORM, AnswerORM.listing_id == SearchListingORM.listing_id)\
+                .where(SearchListingORM.search_id == search_id)
+        return stmt
+
+    def question_keys(self, search_id: Optional[str] = None) -> List[Dict]:
+        stmt = select(AnswerORM.question_key, func.min(AnswerORM.question).label("question"),
+                      func.count().label("count")).group_by(AnswerORM.question_key)\
+            .order_by(func.count().desc())
+        stmt = self._scoped(stmt, search_id)
+        return [dict(row._mapping) for row in self.db.execute(stmt)]
+
+    def facet(self, question_key: str, search_id: Optional[str] = None) -> Dict:
+        """
+        Counts per extracted value of one question, plus stats over value_num, value_months and value_date.
+        """
+        counts = select(AnswerORM.value_text, func.count().label("count"))\
+            .where(AnswerORM.question_key == question_key)\
+            .group_by(AnswerORM.value_text).order_by(func.count().desc())
+        numbers = select(func.count(AnswerORM.value_num).label("count"), func.min(AnswerORM.value_num).label("min"),
+                         func.max(AnswerORM.value_num).label("max"), func.avg(AnswerORM.value_num).label("avg"))\
+            .where(AnswerORM.question_key == question_key)
+        months = select(func.count(AnswerORM.value_months).label("count"), func.min(AnswerORM.value_months).label("min"),
+                        func.max(AnswerORM.value_months).label("max"), func.avg(AnswerORM.value_months).label("avg"))\
+            .where(AnswerORM.question_key == question_key)
+        dates = select(func.count(AnswerORM.value_date).label("count"), func.min(AnswerORM.value_date).label("min"),
+                       func.max(AnswerORM.value_date).label("max"))\
+            .where(AnswerORM.question_key == question_key)
+        values = [{"value": v, "count": c} for v, c in self.db.execute(self._scoped(counts, search_id))]
+        stats = dict(self.db.execute(self._scoped(numbers, search_id)).one()._mapping)
+        return {
+            "question_key": question_key,
+            "values": values,
+            "numeric": stats,
+            "months": dict(self.db.execute(self._scoped(months, search_id)).one()._mapping),
+            "dates": dict(self.db.execute(self._scoped(dates, search_id)).one()._mapping),
+        }
+
+    def find_listings(self, conditions: List[Dict], search_id: Optional[str] = None,
+                      min_price: Optional[int] = None, max_price: Optional[int] = None,
+                      min_beds: Optional[float] = None, max_beds: Optional[float] = None,
+                      limit: int = 100, offset: int = 0) -> List[Dict]:
+        """
+        Listings with at least one conversation answering every condition
+        ({"key": question_key, "op": eq|ne|lt|lte|gt|gte|contains, "value": ...}),
+        each as an indexed EXISTS on (question_key, value). Raises ValueError on an unknown op.
+        """
+        stmt = select(ListingORM)
+        if search_id:
+            stmt = stmt.join(SearchListingORM, SearchListingORM.listing_id == ListingORM.listing_id)\
+                .where(SearchListingORM.search_id == search_id)
+        if min_price is not None:
+            stmt = stmt.where(ListingORM.price >= min_price)
+        if max_price is not None:
+            stmt = stmt.where(ListingORM.price <= max_price)
+        if min_beds is not None:
+            stmt = stmt.where(ListingORM.beds >= min_beds)
+        if max_beds is not None:
+            stmt = stmt.where(ListingORM.beds <= max_beds)
+        keys = []
+        for cond in conditions:
+            op = ANSWER_OPS.get(cond.get("op", "eq"))
+            if op is None:
+                raise ValueError(f"unsupported op {cond.get('op')!r}")
+            keys.append(cond["key"])
+            stmt = stmt.where(exists().where(
+                AnswerORM.listing_id == ListingORM.listing_id,
+                AnswerORM.question_key == cond["key"],
+                op(AnswerORM, cond["value"]),
+            ))
+        stmt = stmt.order_by(ListingORM.price.asc().nulls_last(), ListingORM.listing_id).limit(limit).offset(offset)
+        listings = self.db.execute(stmt).scalars().all()
+
+        answers: Dict[str, Dict[str, str]] = {}
+        if listings and keys:
+            rows = self.db.execute(select(AnswerORM.listing_id, AnswerORM.question_key, AnswerORM.raw_text)
+                                   .where(AnswerORM.listing_id.in_([l.listing_id for l in listings]),
+                                          AnswerORM.question_key.in_(keys)))
+            for listing_id, key, raw in rows:
+                answers.setdefault(listing_id, {})[key] = raw
+        repo = ListingRepository(self.db)
+        return [dict(repo._to_dict(l), answers=answers.get(l.listing_id, {})) for l in listings]
+
+    def backfill(self, batch_size: int = 500) -> int:
+        """
+        Populate answer rows for conversations recorded before the answers table existed.
+        """
+        count, last_sid = 0, ""
+        while True:
+            convos = self.db.execute(select(ConversationORM).where(ConversationORM.call_sid > last_sid)
+                                     .order_by(ConversationORM.call_sid).limit(batch_size)).scalars().all()
+            if not convos:
+                return count
+            sids = [c.call_sid for c in convos]
+            existing: Dict[str, List[AnswerORM]] = {}
+            for a in self.db.execute(select(AnswerORM).where(AnswerORM.call_sid.in_(sids))).scalars():
+                existing.setdefault(a.call_sid, []).append(a)
+            for c in convos:
+                self.db.add_all(merge_answer_rows(existing.get(c.call_sid, []), c))
+            self.db.commit()
+            count += len(convos)
+            last_sid = sids[-1]
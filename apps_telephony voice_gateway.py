@@ -13,12 +13,18 @@ class VoiceGateway:
         """
         Place an outbound call to `to_number`. `webhook_path` is the API route path (e.g., "/twilio/voice").
         """
-        url = settings.PUBLIC_BASE_URL.rstrip("/") + webhook_path
+        base = settings.PUBLIC_BASE_URL.rstrip("/")
         call = self.client.calls.create(
             to=to_number,
             from_=self.caller_id,
-            url=url,
+            url=base + webhook_path,
             record=True,
+            # the recording is fetched when Twilio reports it ready (apps/telephony/recordings.py)
+            recording_status_callback=base + "/twilio/recording-status",
+            recording_status_callback_event=["completed"],
+            # the end of the call, however it ended, flushes the session's unwritten turns
+            status_callback=base + "/twilio/call-status",
+            status_callback_event=["completed"],
         )
         return call.sid
 
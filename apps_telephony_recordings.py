@@ -0,0 +1,101 @@
+"""
+Ingestion of Twilio call recordings.
+
+Twilio posts a recording-status callback (apps/telephony/webhooks.py) when a call's
+recording is ready; the pipeline then streams the audio from Twilio into the object
+store (apps/storage/objects.py) and records the object key on the conversation.
+Downloads run on a bounded worker pool (RECORDING_CONCURRENCY) so a burst of finished
+calls cannot exhaust connections or threads; chunks flow straight from the HTTP
+response into the upload. A failed download or upload is resubmitted with exponential
+backoff (RECORDING_RETRY_BASE_SECONDS, doubled per attempt) up to RECORDING_MAX_ATTEMPTS;
+no worker is held while a retry waits.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from apps.ingestion.http_client import get_http_client
+from apps.storage.db import session_scope
+from apps.storage.objects import ObjectStore, create_object_store
+from apps.storage.repositories import ConversationRepository
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_pipeline: Optional["RecordingPipeline"] = None
+_pipeline_lock = threading.Lock()
+
+
+def recording_key(call_sid: str, recording_sid: str) -> str:
+    return f"recordings/{call_sid}/{recording_sid}.mp3"
+
+
+class RecordingPipeline:
+    def __init__(self, store: Optional[ObjectStore] = None, concurrency: Optional[int] = None):
+        self.store = store or create_object_store()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, concurrency or settings.RECORDING_CONCURRENCY),
+                                           thread_name_prefix="recording")
+        self._lock = threading.Lock()
+        self.counts = {"submitted": 0, "stored": 0, "retried": 0, "failed": 0, "bytes": 0}
+
+    def submit(self, call_sid: str, recording_sid: str, recording_url: str, attempt: int = 1) -> Future:
+        if attempt == 1:
+            self._count("submitted")
+        return self.executor.submit(self.ingest, call_sid, recording_sid, recording_url, attempt)
+
+    def ingest(self, call_sid: str, recording_sid: str, recording_url: str, attempt: int = 1) -> Optional[str]:
+        """
+        Stream one recording into the object store and attach its key to the conversation.
+        Returns the key, or None when the download or upload failed (a retry is scheduled unless
+        this was the last attempt).
+        """
+        key = recording_key(call_sid, recording_sid)
+        url = recording_url if recording_url.endswith(".mp3") else recording_url + ".mp3"
+        try:
+            resp = get_http_client().get(url, provider="twilio", stream=True,
+                                         auth=(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN),
+                                         timeout=settings.PROVIDER_TIMEOUT_SECONDS)
+            with resp:
+                size = self.store.put_stream(key, resp.iter_content(chunk_size=settings.RECORDING_CHUNK_BYTES))
+        except Exception:
+            self._retry_or_fail(call_sid, recording_sid, recording_url, attempt)
+            return None
+
+        with session_scope(write=True) as db:
+            ConversationRepository(db).save_recording(call_sid, recording_sid, key)
+        self._count("stored")
+        self._count("bytes", size)
+        logger.info("Stored recording %s of call %s as %s (%d bytes)", recording_sid, call_sid, key, size)
+        return key
+
+    def _retry_or_fail(self, call_sid: str, recording_sid: str, recording_url: str, attempt: int) -> None:
+        if attempt >= settings.RECORDING_MAX_ATTEMPTS:
+            self._count("failed")
+            logger.exception("Failed to store recording %s of call %s after %d attempts",
+                             recording_sid, call_sid, attempt)
+            return
+        delay = settings.RECORDING_RETRY_BASE_SECONDS * 2 ** (attempt - 1)
+        self._count("retried")
+        logger.warning("Failed to store recording %s of call %s (attempt %d), retrying in %.1fs",
+                       recording_sid, call_sid, attempt, delay, exc_info=True)
+        timer = threading.Timer(delay, self.submit, (call_sid, recording_sid, recording_url, attempt + 1))
+        timer.daemon = True
+        timer.start()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[name] += n
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts, queued=self.executor._work_queue.qsize())
+
+
+def get_recording_pipeline() -> RecordingPipeline:
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = RecordingPipeline()
+        return _pipeline
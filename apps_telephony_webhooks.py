@@ -1,63 +1,154 @@
 
-from fastapi import APIRouter, Request, Response
-from apps.conversation.gpt_dialogue_manager import GPTDialogueManager, DialogueState
-from apps.conversation.summarizer import summarize_conversation
-from apps.storage.repositories import ConversationRepository, ListingRepository
+import asyncio
+import time
+import weakref
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from apps.conversation.clarifications import get_clarifier
+from apps.conversation.llm import get_llm_client
+from apps.conversation.sessions import CallSession, get_session_store
+from apps.conversation.summary_worker import get_summary_worker
+from apps.telephony.recordings import get_recording_pipeline
+from apps.storage.async_repositories import AsyncConversationRepository, AsyncListingRepository
+from apps.storage.db import get_async_db, get_async_sessionmaker, is_sqlite
+from config.settings import settings
+import logging
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# CallStatus values of a call that is over (Twilio's "completed" status callback event)
+CALL_ENDED_STATUSES = {"completed", "busy", "failed", "no-answer", "canceled"}
+
+# one write-behind at a time per event loop on SQLite (flush_session)
+_sqlite_writers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+def _sqlite_writer() -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    lock = _sqlite_writers.get(loop)
+    if lock is None:
+        lock = _sqlite_writers[loop] = asyncio.Lock()
+    return lock
+
+
+async def load_session(db: AsyncSession, call_sid: Optional[str], listing_id: str) -> CallSession:
+    """
+    Build a call's session from the database (conversation and listing), for a CallSid the store does not hold.
+    Runs on the request's read session and ends its transaction, so the first turns of many calls
+    read concurrently instead of queueing for SQLite's write lock; only a new conversation is written.
+    """
+    convo_repo = AsyncConversationRepository(db)
+    convo = await convo_repo.get_or_create(call_sid=call_sid, listing_id=listing_id)
+    listing = await AsyncListingRepository(db).get_by_id(convo.listing_id) if convo.listing_id else None
+    listing_context = {"address": listing.address, "title": listing.title} if listing else {}
+    answers = await convo_repo.current_answers(convo)
+    session = CallSession.restore(call_sid or convo.call_sid, convo.listing_id or "", listing_context,
+                                  convo.questions or [], convo.state, answers)
+    session.turn = await convo_repo.turn_count(session.call_sid)
+    await db.commit()
+    return session
+
+
+async def save_session(db: AsyncSession, snapshot: Dict[str, Any]) -> None:
+    """
+    Persist a session snapshot (CallSession.to_dict) to its conversation: the buffered turn events,
+    the state and answer rows derived from them, the typed facts, and at call end the answers blob.
+    A finished call with a known listing then gets its summary queued (apps/conversation/summary_worker.py).
+    """
+    repo = AsyncConversationRepository(db)
+    final = snapshot["state"] == "END"
+    await repo.append_turns(snapshot["call_sid"], snapshot["listing_id"], snapshot["state"],
+                            snapshot["pending_turns"], answers=snapshot["answers"] if final else None,
+                            facts=snapshot.get("facts"))
+    if final and snapshot.get("listing_context"):
+        await repo.request_summary(snapshot["call_sid"])
+        get_summary_worker().enqueue(snapshot["call_sid"], snapshot["listing_context"])
+
+
+async def flush_session(snapshot: Dict[str, Any]) -> None:
+    """
+    Write-behind of a session snapshot with its own DB session; runs as a background task
+    after the TwiML response is sent, when the request's session is already closed.
+    SQLite has a single writer, so on SQLite the flushes of a worker take turns on an in-process
+    lock: they queue in order there instead of polling the write lock on busy_timeout, whose
+    retries sleep up to 100 ms each and leave the lock idle in between.
+    """
+    try:
+        async with get_async_sessionmaker(write=True)() as db:
+            if is_sqlite(str(db.get_bind().url)):
+                async with _sqlite_writer():
+                    await save_session(db, snapshot)
+            else:
+                await save_session(db, snapshot)
+    except Exception:
+        logger.exception("Failed to flush session %s", snapshot["call_sid"])
+
+
+def flush_evicted(store, background: BackgroundTasks) -> None:
+    """
+    Queue the write-behind of sessions the store evicted before their turns were written.
+    """
+    for snapshot in store.take_evicted():
+        background.add_task(flush_session, snapshot)
+
+
 @router.post("/twilio/voice")
-async def twilio_voice(request: Request):
+async def twilio_voice(request: Request, background: BackgroundTasks,
+                      db: AsyncSession = Depends(get_async_db)):
     """
     Twilio webhook handler:
     - Receives SpeechResult from Twilio <Gather>.
     - Advances GPTDialogueManager state.
     - Returns TwiML with next prompt.
+    The call's session (dialogue manager, listing context, questions) comes from the session store;
+    the database is read only when the store does not hold the CallSid, and written behind the
+    response: after every turn with SESSION_FLUSH_EVERY_TURN, otherwise at call end, when Twilio
+    reports the call over (/twilio/call-status) or when the store evicts the session. Each turn
+    is appended to the call's turn log (apps/conversation/transcripts.py).
+    LLM calls are async and latency-bounded (apps/conversation/llm.py): a clarification that runs
+    out of its budget falls back to a template, so Twilio always gets its TwiML in time. The call's
+    summary is not made here but queued for the summary worker when the session is saved.
     """
+    started = time.perf_counter()
     form = await request.form()
     call_sid = form.get("CallSid")
     speech_result = form.get("SpeechResult")
-    listing_id = form.get("listing_id")  # optional, can be passed in initial TwiML
-
-    convo_repo = ConversationRepository()
-    listing_repo = ListingRepository()
-
-    convo = convo_repo.get_or_create(call_sid=call_sid, listing_id=listing_id or "")
-    listing = listing_repo.get_by_id(convo.listing_id) if convo.listing_id else None
-
-    # Initialize GPTDialogueManager
-    dm = GPTDialogueManager(
-        listing_context={
-            "address": getattr(listing, "address", None),
-            "title": getattr(listing, "title", None),
-        },
-        questions=convo.questions or []
-    )
-
-    # Restore state/answers if conversation already exists
-    if convo.state:
-        try:
-            dm.state = DialogueState[convo.state]
-        except KeyError:
-            pass
-    if convo.answers:
-        dm.answers = dict(convo.answers)
+    confidence = form.get("Confidence")
+    # optional, can be passed in initial TwiML or on the call's webhook URL (CallExecutor)
+    listing_id = form.get("listing_id") or request.query_params.get("listing_id")
+
+    store = get_session_store() if settings.SESSION_STORE_ENABLED and call_sid else None
+    session = await store.aget(call_sid) if store else None
+    if session is None:
+        session = await load_session(db, call_sid, listing_id or "")
 
     # Apply incoming speech
+    dm = session.dialogue_manager()
     if speech_result:
         dm.handle_response(speech_result)
 
     # Generate next prompt (pass last response for clarifications)
-    prompt = dm.next_prompt(last_response=speech_result)
-    new_state = dm.state.name
-
-    # Persist state and answers
-    convo_repo.update(call_sid=call_sid, state=new_state, answers=dm.answers)
+    llm_started = time.perf_counter()
+    prompt = await dm.anext_prompt(last_response=speech_result)
+    now = time.perf_counter()
+    session.capture(prompt, speech_result, float(confidence) if confidence else None,
+                    llm_ms=(now - llm_started) * 1000, total_ms=(now - started) * 1000)
+    new_state = session.state
 
-    # If conversation ended, save summary
-    if new_state == "END" and listing:
-        summary = summarize_conversation({"address": listing.address, "title": listing.title}, dm.answers)
-        convo_repo.save_summary(call_sid=call_sid, summary=summary)
+    if store is None:
+        async with get_async_sessionmaker(write=True)() as write_db:
+            await save_session(write_db, session.to_dict())
+    else:
+        if new_state == "END" or settings.SESSION_FLUSH_EVERY_TURN:
+            background.add_task(flush_session, session.to_dict())
+            session.pending_turns = []
+        if new_state == "END":
+            await store.adiscard(session.call_sid)
+        else:
+            await store.aput(session)
+        flush_evicted(store, background)
 
     # Return TwiML response
     twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
@@ -68,3 +159,78 @@ async def twilio_voice(request: Request):
     </Gather>
 </Response>"""
     return Response(content=twiml, media_type="application/xml")
+
+
+@router.post("/twilio/call-status")
+async def twilio_call_status(request: Request, background: BackgroundTasks):
+    """
+    Twilio call-status callback: once a call is over, however it ended (hang-up before END
+    included), its session's turns not yet written are flushed and the session is dropped.
+    """
+    form = await request.form()
+    call_sid, status = form.get("CallSid"), form.get("CallStatus")
+    if not (settings.SESSION_STORE_ENABLED and call_sid and status in CALL_ENDED_STATUSES):
+        return Response(status_code=204)
+    store = get_session_store()
+    session = await store.aget(call_sid)
+    if session is not None:
+        if session.pending_turns:
+            background.add_task(flush_session, session.to_dict())
+        await store.adiscard(call_sid)
+    flush_evicted(store, background)
+    return Response(status_code=204)
+
+
+@router.post("/twilio/recording-status")
+async def twilio_recording_status(request: Request):
+    """
+    Twilio recording-status callback: a completed recording is queued for download into the object store.
+    """
+    form = await request.form()
+    call_sid, recording_sid, recording_url = form.get("CallSid"), form.get("RecordingSid"), form.get("RecordingUrl")
+    status = form.get("RecordingStatus")
+    if status == "completed" and call_sid and recording_sid and recording_url:
+        get_recording_pipeline().submit(call_sid, recording_sid, recording_url)
+    else:
+        logger.info("Ignoring recording %s of call %s with status %s", recording_sid, call_sid, status)
+    return Response(status_code=204)
+
+
+@router.get("/twilio/recordings")
+def recording_pipeline_stats():
+    """
+    Submitted/stored/retried/failed recordings, bytes stored and the download queue depth.
+    """
+    return get_recording_pipeline().stats()
+
+
+@router.get("/twilio/llm")
+def llm_stats():
+    """
+    LLM tiers and per-model latency/token histograms, timeouts, errors and fallbacks.
+    """
+    return get_llm_client().stats()
+
+
+@router.get("/twilio/clarifications")
+def clarification_cache_stats():
+    """
+    Clarification cache hit rate and tier counters.
+    """
+    return get_clarifier().stats()
+
+
+@router.get("/twilio/summaries")
+def summary_worker_stats():
+    """
+    Summary worker counters: jobs enqueued, claimed, done, retried, failed, LLM requests (batched) and queue depth.
+    """
+    return get_summary_worker().stats()
+
+
+@router.get("/twilio/sessions")
+def session_store_stats():
+    """
+    Hit/miss/eviction counters of the call session store.
+    """
+    return get_session_store().stats()
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional
 
 @dataclass
 class CallJob:
@@ -7,3 +7,5 @@ class CallJob:
     to_number: str
     questions: List[str]
     search_id: str
+    score: Optional[float] = None  # call priority, higher is dialed first
+    listing_context: Optional[Dict] = None  # address/title, to prime the call's webhook session
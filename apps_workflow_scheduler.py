@@ -1,24 +1,34 @@
+import itertools
+import logging
 import threading
 import queue
 from typing import List
 from .jobs import CallJob
 from .rate_limit import TokenBucket
 
+logger = logging.getLogger(__name__)
+
 class Scheduler:
     """
     Concurrent scheduler with bounded concurrency and local rate limiting.
+    Jobs are dispatched best score first (FIFO among equal scores), including after a rate-limit requeue.
+    A job that raises is logged and dropped; its worker goes on with the next one.
     """
 
     def __init__(self, executor, concurrency: int, rate_limit: TokenBucket):
         self.executor = executor
         self.concurrency = concurrency
         self.rate_limit = rate_limit
-        self.q = queue.Queue()
+        self.q = queue.PriorityQueue()
+        self._seq = itertools.count()
         self.workers = []
 
     def submit(self, jobs: List[CallJob]):
         for job in jobs:
-            self.q.put(job)
+            self.q.put(self._entry(job))
+
+    def _entry(self, job: CallJob):
+        return (-(job.score or 0.0), next(self._seq), job)
 
     def start(self):
         for _ in range(self.concurrency):
@@ -28,14 +38,17 @@ class Scheduler:
 
     def _worker(self):
         while True:
-            job = self.q.get()
+            entry = self.q.get()
+            job = entry[2]
             try:
                 if self.rate_limit.acquire():
                     self.executor.execute(job)
                 else:
                     # Backoff and requeue when limited
                     threading.Event().wait(0.5)
-                    self.q.put(job)
+                    self.q.put(entry)
+            except Exception:
+                logger.exception("Call job for listing %s failed", getattr(job, "listing_id", None))
             finally:
                 self.q.task_done()
 
@@ -0,0 +1,174 @@
+"""
+Vectorized listing scoring used to order call jobs.
+
+A search's listings are loaded as columns (price, beds, baths, sqft and the derived
+price per sqft) into float64 NumPy arrays, missing values as NaN, and every component
+is computed for the whole inventory in one pass. Each component lands in [0, 1]; the
+score is their weighted sum divided by the total weight, so it is in [0, 1] as well.
+A missing value contributes 0 for its component, so sparse listings sort below
+complete ones with the same known values.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+import logging
+import time
+
+import numpy as np
+
+from apps.ingestion.filters import RentalFilters
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Over-budget listings fall from 0.5 at max_price to 0 at max_price * (1 + PRICE_OVERSHOOT).
+PRICE_OVERSHOOT = 0.25
+
+
+@dataclass
+class ScoreWeights:
+    price: float = 0.35
+    beds: float = 0.2
+    baths: float = 0.1
+    sqft: float = 0.15
+    price_per_sqft: float = 0.2
+
+    @classmethod
+    def from_settings(cls) -> "ScoreWeights":
+        return cls(
+            price=settings.SCORE_WEIGHT_PRICE,
+            beds=settings.SCORE_WEIGHT_BEDS,
+            baths=settings.SCORE_WEIGHT_BATHS,
+            sqft=settings.SCORE_WEIGHT_SQFT,
+            price_per_sqft=settings.SCORE_WEIGHT_PRICE_PER_SQFT,
+        )
+
+
+class ListingColumns:
+    """
+    Columnar view of a set of listings: one float64 array per scored field, aligned with `listing_ids`.
+    """
+
+    def __init__(self, listing_ids: Sequence[str], price, beds, baths, sqft):
+        self.listing_ids = list(listing_ids)
+        # dtype=float turns None into NaN
+        self.price = np.asarray(price, dtype=np.float64)
+        self.beds = np.asarray(beds, dtype=np.float64)
+        self.baths = np.asarray(baths, dtype=np.float64)
+        self.sqft = np.asarray(sqft, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.price_per_sqft = np.where(self.sqft > 0, self.price / self.sqft, np.nan)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "ListingColumns":
+        """
+        Build from (listing_id, price, beds, baths, sqft) tuples, e.g. a projected DB query.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls([], [], [], [], [])
+        ids, price, beds, baths, sqft = zip(*rows)
+        return cls(ids, price, beds, baths, sqft)
+
+    @classmethod
+    def from_listings(cls, listings: Iterable[Dict]) -> "ListingColumns":
+        return cls.from_rows((l["listing_id"], l.get("price"), l.get("beds"), l.get("baths"), l.get("sqft")) for l in listings)
+
+    def __len__(self) -> int:
+        return len(self.listing_ids)
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    """
+    Scale to [0, 1] over the known values; NaN stays NaN, a constant column scores 1.
+    """
+    if not np.isfinite(values).any():
+        return values
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    if hi <= lo:
+        return np.where(np.isnan(values), np.nan, 1.0)
+    return (values - lo) / (hi - lo)
+
+
+def _at_least(values: np.ndarray, wanted: Optional[float]) -> np.ndarray:
+    """
+    1 when the listing meets the requested minimum, the met fraction below it;
+    without a requested minimum, more is better relative to the inventory.
+    """
+    if not wanted:
+        return _min_max(values)
+    return np.clip(values / wanted, 0.0, 1.0)
+
+
+def _price_fit(price: np.ndarray, min_price: Optional[float], max_price: Optional[float]) -> np.ndarray:
+    """
+    Within budget, cheaper is better: 1 at (or below) min_price down to 0.5 at max_price.
+    Above max_price the component drops linearly to 0 at max_price * (1 + PRICE_OVERSHOOT).
+    Without a budget, cheaper relative to the inventory is better.
+    """
+    if not max_price:
+        return 1.0 - _min_max(price)
+    low = float(min_price or 0)
+    span = max(max_price - low, 1.0)
+    in_budget = 1.0 - 0.5 * np.clip((price - low) / span, 0.0, 1.0)
+    over = 0.5 * np.clip(1.0 - (price - max_price) / (max_price * PRICE_OVERSHOOT), 0.0, 1.0)
+    return np.where(price > max_price, over, in_budget)
+
+
+def score_columns(cols: ListingColumns, filters: Optional[RentalFilters] = None,
+                  weights: Optional[ScoreWeights] = None) -> np.ndarray:
+    """
+    Score every listing in one vectorized pass. Returns a float64 array aligned with cols.listing_ids.
+    """
+    if not len(cols):
+        return np.zeros(0)
+    weights = weights or ScoreWeights.from_settings()
+    components = (
+        (weights.price, _price_fit(cols.price, filters and filters.min_price, filters and filters.max_price)),
+        (weights.beds, _at_least(cols.beds, filters and filters.beds)),
+        (weights.baths, _at_least(cols.baths, filters and filters.baths)),
+        (weights.sqft, _min_max(cols.sqft)),
+        (weights.price_per_sqft, 1.0 - _min_max(cols.price_per_sqft)),
+    )
+    total = sum(w for w, _ in components) or 1.0
+    score = np.zeros(len(cols))
+    for weight, component in components:
+        if weight:
+            score += weight * np.nan_to_num(component, nan=0.0)
+    return score / total
+
+
+def rank(scores: np.ndarray) -> np.ndarray:
+    """
+    Indices ordering scores best first; ties keep their input order.
+    """
+    return np.argsort(-scores, kind="stable")
+
+
+def score_listings(listings: List[Dict], filters: Optional[RentalFilters] = None,
+                   weights: Optional[ScoreWeights] = None) -> List[Dict]:
+    """
+    Convenience for in-memory lists: set "score" on each listing and return them best first.
+    """
+    scores = score_columns(ListingColumns.from_listings(listings), filters, weights)
+    for l, s in zip(listings, scores.tolist()):
+        l["score"] = s
+    return [listings[i] for i in rank(scores)]
+
+
+def score_search(repo, search_id: str, filters: Optional[RentalFilters] = None,
+                 weights: Optional[ScoreWeights] = None) -> int:
+    """
+    Score every listing of a search and persist the scores that changed.
+    `repo` is a ListingRepository; returns the number of listings scored.
+    """
+    started = time.perf_counter()
+    rows = repo.score_inputs(search_id)
+    cols = ListingColumns.from_rows(r[:5] for r in rows)
+    scores = np.round(score_columns(cols, filters, weights), 6)
+    current = np.array([r[5] for r in rows], dtype=np.float64)
+    changed = np.flatnonzero(~np.isclose(scores, current))  # NaN (never scored) is never close
+    repo.save_scores(search_id, {cols.listing_ids[i]: float(scores[i]) for i in changed})
+    logger.info("Scored %d listings for search_id=%s (%d changed) in %.1f ms",
+                len(cols), search_id, len(changed), (time.perf_counter() - started) * 1000)
+    return len(cols)
@@ -0,0 +1,97 @@
+"""
+Benchmark the answer-adequacy classifier (apps/conversation/adequacy.py) against the old
+"shorter than 4 characters" heuristic on a held-out labeled fixture
+(benchmarks/fixtures/answers_adequacy.jsonl; the model trains on
+apps/conversation/adequacy_examples.jsonl, which shares no answers with it).
+
+Reports accuracy, precision and recall of "needs clarification" per method, the
+classifier's decisions per stage (rules vs model), its misses, the training time and the
+per-answer latency, best of --repeat passes.
+
+Usage:
+    python -m benchmarks.adequacy
+    python -m benchmarks.adequacy --repeat 20 --show-misses
+"""
+
+import argparse
+import os
+import statistics
+import time
+from collections import Counter
+
+from benchmarks import env  # noqa: F401  placeholder settings; import before apps
+
+from apps.conversation.adequacy import assess, load_examples, train_model
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "answers_adequacy.jsonl")
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def legacy(question: str, text: str) -> bool:
+    return not text or len(text.strip()) < 4
+
+
+def scores(predicted, labels):
+    tp = sum(1 for p, y in zip(predicted, labels) if p and y)
+    fp = sum(1 for p, y in zip(predicted, labels) if p and not y)
+    fn = sum(1 for p, y in zip(predicted, labels) if not p and y)
+    accuracy = sum(1 for p, y in zip(predicted, labels) if p == y) / len(labels)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return accuracy, precision, recall
+
+
+def run(repeat: int, show_misses: bool) -> None:
+    started = time.perf_counter()
+    model = train_model(load_examples())
+    train_ms = (time.perf_counter() - started) * 1000
+
+    fixture = load_examples(FIXTURE)
+    labels = [bool(ex["clarify"]) for ex in fixture]
+    assessments = [assess(ex["question"], ex["answer"], model) for ex in fixture]
+
+    print(f"{len(fixture)} labeled answers, {sum(labels)} needing clarification; model trained in {train_ms:.1f} ms")
+    print(f"{'method':>10} {'accuracy':>9} {'precision':>10} {'recall':>7}")
+    for name, predicted in (("legacy", [legacy(ex["question"], ex["answer"]) for ex in fixture]),
+                            ("classifier", [a.needs_clarification for a in assessments])):
+        accuracy, precision, recall = scores(predicted, labels)
+        print(f"{name:>10} {accuracy:>9.3f} {precision:>10.3f} {recall:>7.3f}")
+
+    print()
+    by_reason = Counter(a.reason for a in assessments)
+    wrong = Counter(a.reason for a, y in zip(assessments, labels) if a.needs_clarification != y)
+    print(f"{'stage':>10} {'answers':>8} {'wrong':>6}")
+    for reason, n in by_reason.most_common():
+        print(f"{reason:>10} {n:>8} {wrong[reason]:>6}")
+
+    if show_misses:
+        print()
+        for ex, a, y in zip(fixture, assessments, labels):
+            if a.needs_clarification != y:
+                score = "" if a.score is None else f" p={a.score:.2f}"
+                print(f"  expected clarify={y} got {a.reason}{score}: [{ex['question']}] {ex['answer']!r}")
+
+    best = None
+    for _ in range(repeat):
+        latencies = []
+        for ex in fixture:
+            t = time.perf_counter()
+            assess(ex["question"], ex["answer"], model)
+            latencies.append((time.perf_counter() - t) * 1e6)
+        if best is None or statistics.median(latencies) < statistics.median(best):
+            best = latencies
+    print()
+    print(f"latency per answer: p50 {statistics.median(best):.1f} us, p99 {percentile(best, 99):.1f} us, "
+          f"max {max(best):.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+    run(args.repeat, args.show_misses)
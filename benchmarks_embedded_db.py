@@ -0,0 +1,95 @@
+"""
+Compare embedded SQLite (WAL, apps/storage/db.py configure_sqlite) with Postgres on the
+ingestion and webhook workloads.
+
+- ingest:  ListingRepository.upsert_many of N listings into a search from --writers
+           threads at once (the scheduler/ingestion shape), cold then refresh
+           (~10% of prices changed), each writer on its own search and session.
+- webhook: the Twilio webhook load test (benchmarks/webhook_load.py) at each --levels.
+
+Usage:
+    python -m benchmarks.embedded_db                                   # SQLite temp file only
+    python -m benchmarks.embedded_db --postgres-url postgresql://user:pw@localhost/bench
+    python -m benchmarks.embedded_db --sizes 3000 30000 --writers 4 --levels 25 100
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import env  # noqa: F401  placeholder settings; import before apps
+
+from sqlalchemy.orm import sessionmaker
+
+from apps.storage.db import async_database_url, create_db_engine, writer_engine
+from apps.storage.orm_models import Base
+from apps.storage.repositories import ListingRepository
+from benchmarks.upsert_many import make_listings, mutate
+from benchmarks.webhook_load import percentile, run_level
+
+SIZES = (3_000, 30_000)
+LEVELS = (25, 100)
+
+
+def ingest(url: str, n: int, writers: int):
+    """
+    Seconds for the cold and the refresh pass, each with `writers` concurrent writers.
+    """
+    engine = create_db_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    sessions = sessionmaker(bind=writer_engine(engine), autoflush=False)
+    per_writer = max(1, n // writers)
+    cold = [[dict(l, listing_id=f"w{w}-{l['listing_id']}") for l in make_listings(per_writer)] for w in range(writers)]
+    refresh = [mutate(batch) for batch in cold]
+
+    def write(w: int, batch):
+        db = sessions()
+        try:
+            ListingRepository(db).upsert_many(batch, search_id=f"bench-{w}")
+        finally:
+            db.close()
+
+    out = []
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        for batches in (cold, refresh):
+            started = time.perf_counter()
+            list(pool.map(write, range(writers), batches))
+            out.append(time.perf_counter() - started)
+    engine.dispose()
+    return out
+
+
+def run(urls, sizes, writers: int, levels, turns: int, think_ms: float) -> None:
+    print(f"{'database':>9} {'rows':>7} {'writers':>8} {'cold s':>8} {'refresh s':>10} {'rows/s':>9}")
+    for name, url in urls:
+        for n in sizes:
+            cold, refresh = ingest(url, n, writers)
+            print(f"{name:>9} {n:>7} {writers:>8} {cold:>8.3f} {refresh:>10.3f} {n / cold:>9.0f}")
+    print()
+    print(f"{'database':>9} {'calls':>6} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, url in urls:
+        for calls in levels:
+            latencies, elapsed = asyncio.run(run_level(async_database_url(url), calls, turns, think_ms))
+            print(f"{name:>9} {calls:>6} {len(latencies):>9} {len(latencies) / elapsed:>8.0f} "
+                  f"{statistics.median(latencies):>8.1f} {percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sqlite-path", default="", help="database file; a temp file by default")
+    parser.add_argument("--postgres-url", default="")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(SIZES))
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--levels", type=int, nargs="*", default=list(LEVELS))
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a call's turns")
+    args = parser.parse_args()
+    urls = [("sqlite", "sqlite:///" + (args.sqlite_path or os.path.join(tempfile.mkdtemp(), "embedded.db")))]
+    if args.postgres_url:
+        urls.append(("postgres", args.postgres_url))
+    run(urls, args.sizes, args.writers, args.levels, args.turns, args.think_ms)
@@ -0,0 +1,21 @@
+"""
+Placeholder settings shared by the benchmarks. config/settings.py requires these at import
+time and apps/storage/db.py builds its engine from DATABASE_URL on import; the benchmarks build
+their own engines, so that default engine is an unused in-memory SQLite database. Import this
+module before anything from apps. Values already in the environment win.
+"""
+
+import os
+
+BENCH_ENV = {
+    "DATABASE_URL": "sqlite://",
+    "TWILIO_ACCOUNT_SID": "bench",
+    "TWILIO_AUTH_TOKEN": "bench",
+    "TWILIO_CALLER_ID": "bench",
+    "PUBLIC_BASE_URL": "http://localhost",
+    "RENTPATH_API_KEY": "bench",
+    "OPENAI_API_KEY": "bench",
+}
+
+for _k, _v in BENCH_ENV.items():
+    os.environ.setdefault(_k, _v)
@@ -0,0 +1,87 @@
+"""
+Throughput benchmark for the streaming Zillow HTML extractor (apps/ingestion/html_parser.py).
+
+Runs every saved page in benchmarks/fixtures/ plus synthetic search pages grown from the
+listing-card fixture, feeding each page in 64 KiB chunks the way the provider does, and
+reports pages/sec, MB/sec and listings/sec.
+
+Usage:
+    python -m benchmarks.html_parser
+    python -m benchmarks.html_parser --seconds 2 --cards 40 400 4000
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+from benchmarks import env  # noqa: F401  placeholder settings; import before apps
+
+from apps.ingestion.html_parser import iter_listings_from_chunks
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CHUNK = 64 * 1024
+_CARD_START = '<li class="ListItem">'
+_ZPID_RE = re.compile(r"\d+_zpid|zpid_\d+")
+
+
+def load_fixtures():
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def synthetic_page(cards_page: str, n_cards: int) -> str:
+    """
+    Grow the card fixture to n_cards listings, giving each copy its own zpid.
+    """
+    head, *cards = cards_page.split(_CARD_START)
+    last = cards[-1]
+    end = last.index("</li>", last.index("</article>")) + len("</li>")
+    cards[-1], tail = last[:end], last[end:]
+    body = []
+    for i in range(n_cards):
+        card = _ZPID_RE.sub(lambda m, z=str(9_000_000 + i): re.sub(r"\d+", z, m.group(0)), cards[i % len(cards)])
+        body.append(_CARD_START + card)
+    return head + "".join(body) + tail
+
+
+def parse(html: str) -> int:
+    chunks = (html[i:i + CHUNK] for i in range(0, len(html), CHUNK))
+    return sum(1 for _ in iter_listings_from_chunks(chunks))
+
+
+def measure(html: str, seconds: float):
+    n = listings = 0
+    t0 = time.perf_counter()
+    while True:
+        listings = parse(html)
+        n += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= seconds:
+            break
+    mb = len(html.encode("utf-8")) / 1e6
+    return listings, n / elapsed, n * mb / elapsed, n * listings / elapsed, mb
+
+
+def run(seconds: float, card_counts):
+    pages = load_fixtures()
+    if "zillow_cards.html" in pages:
+        for n in card_counts:
+            pages[f"synthetic_{n}_cards"] = synthetic_page(pages["zillow_cards.html"], n)
+
+    print(f"{'page':<28} {'KB':>8} {'listings':>9} {'pages/s':>9} {'MB/s':>7} {'listings/s':>11}")
+    for name, html in pages.items():
+        listings, pps, mbps, lps, mb = measure(html, seconds)
+        print(f"{name:<28} {mb * 1000:>8.1f} {listings:>9} {pps:>9.1f} {mbps:>7.2f} {lps:>11.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per page")
+    parser.add_argument("--cards", type=int, nargs="*", default=[40, 400, 4000], help="synthetic page sizes (cards)")
+    args = parser.parse_args()
+    run(args.seconds, args.cards)
@@ -0,0 +1,65 @@
+"""
+Benchmark the vectorized call-order scorer (apps/workflow/scoring.py).
+
+For each inventory size, synthetic listings (with ~5% missing fields) are scored against a
+typical filter set. Reports the time to build the columnar arrays from row tuples, the
+scoring pass itself and the ranking sort, best of --repeat runs.
+
+Usage:
+    python -m benchmarks.scoring
+    python -m benchmarks.scoring --sizes 1000 100000 1000000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks import env  # noqa: F401  placeholder settings; import before apps
+
+from apps.ingestion.filters import RentalFilters
+from apps.workflow.scoring import ListingColumns, rank, score_columns
+
+SIZES = (1_000, 10_000, 100_000)
+FILTERS = RentalFilters(city="Austin", state="TX", min_price=1200, max_price=2500, beds=2, baths=1)
+
+
+def _maybe(value, rnd):
+    return None if rnd.random() < 0.05 else value
+
+
+def make_rows(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    return [(
+        f"z{i}",
+        _maybe(rnd.randint(800, 4000), rnd),
+        _maybe(float(rnd.randint(0, 4)), rnd),
+        _maybe(float(rnd.choice((1, 1, 1.5, 2, 2.5))), rnd),
+        _maybe(rnd.randint(350, 2200), rnd),
+    ) for i in range(n)]
+
+
+def best_of(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, out
+
+
+def run(sizes, repeat: int) -> None:
+    print(f"{'listings':>9} {'columns ms':>11} {'score ms':>9} {'rank ms':>8}")
+    for n in sizes:
+        rows = make_rows(n)
+        build_ms, cols = best_of(lambda: ListingColumns.from_rows(rows), repeat)
+        score_ms, scores = best_of(lambda: score_columns(cols, FILTERS), repeat)
+        rank_ms, _ = best_of(lambda: rank(scores), repeat)
+        print(f"{n:>9} {build_ms:>11.2f} {score_ms:>9.2f} {rank_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
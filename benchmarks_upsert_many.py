@@ -0,0 +1,116 @@
+"""
+Benchmark ListingRepository.upsert_many against the previous row-by-row loop
+(one session.get() per listing, attribute-wise update, single commit).
+
+Each size is measured twice on a fresh schema:
+- cold:    every listing is new (pure insert)
+- refresh: same batch again with ~10% of prices changed (mostly unchanged rows)
+
+Usage:
+    python -m benchmarks.upsert_many                              # in-memory SQLite
+    python -m benchmarks.upsert_many --database-url postgresql://user:pw@localhost/bench
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks import env  # noqa: F401  placeholder settings; import before apps
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from apps.storage.orm_models import Base, ListingORM
+from apps.storage.repositories import ListingRepository
+
+SIZES = (300, 3_000, 30_000)
+
+
+def make_listings(n: int, search_id: str = "bench"):
+    rnd = random.Random(n)
+    return [{
+        "listing_id": f"zpid-{i}",
+        "provider": "zillow",
+        "search_id": search_id,
+        "title": f"{rnd.randint(1, 4)} bd apartment",
+        "address": f"{i} Main St",
+        "city": "Austin",
+        "state": "TX",
+        "zipcode": f"{78700 + i % 50}",
+        "price": rnd.randint(900, 4000),
+        "beds": float(rnd.randint(0, 4)),
+        "baths": float(rnd.randint(1, 3)),
+        "sqft": rnd.randint(400, 2000),
+        "url": f"https://www.zillow.com/homedetails/{i}_zpid/",
+        "contact_phone": f"+1512555{i % 10000:04d}",
+    } for i in range(n)]
+
+
+def mutate(listings, fraction: float = 0.1):
+    rnd = random.Random(len(listings))
+    out = [dict(l) for l in listings]
+    for l in rnd.sample(out, int(len(out) * fraction)):
+        l["price"] += 50
+    return out
+
+
+def legacy_upsert_many(db, listings):
+    """The pre-bulk implementation, kept here as the baseline."""
+    for l in listings:
+        listing_id = l.get("listing_id")
+        if not listing_id:
+            continue
+        obj = db.get(ListingORM, listing_id)
+        if obj:
+            for k, v in l.items():
+                if hasattr(obj, k):
+                    setattr(obj, k, v)
+        else:
+            db.add(ListingORM(**{k: v for k, v in l.items() if hasattr(ListingORM, k)}))
+    db.commit()
+
+
+def fresh_session(url: str):
+    kwargs = {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}} if url.startswith("sqlite") else {}
+    engine = create_engine(url, **kwargs)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def run(url: str, sizes):
+    print(f"database: {url}")
+    print(f"{'rows':>7} {'phase':>8} {'legacy s':>10} {'bulk s':>10} {'speedup':>8}")
+    for n in sizes:
+        cold = make_listings(n)
+        refresh = mutate(cold)
+
+        db = fresh_session(url)
+        legacy = [timed(legacy_upsert_many, db, cold)]
+        db.expunge_all()
+        legacy.append(timed(legacy_upsert_many, db, refresh))
+        db.close()
+
+        db = fresh_session(url)
+        repo = ListingRepository(db=db)
+        bulk = [timed(repo.upsert_many, cold)]
+        bulk.append(timed(repo.upsert_many, refresh))
+        db.close()
+
+        for phase, a, b in zip(("cold", "refresh"), legacy, bulk):
+            print(f"{n:>7} {phase:>8} {a:>10.3f} {b:>10.3f} {a / b:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(SIZES))
+    args = parser.parse_args()
+    run(args.database_url, args.sizes)
@@ -0,0 +1,157 @@
+"""
+Load test for the Twilio voice webhook (POST /twilio/voice) on the async DB path.
+
+Simulates N concurrent calls, each posting --turns sequential speech turns, against the
+webhook router served in-process over httpx's ASGI transport, and reports latency
+percentiles per concurrency level. A turn's latency is the time until its TwiML response is
+sent, which is what Twilio waits for; the write-behind runs after that, and "flushed p99" is
+the time until the turn was also written (the ASGI transport returns only once it was).
+The store is not primed, so each call's first turn loads its session from the database;
+"first p99" and "next p99" split the latency of those cold turns from the ones served by
+the store. On SQLite the cold loads are what grows with the number of calls starting at once
+(their connections and reads share the CPU with the writer); later turns stay flat. Like a real call, each caller pauses between turns
+(--think-ms, jittered +-50%) while the callee speaks; with --think-ms 0 every caller
+hammers back-to-back and the test measures saturation throughput instead. Answers are long enough that the dialogue never
+enters CLARIFY or WRAPUP, so no GPT request is made and the numbers reflect the
+handler and database path only.
+
+Usage:
+    python -m benchmarks.webhook_load                                       # aiosqlite temp file
+    python -m benchmarks.webhook_load --levels 10 50 100 200 --turns 6 --think-ms 2000
+    python -m benchmarks.webhook_load --database-url postgresql+asyncpg://user:pw@localhost/bench
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks import env  # noqa: F401  placeholder settings; import before apps
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from apps.conversation.sessions import get_session_store
+from apps.storage import db as db_module
+from apps.storage.db import create_async_db_engine, get_async_db, writer_engine
+from apps.storage.orm_models import Base, ConversationORM, ListingORM, SearchListingORM
+from apps.telephony.webhooks import router as twilio_router
+
+LEVELS = (10, 25, 50, 100, 200)
+QUESTIONS = [f"Question number {i}?" for i in range(20)]
+ANSWER = "Yes, that is included in the monthly rent."
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def setup(url: str, calls: int):
+    # same engine setup as the app (WAL; BEGIN IMMEDIATE for the units of work that write)
+    engine = create_async_db_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+    write_sessions = async_sessionmaker(writer_engine(engine), expire_on_commit=False, autoflush=False)
+    async with write_sessions() as db:
+        for i in range(calls):
+            db.add(ListingORM(listing_id=f"L{i}", provider="bench", address=f"{i} Main St"))
+            db.add(SearchListingORM(search_id="bench", listing_id=f"L{i}"))
+            db.add(ConversationORM(call_sid=f"CA{i}", listing_id=f"L{i}", state="INTRO", answers={}, questions=QUESTIONS))
+        await db.commit()
+    return engine, sessions, write_sessions
+
+
+class ResponseTimer:
+    """
+    ASGI wrapper recording when each request's response was sent, keyed by its x-bench-id header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sent = {}
+
+    async def __call__(self, scope, receive, send):
+        request_id = dict(scope.get("headers") or []).get(b"x-bench-id")
+
+        async def timed_send(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                self.sent[request_id] = time.perf_counter()
+
+        await self.app(scope, receive, timed_send)
+
+
+async def one_call(client: httpx.AsyncClient, timer: ResponseTimer, call_sid: str, turns: int, think_ms: float,
+                   latencies: list, flushed: list) -> None:
+    # stagger call starts across one think period, as calls connect at different times
+    await asyncio.sleep(random.uniform(0, think_ms) / 1000)
+    for turn in range(turns):
+        if turn and think_ms:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * think_ms / 1000)
+        data = {"CallSid": call_sid}
+        if turn:
+            data["SpeechResult"] = ANSWER
+        request_id = f"{call_sid}:{turn}"
+        started = time.perf_counter()
+        resp = await client.post("/twilio/voice", data=data, headers={"x-bench-id": request_id})
+        flushed.append((time.perf_counter() - started) * 1000)
+        latencies.append((turn, (timer.sent.pop(request_id.encode()) - started) * 1000))
+        resp.raise_for_status()
+
+
+async def run_level(url: str, concurrency: int, turns: int, think_ms: float):
+    engine, sessions, write_sessions = await setup(url, concurrency)
+
+    async def override_db():
+        async with sessions() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(twilio_router)
+    app.dependency_overrides[get_async_db] = override_db
+    # session write-behind runs outside the request and opens its own (write) sessions
+    db_module._async_sessionmaker, db_module._async_write_sessionmaker = sessions, write_sessions
+    get_session_store().memory.clear()  # CallSids repeat across levels
+
+    latencies: list = []
+    flushed: list = []
+    timer = ResponseTimer(app)
+    transport = httpx.ASGITransport(app=timer)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one_call(client, timer, f"CA{i}", turns, think_ms, latencies, flushed)
+                               for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return latencies, flushed, elapsed
+
+
+async def main(url: str, levels, turns: int, think_ms: float) -> None:
+    print(f"{'calls':>6} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+          f" {'first p99':>10} {'next p99':>9} {'flushed p99':>12}")
+    for n in levels:
+        by_turn, flushed, elapsed = await run_level(url, n, turns, think_ms)
+        latencies = [ms for _, ms in by_turn]
+        first = [ms for turn, ms in by_turn if turn == 0]
+        later = [ms for turn, ms in by_turn if turn] or [0.0]
+        print(f"{n:>6} {len(latencies):>9} {len(latencies) / elapsed:>8.0f} {statistics.median(latencies):>8.1f} "
+              f"{percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f} {max(latencies):>8.1f}"
+              f" {percentile(first, 99):>10.1f} {percentile(later, 99):>9.1f} {percentile(flushed, 99):>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="")
+    parser.add_argument("--levels", type=int, nargs="*", default=list(LEVELS))
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--think-ms", type=float, default=1000.0, help="mean pause between a call's turns")
+    args = parser.parse_args()
+    url = args.database_url or "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "webhook_load.db")
+    asyncio.run(main(url, args.levels, args.turns, args.think_ms))
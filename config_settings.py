@@ -1,8 +1,17 @@
 
-from pydantic import BaseSettings, AnyUrl
+from pydantic import BaseSettings, AnyUrl, validator
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import ArgumentError
+
+# the database of EMBEDDED_DB=1 when DATABASE_URL is not set
+EMBEDDED_DATABASE_URL = "sqlite:///data/rental.db"
 
 class Settings(BaseSettings):
-    DATABASE_URL: AnyUrl
+    # Embedded single-node mode is opt-in: EMBEDDED_DB=1 without DATABASE_URL uses EMBEDDED_DATABASE_URL
+    EMBEDDED_DB: bool = False
+    # Required otherwise: a server database (postgresql://...) or embedded SQLite (sqlite:///path/to.db,
+    # sqlite:// in memory); any SQLAlchemy URL
+    DATABASE_URL: str = ""
     REDIS_URL: AnyUrl = "redis://localhost:6379/0"
 
     # Telephony
@@ -21,6 +30,65 @@ class Settings(BaseSettings):
     S3_BUCKET_RECORDINGS: str = ""
     S3_ACCESS_KEY: str = ""
     S3_SECRET_KEY: str = ""
+    S3_MULTIPART_PART_BYTES: int = 8 * 1024 * 1024
+    # Object store for recordings (s3 | local); empty uses s3 when S3_ENDPOINT_URL is set, else local
+    OBJECT_STORE_BACKEND: str = ""
+    LOCAL_OBJECT_STORE_DIR: str = "data/objects"
+    # Cold storage of searches (apps/storage/archive.py): Parquet files in the object store
+    SEARCH_ARCHIVE_AFTER_DAYS: int = 30
+    S3_BUCKET_ARCHIVE: str = ""  # empty uses S3_BUCKET_RECORDINGS
+    SEARCH_ARCHIVE_CACHE_ENTRIES: int = 16  # archived searches kept parsed for dashboard paging
+    # Recording downloads (apps/telephony/recordings.py)
+    RECORDING_CONCURRENCY: int = 4
+    RECORDING_CHUNK_BYTES: int = 256 * 1024
+    RECORDING_MAX_ATTEMPTS: int = 4
+    RECORDING_RETRY_BASE_SECONDS: float = 10.0  # doubled per attempt
+
+    # Listing providers: one name or a comma-separated list for concurrent fan-out
+    LISTING_PROVIDER: str = "zillow"
+    PROVIDER_TIMEOUT_SECONDS: float = 20.0  # per page: a provider idle this long is dropped from the fan-out
+
+    # Provider search cache (in-process LRU, optional Redis tier on REDIS_URL)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_TTL_SECONDS: int = 900
+    SEARCH_CACHE_MAX_ENTRIES: int = 256
+    SEARCH_CACHE_MAX_LISTINGS: int = 5000
+    SEARCH_CACHE_REDIS: bool = False
+
+    # Live call sessions for the Twilio webhook (in-process LRU, optional Redis tier on REDIS_URL);
+    # the TTL must outlast a call (CALL_TIMEOUT_SECONDS)
+    SESSION_STORE_ENABLED: bool = True
+    SESSION_TTL_SECONDS: int = 1800
+    SESSION_MAX_ENTRIES: int = 2000
+    SESSION_STORE_REDIS: bool = False
+    # Write sessions to the DB after every turn (off the response path); False writes only at call end
+    SESSION_FLUSH_EVERY_TURN: bool = True
+
+    # Turns of finished calls older than this are compressed into one archive row per call
+    TRANSCRIPT_ARCHIVE_AFTER_HOURS: int = 168
+
+    # Answer a search from stored listings of a complete, broader search at most this old; 0 disables
+    LOCAL_INVENTORY_MAX_AGE_SECONDS: int = 3600
+
+    # Zillow scraper services (apify | zenrows | scraperapi); empty uses the partner API
+    ZILLOW_SCRAPER_SERVICE: str = ""
+    ZILLOW_SCRAPER_API_KEY: str = ""
+    APIFY_BASE_URL: str = "https://api.apify.com"
+    APIFY_ACTOR_ID: str = "eunit~zillow-rent-data-scraper"
+    APIFY_POLL_INITIAL_SECONDS: float = 1.0
+    APIFY_POLL_MAX_SECONDS: float = 10.0
+    APIFY_RUN_TIMEOUT_SECONDS: int = 600
+    APIFY_MAX_CONNECTIONS: int = 20
+
+    # Shared provider HTTP client (apps/ingestion/http_client.py)
+    HTTP_POOL_CONNECTIONS: int = 20  # distinct hosts kept pooled
+    HTTP_POOL_MAXSIZE: int = 10  # connections per host
+    HTTP_MAX_RETRIES: int = 3
+    HTTP_BACKOFF_BASE_SECONDS: float = 0.5
+    HTTP_BACKOFF_MAX_SECONDS: float = 8.0
+    HTTP_RETRY_AFTER_MAX_SECONDS: float = 30.0  # a longer Retry-After fails fast instead
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 30.0
 
     # RentPath
     RENTPATH_API_KEY: str
@@ -28,13 +96,73 @@ class Settings(BaseSettings):
 
     # GPT integration (NEW)
     OPENAI_API_KEY: str   # ← REQUIRED for GPT-powered modules
+    # Shared LLM client (apps/conversation/llm.py): OpenAI-compatible endpoint, model per latency tier
+    LLM_BASE_URL: str = "https://api.openai.com/v1"
+    LLM_FAST_MODEL: str = "gpt-4o-mini"  # clarifications, asked while the landlord waits
+    LLM_LARGE_MODEL: str = "gpt-4o"  # summaries
+    LLM_CLARIFY_BUDGET_MS: int = 1500  # then the template clarification is used
+    LLM_SUMMARY_BUDGET_MS: int = 30000
+    LLM_MAX_CONNECTIONS: int = 20
+    # Clarification prompts cached per (question, short answer) (in-process LRU, optional Redis tier on REDIS_URL)
+    CLARIFY_CACHE_MAX_ENTRIES: int = 4096
+    CLARIFY_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    CLARIFY_CACHE_MAX_ANSWER_WORDS: int = 4  # longer answers are clarified fresh
+    CLARIFY_CACHE_REDIS: bool = False
+    CLARIFY_CACHE_WARM_ON_STARTUP: bool = False  # warm DEFAULT_QUESTIONS in the background at API startup
+    # Answer-adequacy model (apps/conversation/adequacy.py): clarify when P(needs clarification) reaches this
+    ADEQUACY_CLARIFY_THRESHOLD: float = 0.5
+    # Summaries of finished calls (apps/conversation/summary_worker.py), off the webhook
+    SUMMARY_CONCURRENCY: int = 4
+    SUMMARY_BATCH_SIZE: int = 4  # finished calls summarized in one LLM request
+    SUMMARY_BATCH_WAIT_MS: int = 500  # how long a worker waits to fill a batch
+    SUMMARY_BATCHING: bool = True  # False sends one request per call
+    SUMMARY_MAX_ATTEMPTS: int = 3
+    SUMMARY_RETRY_BASE_SECONDS: float = 5.0  # doubled per attempt
+    SUMMARY_STALE_SECONDS: int = 600  # a running summary older than this is reclaimed by recover()
+    SUMMARY_RECOVER_INTERVAL_SECONDS: int = 300  # how often a running worker calls recover()
+
+    # Database connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Async engine for async routes (Twilio webhook); empty derives it from DATABASE_URL
+    # (postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite)
+    ASYNC_DATABASE_URL: str = ""
+    # Embedded SQLite mode (apps/storage/db.py configure_sqlite)
+    SQLITE_BUSY_TIMEOUT_MS: int = 30000  # how long a writer waits for the write lock
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # safe with WAL; FULL also syncs every commit
+    SQLITE_CACHE_KB: int = 65536
+    SQLITE_MMAP_BYTES: int = 256 * 1024 * 1024
 
     # Operational
     MAX_LISTINGS_PER_SEARCH: int = 300
+    MAX_LISTINGS_HARD_LIMIT: int = 50000
+    INGEST_PAGE_SIZE: int = 100
+    INGEST_BATCH_SIZE: int = 200
+    UPSERT_BATCH_SIZE: int = 500
     CALL_CONCURRENCY: int = 10
     CALL_TIMEOUT_SECONDS: int = 600
     JOB_RETRY_LIMIT: int = 3
 
+    # Call-order scoring weights (apps/workflow/scoring.py); relative, need not sum to 1
+    SCORE_WEIGHT_PRICE: float = 0.35
+    SCORE_WEIGHT_BEDS: float = 0.2
+    SCORE_WEIGHT_BATHS: float = 0.1
+    SCORE_WEIGHT_SQFT: float = 0.15
+    SCORE_WEIGHT_PRICE_PER_SQFT: float = 0.2
+
+    @validator("DATABASE_URL", always=True)
+    def _database_url(cls, value: str, values) -> str:
+        if not value:
+            if not values.get("EMBEDDED_DB"):
+                raise ValueError("DATABASE_URL is required; set EMBEDDED_DB=1 to use the embedded SQLite database")
+            return EMBEDDED_DATABASE_URL
+        try:
+            make_url(value)
+        except ArgumentError as e:
+            raise ValueError(f"not a database URL: {e}")
+        return value
+
     class Config:
         env_file = ".env"
 
@@ -1,42 +1,144 @@
-async function fetchSummaries(searchId) {
-    const res = await fetch(`/dashboard/summaries?search_id=${encodeURIComponent(searchId)}`);
+const PAGE_SIZE = 50;
+  const SUMMARY_STATUS_TEXT = {
+    pending: 'Summary queued.',
+    running: 'Summarizing…',
+    failed: 'Summary failed.',
+  };
+
+  const state = {
+    searchId: null,
+    cursor: null,
+    done: false,
+    loading: false,
+    generation: 0,  // bumped when filters change, so late responses for old filters are dropped
+  };
+
+  function currentFilters() {
+    const form = document.getElementById('filters');
+    const params = {};
+    ['sort', 'order', 'status', 'min_price', 'max_price', 'min_beds'].forEach(name => {
+      const value = form.elements[name].value.trim();
+      if (value !== '') params[name] = value;
+    });
+    return params;
+  }
+
+  async function fetchSummaries(searchId, cursor, filters) {
+    const params = new URLSearchParams({ search_id: searchId, limit: PAGE_SIZE, ...filters });
+    if (cursor) params.set('cursor', cursor);
+    const res = await fetch(`/dashboard/summaries?${params}`);
+    if (!res.ok) throw new Error(`summaries request failed: ${res.status}`);
     const data = await res.json();
-    return data.items || [];
+    return { items: data.items || [], nextCursor: data.next_cursor || null };
+  }
+
+  // One line of the typed answer facts, e.g. "available: yes • move_in: 2026-11-01 • fees: $50"
+  function factsText(facts) {
+    return Object.entries(facts || {}).map(([key, f]) => {
+      let value = f.value_date || f.value_text || '';
+      if (f.value_months != null) value = `${f.value_months} mo`;
+      if (f.value_num != null && key !== 'renovations') value = `${value} $${f.value_num}${f.value_period === 'month' ? '/mo' : ''}`.trim();
+      return value ? `${key}: ${value}` : '';
+    }).filter(Boolean).join(' • ');
+  }
+
+  function renderCard(item) {
+    const card = document.createElement('div');
+    card.className = 'card';
+    const title = document.createElement('h2');
+    title.textContent = item.listing_details.address || item.listing_details.title || 'Rental';
+    const meta = document.createElement('div');
+    meta.className = 'meta';
+    const price = item.listing_details.price ? `$${item.listing_details.price}` : '';
+    meta.textContent = `${price} • ${item.listing_details.beds || '?'} bd / ${item.listing_details.baths || '?'} ba`;
+    const link = document.createElement('a');
+    link.href = item.listing_details.url || '#';
+    link.target = '_blank';
+    link.textContent = 'View listing';
+    const summary = document.createElement('div');
+    summary.className = 'summary';
+    summary.textContent = item.summary_text || SUMMARY_STATUS_TEXT[item.summary_status] || 'No summary yet.';
+    const facts = document.createElement('div');
+    facts.className = 'facts';
+    facts.textContent = factsText(item.facts);
+    card.appendChild(title);
+    card.appendChild(meta);
+    card.appendChild(link);
+    if (facts.textContent) card.appendChild(facts);
+    card.appendChild(summary);
+    return card;
+  }
+
+  function appendItems(items) {
+    const grid = document.getElementById('grid');
+    const fragment = document.createDocumentFragment();
+    items.forEach(item => fragment.appendChild(renderCard(item)));
+    grid.appendChild(fragment);
+  }
+
+  function setStatus(text) {
+    document.getElementById('status').textContent = text;
   }
-  
-  function render(items) {
+
+  async function loadNextPage() {
+    if (state.loading || state.done) return;
+    state.loading = true;
+    const generation = state.generation;
+    setStatus('Loading…');
+    let ok = false;
+    try {
+      const page = await fetchSummaries(state.searchId, state.cursor, currentFilters());
+      if (generation !== state.generation) return;
+      appendItems(page.items);
+      state.cursor = page.nextCursor;
+      state.done = !page.nextCursor;
+      const shown = document.getElementById('grid').childElementCount;
+      setStatus(state.done ? (shown ? `${shown} summaries` : 'No summaries match.') : '');
+      ok = true;
+    } catch (err) {
+      if (generation === state.generation) setStatus(err.message);
+    } finally {
+      if (generation === state.generation) state.loading = false;
+    }
+    // a short page can leave the sentinel on screen, which the observer does not report again
+    if (ok && !state.done && sentinelInView()) loadNextPage();
+  }
+
+  function sentinelInView() {
+    return document.getElementById('sentinel').getBoundingClientRect().top < window.innerHeight + 600;
+  }
+
+  function reset() {
+    state.generation += 1;
+    state.cursor = null;
+    state.done = false;
+    state.loading = false;
+    document.getElementById('grid').innerHTML = '';
+    loadNextPage();
+  }
+
+  (function init() {
+    state.searchId = new URL(location.href).searchParams.get('searchId') || 'latest';
     const app = document.getElementById('app');
     const grid = document.createElement('div');
     grid.className = 'grid';
-    items.forEach(item => {
-      const card = document.createElement('div');
-      card.className = 'card';
-      const title = document.createElement('h2');
-      title.textContent = item.listing_details.address || item.listing_details.title || 'Rental';
-      const meta = document.createElement('div');
-      meta.className = 'meta';
-      const price = item.listing_details.price ? `$${item.listing_details.price}` : '';
-      meta.textContent = `${price} • ${item.listing_details.beds || '?'} bd / ${item.listing_details.baths || '?'} ba`;
-      const link = document.createElement('a');
-      link.href = item.listing_details.url || '#';
-      link.target = '_blank';
-      link.textContent = 'View listing';
-      const summary = document.createElement('div');
-      summary.className = 'summary';
-      summary.textContent = item.summary_text || 'No summary yet.';
-      card.appendChild(title);
-      card.appendChild(meta);
-      card.appendChild(link);
-      card.appendChild(summary);
-      grid.appendChild(card);
-    });
+    grid.id = 'grid';
+    const status = document.createElement('div');
+    status.className = 'status';
+    status.id = 'status';
+    const sentinel = document.createElement('div');
+    sentinel.id = 'sentinel';
     app.innerHTML = '';
     app.appendChild(grid);
-  }
-  
-  (async function init() {
-    const searchId = new URL(location.href).searchParams.get('searchId') || 'latest';
-    const items = await fetchSummaries(searchId);
-    render(items);
+    app.appendChild(status);
+    app.appendChild(sentinel);
+
+    // fetch the next page whenever the end of the list scrolls into view
+    new IntersectionObserver(entries => {
+      if (entries.some(e => e.isIntersecting)) loadNextPage();
+    }, { rootMargin: '600px' }).observe(sentinel);
+
+    document.getElementById('filters').addEventListener('change', reset);
+    document.getElementById('filters').addEventListener('submit', e => { e.preventDefault(); reset(); });
+    loadNextPage();
   })();
-  
\ No newline at end of file
@@ -0,0 +1,79 @@
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks import env  # noqa: F401  placeholder settings; import before apps
+
+from apps.conversation import sessions as sessions_module
+from apps.storage import db as db_module
+from apps.storage.db import create_db_engine
+from apps.storage.orm_models import Base
+from config.settings import settings
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """
+    Embedded SQLite engine on a fresh file database (WAL and pragmas as in production).
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_engine):
+    session = sessionmaker(bind=db_engine, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def app_db(db_engine, monkeypatch):
+    """
+    Point the app's own sync sessions (SessionLocal, WriteSessionLocal, session_scope) at db_engine.
+    """
+    monkeypatch.setattr(db_module, "SessionLocal", sessionmaker(bind=db_engine, autocommit=False, autoflush=False))
+    monkeypatch.setattr(db_module, "WriteSessionLocal", sessionmaker(bind=db_module.writer_engine(db_engine),
+                                                                     autocommit=False, autoflush=False))
+    return db_engine
+
+
+@pytest.fixture
+def async_url(db_engine):
+    """
+    aiosqlite URL of db_engine's database file, for async engines created inside the test's event loop.
+    """
+    return f"sqlite+aiosqlite:///{db_engine.url.database}"
+
+
+@pytest.fixture
+def webhook_client(async_url, monkeypatch):
+    """
+    Factory of an httpx client for the Twilio webhook router on the test database, with a fresh
+    session store; enter it inside the test's event loop (the async engine is built and disposed there).
+    """
+    from apps.telephony.webhooks import router
+
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", async_url)
+    monkeypatch.setattr(db_module, "_async_engine", None)
+    monkeypatch.setattr(db_module, "_async_sessionmaker", None)
+    monkeypatch.setattr(db_module, "_async_write_sessionmaker", None)
+    monkeypatch.setattr(sessions_module, "_session_store", None)
+
+    @asynccontextmanager
+    async def client():
+        app = FastAPI()
+        app.include_router(router)
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+                yield c
+        finally:
+            if db_module._async_engine is not None:
+                await db_module._async_engine.dispose()
+
+    return client
@@ -0,0 +1,51 @@
+import pytest
+
+from apps.conversation.answers import DEFAULT_QUESTION_KEYS, extract
+
+QUESTIONS = {key: question for question, key in DEFAULT_QUESTION_KEYS.items()}
+
+
+@pytest.mark.parametrize("key, answer", [
+    ("utilities", "I don't know"),
+    ("fees", "Not sure"),
+    ("pets", "not sure, I'd have to ask the owner"),
+    ("available", "Maybe"),
+])
+def test_hedges_take_no_side(key, answer):
+    assert extract(QUESTIONS[key], answer)["value_text"] is None
+
+
+@pytest.mark.parametrize("key, answer, value", [
+    ("available", "It is not rented yet", "yes"),
+    ("available", "It's not available anymore", "no"),
+    ("available", "Sorry, it's been rented", "no"),
+    ("utilities", "They aren't included", "no"),
+    ("utilities", "We don't include utilities", "no"),
+    ("utilities", "Yes, water and trash are included", "yes"),
+    ("pets", "Pets are not allowed", "no"),
+    ("pets", "No pets allowed", "no"),
+    ("pets", "Sorry, no dogs allowed", "no"),
+    ("utilities", "No utilities included", "no"),
+    ("parking", "No parking available", "no"),
+    ("parking", "No parking spots available", "no"),
+    ("pets", "No, but cats are allowed", "conditional"),
+    ("pets", "Yes, but only cats", "conditional"),
+    ("pets", "It depends on the size", "conditional"),
+])
+def test_negation_flips_the_following_word(key, answer, value):
+    assert extract(QUESTIONS[key], answer)["value_text"] == value
+
+
+@pytest.mark.parametrize("answer, amount", [
+    ("application fee is 50", 50.0),
+    ("The pet deposit would be 300", 300.0),
+    ("There's a $45 application fee", 45.0),
+])
+def test_fee_amounts(answer, amount):
+    values = extract(QUESTIONS["fees"], answer)
+    assert (values["value_text"], values["value_num"], values["value_period"]) == ("yes", amount, "once")
+
+
+def test_no_fee_is_zero():
+    values = extract(QUESTIONS["fees"], "No application fee")
+    assert (values["value_text"], values["value_num"]) == ("no", 0.0)
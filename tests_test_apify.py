@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from apps.ingestion.apify import ApifyRunManager
+from apps.ingestion.base_provider import ResultsTruncated
+from apps.ingestion.composite_provider import CompositeProvider
+from apps.ingestion.fake_apify import FakeApifyServer
+from apps.ingestion.filters import RentalFilters
+from apps.ingestion.http_client import CircuitOpenError, HttpClient
+from apps.ingestion.zillow_provider import ZillowProvider
+from config.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(settings, "APIFY_POLL_INITIAL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "APIFY_POLL_MAX_SECONDS", 0.05)
+
+
+async def _collect(manager, page_size=10):
+    items = []
+    async for item in manager.iter_items("actor", {}, page_size):
+        items.append(item)
+    await manager.aclose()
+    return items
+
+
+def test_run_is_streamed_until_it_succeeded():
+    with FakeApifyServer(items=30, rate=300) as server:
+        items = asyncio.run(_collect(ApifyRunManager("test", base_url=server.url)))
+
+        assert len(items) == 30
+        assert server.runs["run1"].status() == "SUCCEEDED"
+        assert not any(r.endswith("/abort") for r in server.requests)
+
+
+def test_failed_run_raises_truncated():
+    with FakeApifyServer(items=5, rate=500, fail=True) as server:
+        with pytest.raises(ResultsTruncated):
+            asyncio.run(_collect(ApifyRunManager("test", base_url=server.url)))
+
+
+def test_provider_asks_the_actor_for_the_search_limit(monkeypatch):
+    with FakeApifyServer(items=500, rate=1000) as server:
+        monkeypatch.setattr(settings, "ZILLOW_SCRAPER_SERVICE", "apify")
+        monkeypatch.setattr(settings, "ZILLOW_SCRAPER_API_KEY", "limit-test")
+        monkeypatch.setattr(settings, "APIFY_BASE_URL", server.url)
+
+        pages = list(ZillowProvider().iter_pages(RentalFilters(city="austin", state="TX"), limit=7, page_size=5))
+
+        assert sum(len(p) for p in pages) == 7
+        assert server.runs["run1"].input["limit"] == 7
+
+
+def test_closing_the_stream_aborts_the_run(monkeypatch):
+    with FakeApifyServer(items=1000, rate=50) as server:
+        monkeypatch.setattr(settings, "ZILLOW_SCRAPER_SERVICE", "apify")
+        monkeypatch.setattr(settings, "ZILLOW_SCRAPER_API_KEY", "abort-test")
+        monkeypatch.setattr(settings, "APIFY_BASE_URL", server.url)
+
+        pages = ZillowProvider().iter_pages(RentalFilters(city="austin", state="TX"), limit=1000, page_size=5)
+        assert next(pages)
+        pages.close()
+
+        assert "POST /v2/actor-runs/run1/abort" in server.requests
+        assert server.runs["run1"].status() == "ABORTED"
+
+
+def test_token_is_sent_as_a_header_not_in_the_url():
+    with FakeApifyServer(items=3, rate=1000) as server:
+        asyncio.run(_collect(ApifyRunManager("secret-token", base_url=server.url)))
+
+        assert server.auth and set(server.auth) == {"Bearer secret-token"}
+        assert not any("secret-token" in r for r in server.requests)
+
+
+@pytest.fixture
+def apify(monkeypatch):
+    def configure(server, key):
+        monkeypatch.setattr(settings, "ZILLOW_SCRAPER_SERVICE", "apify")
+        monkeypatch.setattr(settings, "ZILLOW_SCRAPER_API_KEY", key)
+        monkeypatch.setattr(settings, "APIFY_BASE_URL", server.url)
+        provider = ZillowProvider(http=HttpClient())
+        breaker = provider.http.breaker("apify")
+        breaker.state, breaker.opened_at = "open", 0.0  # the next run is the half-open trial
+        return provider, breaker
+    return configure
+
+
+def test_run_without_items_closes_the_breaker(apify):
+    with FakeApifyServer(items=0, rate=1000) as server:
+        provider, breaker = apify(server, "empty-run")
+
+        assert list(provider.iter_pages(RentalFilters(city="austin", state="TX"), limit=10)) == []
+        assert breaker.state == "closed"
+
+
+def test_fan_out_deadline_counts_as_a_failure(apify, monkeypatch):
+    with FakeApifyServer(items=5, rate=1) as server:
+        provider, breaker = apify(server, "deadline-run")
+        monkeypatch.setattr(settings, "APIFY_RUN_TIMEOUT_SECONDS", 0.3)
+
+        composite = CompositeProvider([provider])
+        assert list(composite.iter_pages(RentalFilters(city="austin", state="TX"), limit=10)) == []
+
+        assert composite.stats[0].status == "timeout"
+        assert breaker.state == "open" and breaker.opened_at > 0
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+
+def test_stream_stopped_before_its_first_page_hands_the_trial_on(apify):
+    async def stop_early(provider):
+        pages = provider.aiter_pages(RentalFilters(city="austin", state="TX"), limit=10)
+        task = asyncio.ensure_future(pages.__anext__())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with FakeApifyServer(items=5, rate=1) as server:
+        provider, breaker = apify(server, "stopped-run")
+        asyncio.run(stop_early(provider))
+
+        assert breaker.state == "open"
+        breaker.before_call()  # the next run is let through as the trial
+        assert breaker.state == "half_open"
+
+
+def test_fetch_page_returns_one_page_from_a_run(apify):
+    with FakeApifyServer(items=50, rate=1000) as server:
+        provider, breaker = apify(server, "fetch-page")
+
+        items, cursor = provider.fetch_page(RentalFilters(city="austin", state="TX"), None, 5)
+
+        assert len(items) == 5 and cursor is None
+        assert server.runs["run1"].input["limit"] == 5
+        assert breaker.state == "closed"
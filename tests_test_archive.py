@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from apps.api.routes_calls import CallExecutor
+from apps.storage.archive import SearchArchive
+from apps.storage.objects import LocalObjectStore
+from apps.storage.orm_models import ConversationORM, ListingORM, SearchListingORM, SearchORM, TurnORM
+from apps.workflow.jobs import CallJob
+from tests.test_call_executor import FakeVoice
+
+
+def test_archive_moves_the_real_calls_of_a_search(app_db, db, tmp_path):
+    db.add(SearchORM(search_id="s1", completed_at=datetime(2026, 1, 1)))
+    for listing_id in ("L1", "L2"):
+        db.add(ListingORM(listing_id=listing_id, provider="test", title=f"Unit {listing_id}", price=1500))
+        db.add(SearchListingORM(search_id="s1", listing_id=listing_id))
+    db.commit()
+    CallExecutor(FakeVoice("CA-arch-1")).execute(CallJob(listing_id="L1", to_number="+15125550100",
+                                                         questions=["Is it available?"], search_id="s1"))
+    # L2's call was never placed: only its placeholder exists
+    db.add(ConversationORM(call_sid="pending-L2", listing_id="L2", state="INTRO", answers={}, questions=[]))
+    db.add(TurnORM(call_sid="CA-arch-1", turn=0, prompt="Hi"))
+    db.commit()
+
+    archive = SearchArchive(db, store=LocalObjectStore(str(tmp_path / "objects")))
+    archive.archive_search("s1")
+
+    search = db.get(SearchORM, "s1")
+    rows = archive.summaries(search)
+    assert [(r["call_sid"], r["listing_id"]) for r in rows] == [("CA-arch-1", "L1")]
+    assert db.query(ConversationORM).count() == 0
+    assert db.query(TurnORM).count() == 0
+    assert db.query(ListingORM).count() == 0
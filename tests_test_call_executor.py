@@ -0,0 +1,70 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from apps.api.routes_calls import CallExecutor
+from apps.conversation.sessions import get_session_store
+from apps.storage.db import create_async_db_engine
+from apps.storage.orm_models import ConversationORM, ListingORM
+from apps.telephony.webhooks import load_session
+from apps.workflow.jobs import CallJob
+
+
+class FakeVoice:
+    def __init__(self, call_sid):
+        self.call_sid = call_sid
+        self.webhooks = []
+
+    def place_call(self, to_number, webhook_path):
+        self.webhooks.append(webhook_path)
+        return self.call_sid
+
+
+def _job(listing_id):
+    return CallJob(listing_id=listing_id, to_number="+15125550100", questions=["Is it available?"], search_id="s1",
+                   listing_context={"address": "1 Main St", "title": "Loft"})
+
+
+async def _load(url, call_sid, listing_id=""):
+    engine = create_async_db_engine(url)
+    try:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            return await load_session(db, call_sid, listing_id)
+    finally:
+        await engine.dispose()
+
+
+def test_placeholder_moves_to_the_real_call_sid(app_db, db, async_url):
+    db.add(ListingORM(listing_id="L1", provider="test", title="Loft", address="1 Main St"))
+    db.commit()
+
+    voice = FakeVoice("CA-exec-1")
+    CallExecutor(voice).execute(_job("L1"))
+
+    convo = db.get(ConversationORM, "CA-exec-1")
+    assert convo.listing_id == "L1"
+    assert convo.questions == ["Is it available?"]
+    assert db.get(ConversationORM, "pending-L1") is None
+    assert voice.webhooks == ["/twilio/voice?listing_id=L1"]
+    assert get_session_store().get("CA-exec-1").listing_context == {"address": "1 Main St", "title": "Loft"}
+
+    # a turn served from the database instead of the store still gets the listing
+    get_session_store().discard("CA-exec-1")
+    session = asyncio.run(_load(async_url, "CA-exec-1"))
+    assert session.listing_id == "L1"
+    assert session.listing_context == {"address": "1 Main St", "title": "Loft"}
+
+
+def test_first_turn_before_the_link_is_completed_by_it(app_db, db, async_url):
+    db.add(ListingORM(listing_id="L2", provider="test", title="Flat", address="2 Main St"))
+    db.commit()
+
+    # the first webhook turn (listing_id on the call's webhook URL) arrives before the executor links the call
+    session = asyncio.run(_load(async_url, "CA-exec-2", "L2"))
+    CallExecutor(FakeVoice("CA-exec-2")).execute(_job("L2"))
+
+    db.expire_all()
+    convo = db.get(ConversationORM, "CA-exec-2")
+    assert session.turn == 0
+    assert convo.listing_id == "L2"
+    assert convo.questions == ["Is it available?"]
@@ -0,0 +1,54 @@
+import asyncio
+
+from apps.conversation import llm as llm_module
+from apps.conversation.clarifications import Clarifier
+from apps.conversation.fake_llm import FakeLlmServer
+from apps.conversation.llm import LlmClient
+from apps.storage.cache import RedisTier, TieredCache, TTLCache
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    async def get(self, key):
+        self.calls.append("get")
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.calls.append("setex")
+        self.data[key] = value.encode("utf-8")
+
+
+class BlockingRedis:
+    def __getattr__(self, name):
+        raise AssertionError(f"blocking redis call {name} on the event loop")
+
+
+def _redis_tier(fake):
+    tier = RedisTier("redis://localhost:6379/0", prefix="test:clarify:", ttl_seconds=60)
+    tier.client = BlockingRedis()
+    tier._aclient = lambda: fake
+    return tier
+
+
+def test_clarifier_uses_the_async_redis_tier(monkeypatch):
+    fake = FakeAsyncRedis()
+    with FakeLlmServer(reply="Is the parking covered or on the street?") as server:
+        monkeypatch.setattr(llm_module, "_client", LlmClient(base_url=server.url + "/v1", api_key="test"))
+
+        async def run():
+            first = await Clarifier(TieredCache(TTLCache(10, 60), _redis_tier(fake))).clarify(
+                "Is parking included?", "Yeah")
+            # another worker: empty local tier, same Redis
+            second = await Clarifier(TieredCache(TTLCache(10, 60), _redis_tier(fake))).clarify(
+                "is parking included", "yep")
+            await llm_module._client.aclose()
+            return first, second
+
+        first, second = asyncio.run(run())
+
+    assert first == second == "Is the parking covered or on the street?"
+    assert len(server.requests) == 1
+    assert fake.calls == ["get", "setex", "get"]
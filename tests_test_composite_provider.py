@@ -0,0 +1,89 @@
+import time
+
+from apps.ingestion.base_provider import ListingProvider
+from apps.ingestion.composite_provider import CompositeProvider
+from apps.ingestion.filters import RentalFilters
+from apps.ingestion.rentpath_provider import RentPathProvider
+
+
+class PagedProvider(ListingProvider):
+    def __init__(self, name, pages, delay):
+        self.name = name
+        self.pages = pages
+        self.delay = delay
+
+    def fetch_page(self, filters, cursor, page_size):
+        n = int(cursor or 0)
+        time.sleep(self.delay)
+        items = [{"listing_id": f"{self.name}-{n}-{k}", "title": "x"} for k in range(page_size)]
+        return items, (str(n + 1) if n + 1 < self.pages else None)
+
+
+def test_stream_longer_than_the_timeout_is_not_cut_off():
+    provider = CompositeProvider([PagedProvider("slow", pages=6, delay=0.05)], timeout=0.2)
+
+    pages = list(provider.iter_pages(RentalFilters(city="austin", state="TX"), limit=1000, page_size=10))
+
+    assert sum(len(p) for p in pages) == 60
+    assert provider.stats[0].status == "ok"
+
+
+def test_consumer_time_does_not_count_against_providers():
+    provider = CompositeProvider([PagedProvider("fast", pages=3, delay=0)], timeout=0.1)
+
+    count = 0
+    for page in provider.iter_pages(RentalFilters(city="austin", state="TX"), limit=1000, page_size=10):
+        count += len(page)
+        time.sleep(0.15)  # e.g. the batch's DB upsert
+
+    assert count == 30
+    assert provider.stats[0].status == "ok"
+
+
+def test_idle_provider_times_out_without_holding_back_the_others():
+    provider = CompositeProvider([PagedProvider("stuck", pages=2, delay=1.0),
+                                  PagedProvider("fast", pages=2, delay=0)], timeout=0.2)
+
+    started = time.monotonic()
+    pages = list(provider.iter_pages(RentalFilters(city="austin", state="TX"), limit=1000, page_size=5))
+
+    assert time.monotonic() - started < 0.8
+    assert sum(len(p) for p in pages) == 10
+    assert {s.provider: s.status for s in provider.stats} == {"stuck": "timeout", "fast": "ok"}
+
+
+class FixedProvider(ListingProvider):
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+
+    def fetch_page(self, filters, cursor, page_size):
+        return self.items, None
+
+
+def test_ids_are_namespaced_by_provider_and_sparse_items_stay_sparse():
+    provider = CompositeProvider([
+        FixedProvider("zillow", [{"listing_id": "123", "provider": "zillow", "title": "Loft", "price": 2000}]),
+        FixedProvider("rentpath", [{"listing_id": "123", "price": 1800}, {"title": "no id"}]),
+    ], timeout=1.0)
+
+    listings = {l["listing_id"]: l for page in provider.iter_pages(RentalFilters(city="austin", state="TX"), limit=10)
+                for l in page}
+
+    assert set(listings) == {"zillow:123", "rentpath:123"}
+    rentpath = listings["rentpath:123"]
+    assert rentpath["provider"] == "rentpath" and rentpath["price"] == 1800
+    assert "title" not in rentpath and "contact_phone" not in rentpath
+
+
+def test_rentpath_skips_items_without_an_id():
+    class Http:
+        def get(self, url, provider, **kwargs):
+            class Resp:
+                def json(self):
+                    return {"results": [{"id": 7, "price": 900}, {"price": 950}, {"id": None, "price": 990}]}
+            return Resp()
+
+    items, cursor = RentPathProvider(http=Http()).fetch_page(RentalFilters(city="austin", state="TX"), None, 10)
+
+    assert [i["listing_id"] for i in items] == ["7"] and cursor is None
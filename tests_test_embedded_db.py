@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from apps.storage.async_repositories import AsyncConversationRepository
+from apps.storage.db import create_async_db_engine, session_scope, writer_engine
+from apps.storage.orm_models import ConversationORM, ListingORM
+from apps.storage.repositories import ConversationRepository
+from apps.workflow.jobs import CallJob
+from apps.workflow.rate_limit import TokenBucket
+from apps.workflow.scheduler import Scheduler
+from config.settings import EMBEDDED_DATABASE_URL, Settings
+
+
+def test_open_read_does_not_block_a_writer(app_db, db):
+    db.add(ListingORM(listing_id="L1", provider="test"))
+    db.commit()
+    assert db.get(ListingORM, "L1") is not None  # db now holds a read transaction
+
+    started = time.monotonic()
+    with session_scope(write=True) as writer:
+        writer.add(ListingORM(listing_id="L2", provider="test"))
+
+    assert time.monotonic() - started < 1.0
+    db.rollback()
+    assert db.get(ListingORM, "L2") is not None
+
+
+def test_conversation_of_an_unknown_listing_stores_null(db):
+    assert db.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+    ConversationRepository(db).update("CA1", state="INTRO", answers={})
+
+    assert db.get(ConversationORM, "CA1").listing_id is None
+
+
+def test_read_session_creates_a_conversation_after_another_write(async_url, db):
+    async def run():
+        engine = create_async_db_engine(async_url)
+        try:
+            async with async_sessionmaker(engine)() as reader:
+                await reader.execute(select(ListingORM))  # reader now holds an older snapshot
+                async with async_sessionmaker(writer_engine(engine))() as writer:
+                    writer.add(ListingORM(listing_id="L1", provider="test"))
+                    await writer.commit()
+                await AsyncConversationRepository(reader).get_or_create("CA1", "L1")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+    assert db.get(ConversationORM, "CA1").listing_id == "L1"
+
+
+class FlakyExecutor:
+    def __init__(self):
+        self.done = []
+
+    def execute(self, job):
+        if job.listing_id == "bad":
+            raise RuntimeError("twilio down")
+        self.done.append(job.listing_id)
+
+
+def test_scheduler_worker_survives_a_failing_job():
+    executor = FlakyExecutor()
+    scheduler = Scheduler(executor, concurrency=1, rate_limit=TokenBucket(rate_per_sec=1000, burst=10))
+    scheduler.submit([CallJob(listing_id=l, to_number="+1", questions=[], search_id="s", score=s)
+                      for l, s in (("bad", 2.0), ("good", 1.0))])
+    scheduler.start()
+    scheduler.wait()
+
+    assert executor.done == ["good"]
+
+
+def test_database_url_is_required_unless_embedded_mode_is_chosen(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.delenv("EMBEDDED_DB", raising=False)
+    with pytest.raises(ValidationError, match="DATABASE_URL is required"):
+        Settings(_env_file=None)
+
+    monkeypatch.setenv("EMBEDDED_DB", "1")
+    assert Settings(_env_file=None).DATABASE_URL == EMBEDDED_DATABASE_URL
+
+    monkeypatch.setenv("DATABASE_URL", "not a url")
+    with pytest.raises(ValidationError, match="not a database URL"):
+        Settings(_env_file=None)
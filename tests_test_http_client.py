@@ -0,0 +1,49 @@
+import pytest
+import requests
+
+from apps.ingestion.http_client import CircuitBreaker, CircuitOpenError, HttpClient
+
+
+class BrokenSession:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+def _half_open(client):
+    breaker = client.breaker("test")
+    breaker.state, breaker.opened_at = "open", 0.0
+    return breaker
+
+
+@pytest.mark.parametrize("error", [requests.exceptions.InvalidURL("bad url"),
+                                   requests.exceptions.ChunkedEncodingError("cut off")])
+def test_any_error_of_the_trial_call_reopens_the_circuit(error):
+    client = HttpClient(max_retries=0)
+    client.session = BrokenSession(error)
+    breaker = _half_open(client)
+
+    with pytest.raises(type(error)):
+        client.get("http://upstream.test/", provider="test")
+
+    assert breaker.state == "open"
+    assert client.stats()["providers"]["test"]["failures"] == 1
+    with pytest.raises(CircuitOpenError):
+        client.get("http://upstream.test/", provider="test")
+
+
+def test_half_open_trial_that_never_reports_back_expires():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+    breaker.state, breaker.opened_at = "open", 0.0
+    breaker.before_call()  # the trial, which never reports back
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.trial_started_at -= 0.05
+    breaker.before_call()  # a new trial is let through
+
+    assert breaker.state == "half_open"
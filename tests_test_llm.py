@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+import pytest
+
+from apps.conversation.fake_llm import FakeLlmServer
+from apps.conversation.llm import LlmClient, LlmUnavailable
+from config.settings import settings
+
+MESSAGES = [{"role": "user", "content": "Is parking included?"}]
+
+
+@pytest.fixture(autouse=True)
+def tiers(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_FAST_MODEL", "fast")
+    monkeypatch.setattr(settings, "LLM_LARGE_MODEL", "large")
+    monkeypatch.setattr(settings, "LLM_CLARIFY_BUDGET_MS", 200)
+    monkeypatch.setattr(settings, "LLM_SUMMARY_BUDGET_MS", 5000)
+
+
+def _run(client, *calls):
+    async def run():
+        try:
+            return [await client.complete(task, MESSAGES, **kwargs) for task, kwargs in calls]
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def test_completion_is_recorded_in_the_model_histograms():
+    with FakeLlmServer(reply="Is there a garage or street parking?") as server:
+        client = LlmClient(base_url=server.url + "/v1", api_key="test")
+        results = _run(client, ("clarify", {}), ("clarify", {}), ("summary", {}))
+
+    assert [r.model for r in results] == ["fast", "fast", "large"]
+    assert results[0].text == "Is there a garage or street parking?" and not results[0].fallback
+    fast = client.stats()["models"]["fast"]
+    assert fast["latency_ms"]["count"] == 2
+    assert fast["latency_ms"]["histogram"]["<=100"] == 2
+    assert fast["prompt_tokens"]["histogram"]["<=16"] == 2  # 3 words each
+    assert fast["completion_tokens"]["count"] == 2
+    assert client.stats()["models"]["large"]["latency_ms"]["count"] == 1
+
+
+def test_call_over_budget_falls_back():
+    with FakeLlmServer(delays={"fast": 1.0}) as server:
+        client = LlmClient(base_url=server.url + "/v1", api_key="test")
+        result, = _run(client, ("clarify", {"fallback": "Could you say more?"}))
+
+    assert result.fallback and result.text == "Could you say more?"
+    assert result.latency_ms < 1000
+    fast = client.stats()["models"]["fast"]
+    assert (fast["timeouts"], fast["fallbacks"], fast["latency_ms"]["count"]) == (1, 1, 0)
+
+
+def test_call_over_budget_without_fallback_raises():
+    with FakeLlmServer(delays={"fast": 1.0}) as server:
+        client = LlmClient(base_url=server.url + "/v1", api_key="test")
+        with pytest.raises(LlmUnavailable):
+            _run(client, ("clarify", {}))
+
+    assert client.stats()["models"]["fast"]["timeouts"] == 1
+
+
+def test_http_error_falls_back():
+    with FakeLlmServer(fail=True) as server:
+        client = LlmClient(base_url=server.url + "/v1", api_key="test")
+        result, = _run(client, ("summary", {"fallback": ""}))
+
+    assert result.fallback and result.text == ""
+    large = client.stats()["models"]["large"]
+    assert (large["errors"], large["fallbacks"], large["timeouts"]) == (1, 1, 0)
+
+
+def test_each_event_loop_keeps_its_own_client():
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    with FakeLlmServer() as server:
+        client = LlmClient(base_url=server.url + "/v1", api_key="test")
+
+        async def call():
+            result = await client.complete("clarify", MESSAGES)
+            return result, client._http()
+
+        def on_other(coro):
+            return asyncio.run_coroutine_threadsafe(coro, other).result(5)
+
+        async def run():
+            first, http = await call()
+            _, other_http = on_other(call())
+            again, http_again = await call()  # the other loop's call did not replace this loop's client
+            await client.aclose()
+            on_other(client.aclose())
+            return first, again, http, other_http, http_again
+
+        first, again, http, other_http, http_again = asyncio.run(run())
+
+    other.call_soon_threadsafe(other.stop)
+    thread.join(5)
+    assert not first.fallback and not again.fallback
+    assert http is http_again and http is not other_http
+    assert http.is_closed and other_http.is_closed
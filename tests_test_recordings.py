@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from apps.storage.objects import LocalObjectStore, ObjectStore
+from apps.storage.orm_models import ConversationORM, ListingORM
+from apps.telephony import recordings
+from apps.telephony.recordings import RecordingPipeline
+from config.settings import settings
+
+
+class FakeResponse:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield b"ID3"
+        yield b"audio"
+
+
+class FlakyHttp:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def get(self, url, provider, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection reset")
+        return FakeResponse()
+
+
+def _wait_for(pipeline, name, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while pipeline.stats()[name] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_object_store_is_abstract():
+    with pytest.raises(TypeError):
+        ObjectStore()
+
+
+def test_failed_download_is_retried_with_backoff(app_db, db, tmp_path, monkeypatch):
+    db.add(ListingORM(listing_id="L1", provider="test"))
+    db.add(ConversationORM(call_sid="CA1", listing_id="L1", state="END", answers={}, questions=[]))
+    db.commit()
+    http = FlakyHttp(failures=2)
+    monkeypatch.setattr(recordings, "get_http_client", lambda: http)
+    monkeypatch.setattr(settings, "RECORDING_RETRY_BASE_SECONDS", 0.01)
+    pipeline = RecordingPipeline(store=LocalObjectStore(str(tmp_path / "objects")), concurrency=1)
+
+    pipeline.submit("CA1", "RE1", "https://api.twilio.com/recordings/RE1")
+    _wait_for(pipeline, "stored")
+
+    assert http.calls == 3
+    assert pipeline.stats()["retried"] == 2
+    assert pipeline.store.get("recordings/CA1/RE1.mp3") == b"ID3audio"
+    db.expire_all()
+    assert db.get(ConversationORM, "CA1").recording_key == "recordings/CA1/RE1.mp3"
+
+
+def test_gives_up_after_the_last_attempt(tmp_path, monkeypatch):
+    http = FlakyHttp(failures=100)
+    monkeypatch.setattr(recordings, "get_http_client", lambda: http)
+    monkeypatch.setattr(settings, "RECORDING_RETRY_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "RECORDING_MAX_ATTEMPTS", 3)
+    pipeline = RecordingPipeline(store=LocalObjectStore(str(tmp_path / "objects")), concurrency=1)
+
+    pipeline.submit("CA1", "RE1", "https://api.twilio.com/recordings/RE1")
+    _wait_for(pipeline, "failed")
+
+    assert http.calls == 3
+    assert pipeline.stats()["failed"] == 1
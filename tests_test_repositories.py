@@ -0,0 +1,77 @@
+from sqlalchemy import event
+
+from apps.storage.orm_models import ConversationORM, ListingORM, SearchListingORM
+from apps.storage.repositories import ConversationRepository, ListingRepository
+
+
+def listing(listing_id, **fields):
+    return dict({"listing_id": listing_id, "provider": "zillow", "title": "2BR", "price": 2000,
+                 "contact_phone": "+15550001"}, **fields)
+
+
+def test_upsert_many_keeps_columns_a_row_omits(db):
+    repo = ListingRepository(db)
+    repo.upsert_many([listing("a"), listing("b")])
+
+    row = listing("b", price=2100)
+    del row["contact_phone"]
+    result = repo.upsert_many([listing("a"), row])
+
+    assert (result.inserted, result.updated, result.unchanged) == (0, 1, 1)
+    b = db.get(ListingORM, "b")
+    db.refresh(b)
+    assert b.price == 2100
+    assert b.contact_phone == "+15550001"
+
+
+def test_upsert_many_mixed_key_sets_in_one_call(db):
+    repo = ListingRepository(db)
+    result = repo.upsert_many([listing("a"), {"listing_id": "b", "provider": "apify", "price": 900},
+                               listing("c", sqft=700)], search_id="s1")
+
+    assert result.inserted == 3
+    assert sorted(result.linked_ids) == ["a", "b", "c"]
+    assert db.get(ListingORM, "b").title is None
+    assert db.get(ListingORM, "c").sqft == 700
+
+
+def test_upsert_many_last_duplicate_wins(db):
+    result = ListingRepository(db).upsert_many([listing("a", price=1), listing("a", price=2)])
+
+    assert result.inserted == 1
+    assert db.get(ListingORM, "a").price == 2
+
+
+def test_link_prices_follow_the_listing(db):
+    repo = ListingRepository(db)
+    repo.upsert_many([listing("a"), listing("b", price=1500)], search_id="s1")
+    repo.upsert_many([listing("a")], search_id="s2")
+
+    repo.upsert_many([listing("a", price=2500)])  # a price change outside either search
+
+    prices = {(l.search_id, l.listing_id): l.price for l in db.query(SearchListingORM)}
+    assert prices == {("s1", "a"): 2500, ("s1", "b"): 1500, ("s2", "a"): 2500}
+
+
+def test_summaries_sort_and_filter_on_the_search_price_index(db):
+    repo = ListingRepository(db)
+    repo.upsert_many([listing(f"l{i}", price=1000 + 100 * i) for i in range(5)], search_id="s1")
+    for i in range(5):
+        db.add(ConversationORM(call_sid=f"CA{i}", listing_id=f"l{i}", summary_text="ok"))
+    db.commit()
+    convos = ConversationRepository(db)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, params, context, many: statements.append((statement, params)))
+
+    page, cursor = convos.list_summaries_page("s1", limit=2, order="desc", min_price=1100, max_price=1400)
+    rest, _ = convos.list_summaries_page("s1", limit=2, cursor=cursor, order="desc", min_price=1100, max_price=1400)
+
+    assert [r["listing_details"]["price"] for r in page + rest] == [1400, 1300, 1200, 1100]
+    statement, params = next((s, p) for s, p in statements if "ORDER BY" in s)
+    raw = db.get_bind().raw_connection()
+    try:
+        plan = " ".join(row[-1] for row in raw.cursor().execute("EXPLAIN QUERY PLAN " + statement, params))
+    finally:
+        raw.close()
+    assert "ix_search_listings_search_id_price" in plan
@@ -0,0 +1,61 @@
+from apps.ingestion.base_provider import ListingProvider, ResultsTruncated
+from apps.ingestion.cache import CachedProvider
+from apps.ingestion.composite_provider import CompositeProvider
+from apps.ingestion.filters import RentalFilters
+from apps.storage.cache import build_cache
+
+FILTERS = RentalFilters(city="austin", state="TX")
+
+
+class TwoPageProvider(ListingProvider):
+    name = "fake"
+
+    def __init__(self, truncate: bool):
+        self.truncate = truncate
+        self.fetches = 0
+
+    def fetch_page(self, filters, cursor, page_size):
+        self.fetches += 1
+        n = int(cursor or 0)
+        items = [{"listing_id": f"{n}-{k}", "title": "x"} for k in range(page_size)]
+        if n == 1 and self.truncate:
+            raise ResultsTruncated("body cut off", items[:2])
+        return items, ("1" if n == 0 else None)
+
+
+def cached(inner):
+    return CachedProvider(inner, cache=build_cache("test", max_entries=8, ttl_seconds=60, use_redis=False))
+
+
+def test_natural_end_is_cached_as_complete():
+    provider = cached(TwoPageProvider(truncate=False))
+
+    assert sum(len(p) for p in provider.iter_pages(FILTERS, limit=100, page_size=5)) == 10
+    assert sum(len(p) for p in provider.iter_pages(FILTERS, limit=100, page_size=5)) == 10
+    assert provider.inner.fetches == 2
+
+
+def test_truncated_stream_is_passed_through_but_not_cached():
+    provider = cached(TwoPageProvider(truncate=True))
+
+    pages = []
+    try:
+        for page in provider.iter_pages(FILTERS, limit=100, page_size=5):
+            pages.append(page)
+    except ResultsTruncated:
+        pass
+    else:
+        raise AssertionError("truncation was not propagated")
+
+    assert [len(p) for p in pages] == [5, 2]
+    list(provider.iter_pages(FILTERS, limit=3, page_size=5))
+    assert provider.inner.fetches == 3  # the second search went to the provider again
+
+
+def test_composite_reports_truncation_as_incomplete():
+    provider = CompositeProvider([cached(TwoPageProvider(truncate=True))])
+
+    count = sum(len(p) for p in provider.iter_pages(FILTERS, limit=100, page_size=5))
+
+    assert count == 7
+    assert provider.stats[0].status == "truncated"
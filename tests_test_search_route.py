@@ -0,0 +1,21 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from apps.api import routes_listings
+from apps.storage.db import get_write_db
+from tests.test_composite_provider import PagedProvider
+
+
+def test_search_streams_every_provider_page_into_the_db(db, monkeypatch):
+    monkeypatch.setattr(routes_listings, "create_provider", lambda: PagedProvider("paged", pages=3, delay=0.01))
+    app = FastAPI()
+    app.include_router(routes_listings.router, prefix="/listings")
+    app.dependency_overrides[get_write_db] = lambda: db
+
+    resp = TestClient(app).post("/listings/search", json={"search_id": "s1", "city": "austin", "state": "TX",
+                                                          "max_listings": 1000})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["results_count"] == body["inserted"] > 0
+    assert body["providers"][0]["status"] == "ok"
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from apps.conversation import llm as llm_module
+from apps.conversation import summary_worker as worker_module
+from apps.conversation.fake_llm import FakeLlmServer
+from apps.conversation.llm import LlmClient
+from apps.conversation.summary_worker import SummaryWorker
+from apps.storage.db import create_async_db_engine, writer_engine
+from apps.storage.orm_models import ConversationORM, ListingORM
+from config.settings import settings
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    Factory of a FakeLlmServer that the shared LLM client talks to.
+    """
+    monkeypatch.setattr(settings, "LLM_LARGE_MODEL", "large")
+    servers = []
+
+    def start(**kwargs):
+        server = FakeLlmServer(**kwargs).start()
+        servers.append(server)
+        monkeypatch.setattr(llm_module, "_client", LlmClient(base_url=server.url + "/v1", api_key="test"))
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def _pending(db, *call_sids, listing_id=None, status="pending", updated_at=None):
+    for call_sid in call_sids:
+        db.add(ConversationORM(call_sid=call_sid, listing_id=listing_id, state="END", questions=[],
+                               answers={"Is parking included?": "Yes, a garage spot."}, summary_status=status,
+                               summary_attempts=0, summary_updated_at=updated_at or datetime.utcnow()))
+    db.commit()
+
+
+async def _turn(client, call_sid, speech=None):
+    data = {"CallSid": call_sid, "SpeechResult": speech} if speech else {"CallSid": call_sid}
+    resp = await client.post("/twilio/voice", data=data)
+    resp.raise_for_status()
+
+
+def _summary(db, call_sid):
+    db.rollback()  # a fresh snapshot
+    convo = db.get(ConversationORM, call_sid)
+    return convo.summary_status, convo.summary_text
+
+
+async def _with_worker(async_url, body, **kwargs):
+    engine = create_async_db_engine(async_url)
+    try:
+        worker = SummaryWorker(sessionmaker=async_sessionmaker(writer_engine(engine), expire_on_commit=False), **kwargs)
+        await body(worker)
+    finally:
+        for task in worker._tasks:
+            task.cancel()
+        await llm_module._client.aclose()
+        await engine.dispose()
+
+
+def test_batched_request_gets_the_budget_of_its_batch(db, async_url, fake_llm, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_SUMMARY_BUDGET_MS", 400)
+    server = fake_llm(delay=0.6, reply=json.dumps({"CA1": "Garage parking.", "CA2": "Garage parking, too."}))
+    _pending(db, "CA1", "CA2")
+
+    async def body(worker):
+        worker.enqueue("CA1")
+        worker.enqueue("CA2")
+        await worker.drain()
+        assert (worker.counts["requests"], worker.counts["done"]) == (1, 2)
+
+    asyncio.run(_with_worker(async_url, body, batch_size=2, batch_wait_ms=200))
+    assert _summary(db, "CA2") == ("done", "Garage parking, too.")
+    assert len(server.requests) == 1
+
+
+def test_job_is_summarized_with_the_sessions_listing_context(db, async_url, fake_llm):
+    server = fake_llm(reply="Parking is included.")
+    _pending(db, "CA1")  # a conversation without a listing row
+
+    async def body(worker):
+        worker.enqueue("CA1", {"title": "Sunny loft", "address": "1 Main St"})
+        await worker.drain()
+
+    asyncio.run(_with_worker(async_url, body))
+    assert _summary(db, "CA1") == ("done", "Parking is included.")
+    assert "Listing: Sunny loft" in server.requests[0]["messages"][1]["content"]
+
+
+def test_stale_running_summary_is_recovered_while_running(db, async_url, fake_llm, monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_RECOVER_INTERVAL_SECONDS", 0.05)
+    fake_llm(reply="Parking is included.")
+    _pending(db, "CA1", status="running",
+             updated_at=datetime.utcnow() - timedelta(seconds=settings.SUMMARY_STALE_SECONDS + 1))
+
+    async def body(worker):
+        worker.enqueue("CA-none")  # starts the workers; nothing to claim
+        for _ in range(50):
+            await asyncio.sleep(0.05)
+            if worker.counts["done"]:
+                break
+
+    asyncio.run(_with_worker(async_url, body))
+    assert _summary(db, "CA1") == ("done", "Parking is included.")
+
+
+def test_finished_call_is_summarized_through_the_webhook(db, webhook_client, fake_llm, monkeypatch):
+    monkeypatch.setattr(worker_module, "_worker", None)
+    server = fake_llm(reply="Parking is included.")
+    db.add(ListingORM(listing_id="L1", provider="test", title="Sunny loft", address="1 Main St"))
+    db.add(ConversationORM(call_sid="CA1", listing_id="L1", state="INTRO", answers={},
+                           questions=["Is parking included?"]))
+    db.commit()
+
+    async def run():
+        async with webhook_client() as client:
+            await _turn(client, "CA1")
+            await _turn(client, "CA1", "Yes, I have a minute.")
+            await _turn(client, "CA1", "Yes, there is a garage spot included in the rent.")
+            await _turn(client, "CA1", "Thank you, bye.")
+            await worker_module.get_summary_worker().drain()
+            await llm_module._client.aclose()
+
+    asyncio.run(run())
+    assert _summary(db, "CA1") == ("done", "Parking is included.")
+    assert "Listing: Sunny loft" in server.requests[-1]["messages"][1]["content"]
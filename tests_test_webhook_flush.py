@@ -0,0 +1,79 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from apps.conversation.sessions import get_session_store
+from apps.storage.orm_models import ConversationORM, ListingORM, TurnORM
+from apps.storage.db import get_async_sessionmaker
+from apps.telephony.webhooks import save_session
+from config.settings import settings
+
+ANSWER = "Yes, that is included in the monthly rent."
+
+
+def _seed(db, *call_sids):
+    for i, call_sid in enumerate(call_sids):
+        db.add(ListingORM(listing_id=f"L{i}", provider="test", address=f"{i} Main St"))
+        db.add(ConversationORM(call_sid=call_sid, listing_id=f"L{i}", state="INTRO", answers={},
+                               questions=["Is it available?", "Is parking included?"]))
+    db.commit()
+
+
+def _turns(db, call_sid):
+    db.rollback()  # a fresh snapshot
+    return db.scalar(select(func.count()).select_from(TurnORM).where(TurnORM.call_sid == call_sid))
+
+
+async def _turn(client, call_sid, speech=None):
+    data = {"CallSid": call_sid}
+    if speech:
+        data["SpeechResult"] = speech
+    resp = await client.post("/twilio/voice", data=data)
+    resp.raise_for_status()
+
+
+def test_call_status_callback_flushes_unwritten_turns(db, webhook_client, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_FLUSH_EVERY_TURN", False)
+    _seed(db, "CA1")
+
+    async def run():
+        async with webhook_client() as client:
+            await _turn(client, "CA1")
+            await _turn(client, "CA1", ANSWER)
+            assert _turns(db, "CA1") == 0
+            resp = await client.post("/twilio/call-status", data={"CallSid": "CA1", "CallStatus": "completed"})
+            assert resp.status_code == 204
+
+    asyncio.run(run())
+    assert _turns(db, "CA1") == 2
+    assert get_session_store().get("CA1") is None
+
+
+def test_evicted_session_is_flushed(db, webhook_client, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_FLUSH_EVERY_TURN", False)
+    monkeypatch.setattr(settings, "SESSION_MAX_ENTRIES", 1)
+    _seed(db, "CA1", "CA2")
+
+    async def run():
+        async with webhook_client() as client:
+            await _turn(client, "CA1")
+            await _turn(client, "CA2")  # the store holds one session: CA1 is evicted
+
+    asyncio.run(run())
+    assert _turns(db, "CA1") == 1
+
+
+def test_a_batch_flushed_twice_is_written_once(db, webhook_client, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_FLUSH_EVERY_TURN", False)
+    _seed(db, "CA1")
+
+    async def run():
+        async with webhook_client() as client:
+            await _turn(client, "CA1")
+            snapshot = get_session_store().get("CA1").to_dict()
+            for _ in range(2):
+                async with get_async_sessionmaker()() as session:
+                    await save_session(session, snapshot)
+
+    asyncio.run(run())
+    assert _turns(db, "CA1") == 1